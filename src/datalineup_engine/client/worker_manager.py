@@ -18,7 +18,12 @@ from datalineup_engine.utils.options import fromdict
 
 class AbstractWorkerManagerClient(abc.ABC):
     @abc.abstractmethod
-    async def lock(self) -> LockResponse:
+    async def lock(
+        self, version: Optional[str] = None, wait: Optional[float] = None
+    ) -> LockResponse:
+        """Lock work. With the `version` of the work already held, the response
+        might only contain what changed since, and be delayed up to `wait`
+        seconds until something changes."""
         pass
 
     @abc.abstractmethod
@@ -47,13 +52,17 @@ class WorkerManagerClient(AbstractWorkerManagerClient):
         self.http_client = http_client
         self.base_url = base_url
 
-    async def lock(self) -> LockResponse:
+    async def lock(
+        self, version: Optional[str] = None, wait: Optional[float] = None
+    ) -> LockResponse:
         lock_url = urlcat(self.base_url, "api/lock")
         json = asdict(
             LockInput(
                 worker_id=self.worker_id,
                 selector=self.selector,
                 executors=self.executors,
+                version=version,
+                wait=wait,
             )
         )
         async with self.http_client.post(lock_url, json=json) as response:
@@ -3,6 +3,8 @@ import typing as t
 import dataclasses
 from enum import Enum
 
+from datalineup_engine.core.api import JobRetention
+
 
 class Env(Enum):
     DEVELOPMENT = "development"
@@ -21,6 +23,13 @@ class WorkerManagerConfig:
     static_definitions_directories: list[str]
     static_definitions_jobs_selector: t.Optional[str]
     work_items_per_worker: int
+    lock_max_wait: float
+    lock_max_waiters: int
+    jobs_page_size: int
+    jobs_retention: t.Optional[JobRetention]
+    jobs_retention_batch_size: int
+    jobs_retention_archiver: t.Optional[str]
+    delete_orphaned_cursors_states: bool
 
 
 @dataclasses.dataclass
@@ -5,10 +5,14 @@ from typing import Optional
 from typing import TypeVar
 
 import dataclasses
+import hashlib
 from dataclasses import field
 from datetime import datetime
+from datetime import timedelta
 
 from datalineup_engine.utils import utcnow
+from datalineup_engine.utils.options import ValidationMode
+from datalineup_engine.utils.options import validation_mode
 
 from .pipeline import PipelineInfo  # noqa: F401  # Reexport for public API
 from .pipeline import QueuePipeline
@@ -89,19 +93,57 @@ class QueueItemWithState(QueueItem):
     state: QueueItemState = field(default_factory=QueueItemState)
 
 
+@dataclasses.dataclass
+class JobRetention:
+    #: Delete completed jobs that completed longer than this ago.
+    max_age: Optional[timedelta] = None
+    #: Delete completed jobs past the most recent `max_runs` jobs.
+    max_runs: Optional[int] = None
+
+
 @dataclasses.dataclass
 class JobDefinition:
     name: str
     template: QueueItem
     minimal_interval: str
+    retention: Optional[JobRetention] = None
+
+
+@dataclasses.dataclass
+class LockDropped:
+    items: list[JobId] = field(default_factory=list)
+    resources: list[str] = field(default_factory=list)
+    resources_providers: list[str] = field(default_factory=list)
+    executors: list[str] = field(default_factory=list)
 
 
+@validation_mode(ValidationMode.COMPILED)
 @dataclasses.dataclass
 class LockResponse:
     items: list[QueueItemWithState]
     resources: list[ResourceItem]
     resources_providers: list[ResourcesProviderItem]
     executors: list[ComponentDefinition]
+    #: Version of the locked work, see `lock_version`.
+    version: t.Optional[str] = None
+    #: Set when the response only holds the work added since the version
+    #: given in `LockInput`, along with the names of the work dropped.
+    dropped: t.Optional[LockDropped] = None
+
+    @property
+    def unchanged(self) -> bool:
+        """Whether the response is a delta without any change."""
+        return (
+            self.dropped is not None
+            and not self.items
+            and not self.resources
+            and not self.resources_providers
+            and not self.executors
+            and not self.dropped.items
+            and not self.dropped.resources
+            and not self.dropped.resources_providers
+            and not self.dropped.executors
+        )
 
 
 @dataclasses.dataclass
@@ -109,6 +151,28 @@ class LockInput:
     worker_id: str
     selector: t.Optional[str] = None
     executors: list[str] | None = None
+    #: Version of the work the worker holds.
+    version: t.Optional[str] = None
+    #: Seconds to wait for the work to change from `version` before answering.
+    wait: t.Optional[float] = None
+
+
+def lock_version(
+    *,
+    items: t.Iterable[str],
+    resources: t.Iterable[str],
+    resources_providers: t.Iterable[str],
+    executors: t.Iterable[str],
+) -> str:
+    """Hash the names of locked work. Workers hold the same work as a lock
+    response when they share the same version."""
+    digest = hashlib.sha256()
+    for names in (items, resources, resources_providers, executors):
+        for name in sorted(names):
+            digest.update(name.encode())
+            digest.update(b"\0")
+        digest.update(b"\1")
+    return digest.hexdigest()
 
 
 @dataclasses.dataclass
@@ -200,9 +264,15 @@ class StartJobInput:
     job_definition_name: Optional[str] = None
 
 
+JobStatus = t.Literal["running", "completed", "succeeded", "failed"]
+
+
 @dataclasses.dataclass
 class JobsResponse(ListResponse[JobItem]):
     items: list[JobItem]
+    #: Name of the last job listed, to pass as `after` to get the next page.
+    #: Only set when more jobs are left.
+    next_after: Optional[str] = None
 
 
 @dataclasses.dataclass
@@ -220,6 +290,11 @@ class JobsSyncResponse:
     pass
 
 
+@dataclasses.dataclass
+class JobsRetentionResponse:
+    deleted: int
+
+
 @dataclasses.dataclass
 class JobsStartResponse:
     name: str
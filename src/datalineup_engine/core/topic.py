@@ -4,9 +4,13 @@ import dataclasses
 import datetime
 import uuid
 
+from datalineup_engine.utils.options import ValidationMode
+from datalineup_engine.utils.options import validation_mode
+
 from .types import MessageId
 
 
+@validation_mode(ValidationMode.COMPILED)
 @dataclasses.dataclass
 class TopicMessage:
     #: Message arguments used to call the pipeline.
@@ -9,6 +9,7 @@ from .config import RedisConfig
 from .config import DatalineupConfig
 from .config import ServicesManagerConfig
 from .config import WorkerManagerConfig
+from .core.api import JobRetention
 
 
 class config(DatalineupConfig):
@@ -55,6 +56,24 @@ class config(DatalineupConfig):
             "DATALINEUP_STATIC_DEFINITIONS_JOBS_SELECTOR"
         )
         work_items_per_worker = 10
+        # Longest a lock request can wait for its work to change. Each waiting
+        # request holds a server thread, enable only with a threaded server
+        # sized for one thread per worker.
+        lock_max_wait: float = 0
+        # Lock requests past this number of waiting ones answer at once.
+        lock_max_waiters: int = 8
+        # Jobs listed per page when the listing doesn't set a limit.
+        jobs_page_size: int = 1000
+        # Retention of completed jobs, for job definitions without their own.
+        jobs_retention: t.Optional[JobRetention] = None
+        jobs_retention_batch_size: int = 1000
+        # Import name of a callable receiving a `RetentionBatch` before it
+        # is deleted.
+        jobs_retention_archiver: t.Optional[str] = None
+        # Delete the cursors states of namespaces no longer used by any job
+        # definition or job. Jobs sharing cursors states must set
+        # `job_state.cursors_states_namespace` in their config.
+        delete_orphaned_cursors_states: bool = False
 
     class redis(RedisConfig):
         dsn = "redis://localhost:6379"
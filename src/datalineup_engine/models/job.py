@@ -1,3 +1,4 @@
+import typing as t
 from typing import Optional
 
 from datetime import datetime
@@ -5,6 +6,7 @@ from datetime import datetime
 import sqlalchemy as sa
 from sqlalchemy import CheckConstraint
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import relationship
 
@@ -26,6 +28,16 @@ class Job(Base):
             "(error IS NULL) OR (error IS NOT NULL AND completed_at IS NOT NULL)",
             name="jobs_error_must_also_be_completed",
         ),
+        # Listing jobs of a job definition by pages.
+        Index("jobs_job_definition_name_name", "job_definition_name", "name"),
+        # Finding the last jobs of job definitions and ranking them for retention.
+        Index(
+            "jobs_job_definition_name_started_at",
+            "job_definition_name",
+            "started_at",
+        ),
+        # Deleting queues checks no job references them.
+        Index("jobs_queue_name", "queue_name"),
     )
 
     name: Mapped[str] = mapped_column(sa.Text, primary_key=True)
@@ -76,3 +88,23 @@ class Job(Base):
             error=self.error,
             **queue_args,  # type: ignore[arg-type]
         )
+
+    class InsertValues(t.TypedDict):
+        name: str
+        queue_name: str
+        job_definition_name: Optional[str]
+        cursor: Optional[str]
+        completed_at: Optional[datetime]
+        started_at: datetime
+        error: Optional[str]
+
+    def get_insert_values(self) -> "Job.InsertValues":
+        return Job.InsertValues(
+            name=self.name,
+            queue_name=self.queue_name,
+            job_definition_name=self.job_definition_name,
+            cursor=self.cursor,
+            completed_at=self.completed_at,
+            started_at=self.started_at,
+            error=self.error,
+        )
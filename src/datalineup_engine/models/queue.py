@@ -1,7 +1,5 @@
 from typing import Optional
 
-import dataclasses
-
 import sqlalchemy as sa
 from sqlalchemy import Index
 from sqlalchemy import text
@@ -15,6 +13,7 @@ from datalineup_engine.core.api import QueueItemState
 from datalineup_engine.core.api import QueueItemWithState
 from datalineup_engine.core.types import JobId
 from datalineup_engine.models.compat import mapped_column
+from datalineup_engine.worker_manager.config.static_definitions import JobTemplate
 from datalineup_engine.worker_manager.config.static_definitions import StaticDefinitions
 
 from .base import Base
@@ -30,6 +29,7 @@ class Queue(Base):
             text("assigned_at"),
             postgresql_where="enabled",
         ),
+        Index("queues_assigned_to", "assigned_to"),
     )
 
     name: Mapped[str] = mapped_column(sa.Text, primary_key=True)
@@ -45,7 +45,7 @@ class Queue(Base):
             raise ValueError("Must .join_definitions() first")
         return self._queue_item
 
-    def join_definitions(self, static_definitions: StaticDefinitions) -> None:
+    def join_definitions(self, static_definitions: StaticDefinitions) -> JobTemplate:
         if not self.job:
             raise NotImplementedError("Only support Job queue")
 
@@ -54,14 +54,9 @@ class Queue(Base):
             started_at=self.job.started_at,
         )
 
-        if self.job.job_definition_name is None:
-            self._queue_item = dataclasses.replace(
-                static_definitions.jobs[self.job.name],
-                name=JobId(self.name),
-            ).with_state(state)
-            return
-
-        self._queue_item = dataclasses.replace(
-            static_definitions.job_definitions[self.job.job_definition_name].template,
-            name=JobId(self.name),
-        ).with_state(state)
+        template = static_definitions.job_template(
+            job_name=self.job.name,
+            job_definition_name=self.job.job_definition_name,
+        )
+        self._queue_item = template.instantiate(JobId(self.name), state)
+        return template
@@ -1,4 +1,5 @@
 import typing as t
+from typing import Iterator
 from typing import Optional
 
 import time
@@ -8,10 +9,14 @@ import sqlalchemy as sa
 from sqlalchemy import select
 from sqlalchemy import union_all
 from sqlalchemy import update
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm import joinedload
 
 from datalineup_engine.core import JobId
+from datalineup_engine.core.api import JobRetention
 from datalineup_engine.core.api import JobsStates
+from datalineup_engine.core.api import JobStatus
 from datalineup_engine.core.api import QueueItem
 from datalineup_engine.core.api import StartJobInput
 from datalineup_engine.core.types import CursorStateKey
@@ -25,6 +30,10 @@ from datalineup_engine.utils.sqlalchemy import AnySyncSession
 from datalineup_engine.utils.sqlalchemy import upsert
 from datalineup_engine.worker_manager.config.static_definitions import StaticDefinitions
 
+ITER_JOBS_BATCH_SIZE = 1000
+# Keep well under the bound parameters limit of databases.
+FETCH_CURSORS_STATES_CHUNK_SIZE = 5000
+
 
 def create_job(
     *,
@@ -48,12 +57,105 @@ def create_job(
     return job
 
 
+def create_jobs(*, session: AnySyncSession, jobs: list[Job]) -> int:
+    """Create jobs and their queues in batched statements. Jobs that already
+    exist are left untouched. Return the number of jobs created.
+    """
+    if not jobs:
+        return 0
+    # Drivers don't report the rows inserted by batched statements reliably,
+    # count the jobs before and after instead.
+    count_jobs = select(sa.func.count()).where(Job.name.in_([job.name for job in jobs]))
+    existing = session.execute(count_jobs).scalar_one()
+    session.execute(
+        upsert(session)(Queue).on_conflict_do_nothing(),
+        [{"name": job.queue_name, "enabled": True} for job in jobs],
+    )
+    session.execute(
+        upsert(session)(Job).on_conflict_do_nothing(),
+        [job.get_insert_values() for job in jobs],
+        # Insert all the jobs in one batch even if they have different nulls.
+        execution_options={"render_nulls": True},
+    )
+    return session.execute(count_jobs).scalar_one() - existing
+
+
 def get_jobs(*, session: AnySyncSession) -> list[Job]:
     return list(
         session.execute(select(Job).options(joinedload(Job.queue))).scalars().all()
     )
 
 
+def iter_jobs(
+    *,
+    session: AnySyncSession,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    job_definition_name: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+    assigned_to: Optional[str] = None,
+    labels: Optional[dict[str, str]] = None,
+    static_definitions: Optional[StaticDefinitions] = None,
+) -> Iterator[Job]:
+    """Iterate over jobs ordered by name, starting after the job named `after`.
+
+    Rows are fetched by batches so large listings don't have to be loaded in
+    memory at once. Labels are only known from the static definitions, they
+    select the jobs created from a job definition or static job with all the
+    given labels.
+    """
+    stmt = select(Job).join(Job.queue).options(contains_eager(Job.queue))
+    if after is not None:
+        stmt = stmt.where(Job.name > after)
+    if job_definition_name is not None:
+        stmt = stmt.where(Job.job_definition_name == job_definition_name)
+    if status == "running":
+        stmt = stmt.where(Job.completed_at.is_(None))
+    elif status == "completed":
+        stmt = stmt.where(Job.completed_at.is_not(None))
+    elif status == "succeeded":
+        stmt = stmt.where(Job.completed_at.is_not(None), Job.error.is_(None))
+    elif status == "failed":
+        stmt = stmt.where(Job.error.is_not(None))
+    if assigned_to is not None:
+        stmt = stmt.where(Queue.assigned_to == assigned_to)
+    if labels:
+        if static_definitions is None:
+            raise ValueError("Filtering on labels requires static definitions")
+        job_definition_names, job_names = _labelled_jobs(
+            labels, static_definitions=static_definitions
+        )
+        stmt = stmt.where(
+            sa.or_(
+                Job.job_definition_name.in_(job_definition_names),
+                sa.and_(Job.job_definition_name.is_(None), Job.name.in_(job_names)),
+            )
+        )
+    stmt = stmt.order_by(Job.name).limit(limit)
+    yield from session.execute(
+        stmt, execution_options={"yield_per": ITER_JOBS_BATCH_SIZE}
+    ).scalars()
+
+
+def _labelled_jobs(
+    labels: dict[str, str], *, static_definitions: StaticDefinitions
+) -> tuple[list[str], list[str]]:
+    """Return the job definitions and static jobs names with all `labels`."""
+    expected = labels.items()
+    return (
+        [
+            name
+            for name, job_definition in static_definitions.job_definitions.items()
+            if expected <= job_definition.template.labels.items()
+        ],
+        [
+            name
+            for name, job in static_definitions.jobs.items()
+            if expected <= job.labels.items()
+        ],
+    )
+
+
 def get_job(name: str, session: AnySyncSession) -> Optional[Job]:
     return session.get(Job, name)
 
@@ -71,6 +173,172 @@ def get_last_job(*, session: AnySyncSession, job_definition_name: str) -> Option
     )
 
 
+def get_static_job_names(*, session: AnySyncSession) -> set[str]:
+    """Return the name of all jobs not created from a job definition."""
+    return set(
+        session.execute(select(Job.name).where(Job.job_definition_name.is_(None)))
+        .scalars()
+        .all()
+    )
+
+
+def get_last_jobs(*, session: AnySyncSession) -> dict[str, Job]:
+    """Return the last job of every job definitions, by job definition name."""
+    rank = (
+        sa.func.row_number()
+        .over(
+            partition_by=Job.job_definition_name,
+            order_by=Job.started_at.desc(),
+        )
+        .label("rank")
+    )
+    ranked_jobs = (
+        select(Job, rank).where(Job.job_definition_name.is_not(None)).subquery()
+    )
+    last_job = aliased(Job, ranked_jobs)
+    jobs = session.execute(select(last_job).where(ranked_jobs.c.rank == 1)).scalars()
+    return {t.cast(str, job.job_definition_name): job for job in jobs}
+
+
+def get_expired_jobs(
+    *,
+    session: AnySyncSession,
+    retentions: dict[str, JobRetention],
+    default_retention: Optional[JobRetention],
+    default_job_definitions: Optional[list[str]],
+    now: datetime,
+    limit: int,
+) -> list[Job]:
+    """Return completed jobs of job definitions past their retention.
+
+    `default_retention` applies to `default_job_definitions`, or to every job
+    definition missing from `retentions` if None. Runs are counted among
+    completed jobs only. The last completed job of a job definition is always
+    kept since the next jobs are scheduled from it.
+    """
+    job_definitions: sa.ColumnElement[bool] = Job.job_definition_name.in_(retentions)
+    if default_retention:
+        if default_job_definitions is None:
+            job_definitions = sa.or_(
+                job_definitions, Job.job_definition_name.not_in(retentions)
+            )
+        else:
+            job_definitions = sa.or_(
+                job_definitions, Job.job_definition_name.in_(default_job_definitions)
+            )
+
+    rank = (
+        sa.func.row_number()
+        .over(
+            partition_by=Job.job_definition_name,
+            order_by=Job.started_at.desc(),
+        )
+        .label("rank")
+    )
+    ranked_jobs = (
+        select(Job.name, Job.job_definition_name, Job.completed_at, rank)
+        .where(
+            Job.job_definition_name.is_not(None),
+            Job.completed_at.is_not(None),
+            job_definitions,
+        )
+        .subquery()
+    )
+
+    def expired(retention: JobRetention) -> "sa.ColumnElement[bool]":
+        conditions = []
+        if retention.max_age is not None:
+            conditions.append(ranked_jobs.c.completed_at < now - retention.max_age)
+        if retention.max_runs is not None:
+            conditions.append(ranked_jobs.c.rank > retention.max_runs)
+        return sa.or_(sa.false(), *conditions)
+
+    # Group job definitions by retention to keep the query small.
+    grouped: dict[tuple, tuple[JobRetention, list[str]]] = {}
+    for name, retention in retentions.items():
+        key = (retention.max_age, retention.max_runs)
+        grouped.setdefault(key, (retention, []))[1].append(name)
+    conditions = [
+        sa.and_(ranked_jobs.c.job_definition_name.in_(names), expired(retention))
+        for retention, names in grouped.values()
+    ]
+    if default_retention:
+        conditions.append(
+            sa.and_(
+                ranked_jobs.c.job_definition_name.not_in(retentions),
+                expired(default_retention),
+            )
+        )
+    if not conditions:
+        return []
+
+    stmt = (
+        select(Job)
+        .join(ranked_jobs, ranked_jobs.c.name == Job.name)
+        .where(ranked_jobs.c.rank > 1, sa.or_(*conditions))
+        .options(joinedload(Job.queue))
+        .limit(limit)
+    )
+    return list(session.execute(stmt).scalars())
+
+
+def delete_jobs(*, session: AnySyncSession, jobs: list[Job]) -> None:
+    """Delete jobs along with their queues."""
+    if not jobs:
+        return
+    session.execute(sa.delete(Job).where(Job.name.in_([job.name for job in jobs])))
+    session.execute(
+        sa.delete(Queue).where(Queue.name.in_([job.queue_name for job in jobs]))
+    )
+
+
+def get_orphaned_cursors_states(
+    *,
+    session: AnySyncSession,
+    static_definitions: StaticDefinitions,
+    limit: int,
+) -> list[JobCursorState]:
+    """Return cursors states of namespaces neither defined in the static
+    definitions nor used by any job."""
+    namespaces = {*static_definitions.job_definitions, *static_definitions.jobs}
+    # Jobs can share their cursors states under an explicit namespace.
+    templates = [
+        *(d.template for d in static_definitions.job_definitions.values()),
+        *static_definitions.jobs.values(),
+    ]
+    for template in templates:
+        namespace = template.config.get("job_state", {}).get("cursors_states_namespace")
+        if namespace:
+            namespaces.add(namespace)
+    stmt = (
+        select(JobCursorState)
+        .where(
+            JobCursorState.job_definition_name.not_in(namespaces),
+            ~sa.exists().where(
+                sa.or_(
+                    Job.name == JobCursorState.job_definition_name,
+                    Job.job_definition_name == JobCursorState.job_definition_name,
+                )
+            ),
+        )
+        .limit(limit)
+    )
+    return list(session.execute(stmt).scalars())
+
+
+def delete_cursors_states(
+    *, session: AnySyncSession, cursors_states: list[JobCursorState]
+) -> None:
+    if not cursors_states:
+        return
+    keys = sa.tuple_(JobCursorState.job_definition_name, JobCursorState.cursor)
+    session.execute(
+        sa.delete(JobCursorState).where(
+            keys.in_([(c.job_definition_name, c.cursor) for c in cursors_states])
+        )
+    )
+
+
 def update_job(
     name: str,
     *,
@@ -187,30 +455,44 @@ def fetch_cursors_states(
     query: dict[JobId, list[CursorStateKey]],
     session: AnySyncSession,
 ) -> CursorsStates:
-    # Generate a query for each jobs so we can UNION them.
-    fetch_stmts = []
-    jobs = session.execute(
-        select(Job.name, Job.job_definition_name).where(Job.name.in_(query.keys()))
-    ).all()
-    job_names = {j.name: j.job_definition_name for j in jobs}
-    for job, cursors in query.items():
-        job_name = job_names.get(job) or job
-        fetch_stmts.append(
-            select(JobCursorState, sa.literal(job).label("name")).where(
-                JobCursorState.job_definition_name == job_name,
-                JobCursorState.cursor.in_(cursors),
-            )
-        )
-
     # Create a default state with every cursor default to None
     states: CursorsStates = {
         job: {c: None for c in cursors} for job, cursors in query.items()
     }
 
-    # Fill the states with DB values.
-    rows = session.execute(union_all(*fetch_stmts)).all()
-    for row in rows:
-        states[row.name][row.cursor] = row.state
+    # Fetch the requested (job, cursor) pairs in a single statement, resolving
+    # the namespace of each job to its job definition if it has one. Jobs
+    # without job definition use their own name as namespace.
+    pairs = [(job, cursor) for job, cursors in query.items() for cursor in cursors]
+    has_job_definition = (
+        select(Job.name)
+        .where(
+            Job.name == JobCursorState.job_definition_name,
+            Job.job_definition_name.is_not(None),
+        )
+        .exists()
+    )
+    for i in range(0, len(pairs), FETCH_CURSORS_STATES_CHUNK_SIZE):
+        chunk = pairs[i : i + FETCH_CURSORS_STATES_CHUNK_SIZE]
+        stmt = union_all(
+            select(Job.name.label("name"), JobCursorState.cursor, JobCursorState.state)
+            .select_from(JobCursorState)
+            .join(Job, Job.job_definition_name == JobCursorState.job_definition_name)
+            .where(sa.tuple_(Job.name, JobCursorState.cursor).in_(chunk)),
+            select(
+                JobCursorState.job_definition_name.label("name"),
+                JobCursorState.cursor,
+                JobCursorState.state,
+            ).where(
+                sa.tuple_(
+                    JobCursorState.job_definition_name, JobCursorState.cursor
+                ).in_(chunk),
+                ~has_job_definition,
+            ),
+        )
+        # Fill the states with DB values.
+        for row in session.execute(stmt):
+            states[row.name][row.cursor] = row.state
 
     return states
 
@@ -28,25 +28,25 @@ def get_assigned_queues(
     worker_id: str,
     assigned_after: datetime.datetime,
     selector: t.Optional[str] = None,
+    for_update: bool = False,
 ) -> list[Queue]:
     extra_filters = []
     if selector:
         extra_filters.append(Queue.name.regexp_match(selector))
-    assigned_jobs: t.Sequence[Queue] = (
-        session.execute(
-            select(Queue)
-            .options(joinedload(Queue.job))
-            .where(
-                Queue.enabled.is_(True),
-                Queue.assigned_to == worker_id,
-                Queue.assigned_at >= assigned_after,
-                *extra_filters,
-            )
-            .order_by(Queue.name)
+    query = (
+        select(Queue)
+        .options(joinedload(Queue.job))
+        .where(
+            Queue.enabled.is_(True),
+            Queue.assigned_to == worker_id,
+            Queue.assigned_at >= assigned_after,
+            *extra_filters,
         )
-        .scalars()
-        .all()
+        .order_by(Queue.name)
     )
+    if for_update:
+        query = query.with_for_update(skip_locked=True, of=Queue)
+    assigned_jobs: t.Sequence[Queue] = session.execute(query).scalars().all()
     return list(assigned_jobs)
 
 
@@ -56,7 +56,11 @@ def get_unassigned_queues(
     assigned_before: datetime.datetime,
     selector: t.Optional[str] = None,
     limit: int | None,
+    for_update: bool = False,
 ) -> list[Queue]:
+    """Return the unassigned queues. With `for_update`, the rows are locked
+    until the end of the transaction and rows already locked by concurrent
+    transactions are skipped, on databases supporting it."""
     extra_filters = []
     if selector:
         extra_filters.append(Queue.name.regexp_match(selector))
@@ -75,11 +79,70 @@ def get_unassigned_queues(
     )
     if limit:
         query = query.limit(limit=limit)
+    if for_update:
+        query = query.with_for_update(skip_locked=True, of=Queue)
 
     unassigned_queues: t.Sequence[Queue] = session.execute(query).scalars().all()
     return list(unassigned_queues)
 
 
+def assign_queues(
+    *,
+    session: AnySyncSession,
+    names: t.Collection[str],
+    worker_id: str,
+    assigned_at: datetime.datetime,
+    assigned_before: datetime.datetime,
+) -> set[str]:
+    """Assign the queues to a worker, unless they are assigned to another worker
+    since `assigned_before`. Return the names of the queues assigned."""
+    if not names:
+        return set()
+    stmt = (
+        update(Queue)
+        .where(
+            Queue.name.in_(names),
+            or_(
+                Queue.assigned_to == worker_id,
+                Queue.assigned_at.is_(None),
+                Queue.assigned_at < assigned_before,
+            ),
+        )
+        .values(assigned_at=assigned_at, assigned_to=worker_id)
+        .execution_options(synchronize_session=False)
+    )
+    if getattr(session.get_bind().dialect, "update_returning", False):
+        return set(session.execute(stmt.returning(Queue.name)).scalars())
+
+    # Dialects without UPDATE RETURNING, such as SQLite on SQLAlchemy 1.4, read
+    # the assignments back in the same transaction.
+    session.execute(stmt)
+    assigned = session.execute(
+        select(Queue.name).where(
+            Queue.name.in_(names),
+            Queue.assigned_to == worker_id,
+            Queue.assigned_at == assigned_at,
+        )
+    )
+    return set(assigned.scalars())
+
+
+def unassign_queues(
+    *,
+    session: AnySyncSession,
+    names: t.Collection[str],
+    worker_id: str,
+) -> None:
+    if not names:
+        return
+    session.execute(
+        update(Queue)
+        .where(Queue.name.in_(names), Queue.assigned_to == worker_id)
+        .values(assigned_at=None, assigned_to=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
 def disable_queue(
     *,
     name: str,
@@ -25,6 +25,21 @@ async def opened_acontext(ctx: t.AsyncContextManager, value: T) -> t.AsyncIterat
         yield value
 
 
+async def gather_limited(
+    func: t.Callable[[T], Awaitable[R]], items: Iterable[T], *, limit: int
+) -> list[t.Union[R, BaseException]]:
+    """Call `func` on all items with at most `limit` calls running at once.
+    Results are returned in order, with exceptions in place of failed calls.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def call(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(call(item) for item in items), return_exceptions=True)
+
+
 async def aiter2agen(iterator: AsyncIterator[T]) -> AsyncGenerator[T, None]:
     """
     Convert an async iterator into an async generator.
@@ -79,6 +94,12 @@ class TasksGroup:
             self.tasks.difference_update(done)
         return done
 
+    def pop_done(self) -> set[asyncio.Task]:
+        """Remove and return the tasks already done, without waiting."""
+        done = {task for task in self.tasks if task.done()}
+        self.tasks.difference_update(done)
+        return done
+
     async def wait_all(self) -> set[asyncio.Task]:
         if not self.tasks:
             return set()
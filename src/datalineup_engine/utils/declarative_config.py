@@ -1,5 +1,6 @@
 import typing as t
 
+import hashlib
 import os
 from dataclasses import field
 
@@ -29,12 +30,19 @@ class UncompiledObject:
     kind: str
     name: str
     data: dict
+    #: Identify the object content, objects with the same digest compile to
+    #: the same definitions.
+    digest: str = ""
+
+
+_YAML_LOADER: t.Any = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def load_uncompiled_objects_from_str(definitions: str) -> list[UncompiledObject]:
     uncompiled_objects: list[UncompiledObject] = []
+    digest = hashlib.sha256(definitions.encode()).hexdigest()
 
-    for yaml_object in yaml.load_all(definitions, yaml.SafeLoader):
+    for i, yaml_object in enumerate(yaml.load_all(definitions, _YAML_LOADER)):
         if not yaml_object:
             continue
 
@@ -52,6 +60,7 @@ def load_uncompiled_objects_from_str(definitions: str) -> list[UncompiledObject]
                 kind=base_object.kind,
                 name=base_object.metadata.name,
                 data=yaml_object,
+                digest=f"{digest}:{i}",
             )
         )
 
@@ -68,11 +77,66 @@ def load_uncompiled_objects_from_path(path: str) -> list[UncompiledObject]:
 def load_uncompiled_objects_from_directory(config_dir: str) -> list[UncompiledObject]:
     uncompiled_objects: list[UncompiledObject] = list()
 
+    for path in _directory_yaml_files(config_dir):
+        with open(path, "r", encoding="utf-8") as f:
+            uncompiled_objects.extend(load_uncompiled_objects_from_str(f.read()))
+    return uncompiled_objects
+
+
+def _directory_yaml_files(config_dir: str) -> t.Iterator[str]:
     for root, _, filenames in os.walk(config_dir, followlinks=True):
         for filename in filenames:
-            if not filename.endswith(".yaml"):
-                continue
-
-            with open(os.path.join(root, filename), "r", encoding="utf-8") as f:
-                uncompiled_objects.extend(load_uncompiled_objects_from_str(f.read()))
-    return uncompiled_objects
+            if filename.endswith(".yaml"):
+                yield os.path.join(root, filename)
+
+
+class _CachedFile(t.NamedTuple):
+    stat: tuple[int, int, int]
+    digest: str
+    objects: list[UncompiledObject]
+
+
+class UncompiledObjectsLoader:
+    """Load uncompiled objects from paths, only parsing again the files that
+    changed since the previous load.
+
+    Files are first checked with their stat and then with their content hash,
+    so a file touched without change keeps its objects and their digests.
+    """
+
+    def __init__(self) -> None:
+        self.files: dict[str, _CachedFile] = {}
+
+    def load_paths(self, paths: list[str]) -> list[UncompiledObject]:
+        files: dict[str, _CachedFile] = {}
+        uncompiled_objects: list[UncompiledObject] = []
+        for path in paths:
+            if os.path.isdir(path):
+                filepaths: t.Iterable[str] = _directory_yaml_files(path)
+            else:
+                filepaths = [path]
+            for filepath in filepaths:
+                cached_file = self._load_file(filepath)
+                files[filepath] = cached_file
+                uncompiled_objects.extend(cached_file.objects)
+        self.files = files
+        return uncompiled_objects
+
+    def _load_file(self, path: str) -> _CachedFile:
+        stat_result = os.stat(path)
+        stat = (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+        cached_file = self.files.get(path)
+        if cached_file and cached_file.stat == stat:
+            return cached_file
+
+        with open(path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if cached_file and cached_file.digest == digest:
+            return cached_file._replace(stat=stat)
+
+        return _CachedFile(
+            stat=stat,
+            digest=digest,
+            objects=load_uncompiled_objects_from_str(content.decode("utf-8")),
+        )
@@ -10,6 +10,7 @@ from collections.abc import Iterable
 import typing_inspect
 
 from .cache import threadsafe_cache
+from .options import VALIDATION_MODE_ATTR
 
 R = t.TypeVar("R")
 
@@ -197,6 +198,8 @@ def dataclass_from_params(func: t.Callable[..., R]) -> t.Type[BaseParamsDataclas
     fields: list[tuple] = []
     func_signature = signature(func)
     namespace = {"_func": staticmethod(func), "_has_kwargs": False}
+    if hasattr(func, VALIDATION_MODE_ATTR):
+        namespace[VALIDATION_MODE_ATTR] = getattr(func, VALIDATION_MODE_ATTR)
     for parameter in func_signature.parameters.values():
         name = parameter.name
         typ = parameter.annotation
@@ -42,6 +42,57 @@ async def async_buffered(
             yield yield_items
 
 
+async def async_lookahead(
+    iterator: t.AsyncIterator[T],
+    func: t.Callable[[T], t.Coroutine[t.Any, t.Any, None]],
+    *,
+    lookahead: int,
+) -> t.AsyncIterator[T]:
+    """Yield items once `func` is done with them, while already calling `func`
+    on up to `lookahead` following items."""
+    if lookahead <= 0:
+        async for item in iterator:
+            await func(item)
+            yield item
+        return
+
+    queue: asyncio.Queue[t.Union[tuple[asyncio.Task, T], Exception, None]]
+    queue = asyncio.Queue(maxsize=lookahead)
+
+    async def produce() -> None:
+        try:
+            async with alib.scoped_iter(iterator) as items:
+                async for item in items:
+                    task = asyncio.create_task(func(item))
+                    try:
+                        await queue.put((task, item))
+                    except BaseException:
+                        task.cancel()
+                        raise
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (entry := await queue.get()) is not None:
+            if isinstance(entry, Exception):
+                raise entry
+            task, item = entry
+            await task
+            yield item
+    finally:
+        producer.cancel()
+        pending: set[asyncio.Future] = {producer}
+        while not queue.empty():
+            if isinstance(entry := queue.get_nowait(), tuple):
+                entry[0].cancel()
+                pending.add(entry[0])
+        # Wait for the producer to close the source iterator before returning.
+        await asyncio.wait(pending)
+
+
 async def async_flatten(
     iterator: t.AsyncIterator[list[T]],
 ) -> t.AsyncIterator[T]:
@@ -1,10 +1,16 @@
 import typing as t
 
 import dataclasses
+import enum
 import json
+import re
 from abc import abstractmethod
+from datetime import datetime
+from functools import partial
 
 import pydantic.v1
+import pydantic.v1.datetime_parse
+import pydantic.v1.errors
 import pydantic.v1.json
 
 from .cache import threadsafe_cache
@@ -53,11 +59,285 @@ def json_serializer(*args: t.Any, **kwargs: t.Any) -> str:
     return json.dumps(*args, default=pydantic.v1.json.pydantic_encoder, **kwargs)
 
 
+class ValidationMode(enum.Enum):
+    """How `fromdict` builds an object from a dict.
+
+    * ``strict``: Validate and coerce every field with pydantic.
+    * ``trusted``: Build the object from the dict as is, without validation.
+      Nested objects are not converted.
+    * ``compiled``: Use a generated converter that checks fields types, only
+      coercing common JSON values such as datetime strings, and falls back to
+      ``strict`` for anything else.
+    """
+
+    STRICT = "strict"
+    TRUSTED = "trusted"
+    COMPILED = "compiled"
+
+
+VALIDATION_MODE_ATTR: t.Final[str] = "__datalineup_validation_mode__"
+
+
+def validation_mode(mode: ValidationMode) -> t.Callable[[T], T]:
+    """Set the validation mode of a dataclass, a model or a pipeline.
+
+    >>> @validation_mode(ValidationMode.COMPILED)
+    ... @dataclasses.dataclass
+    ... class Point:
+    ...     x: int
+    ...
+    >>> fromdict({"x": 1}, Point)
+    Point(x=1)
+    """
+
+    def decorator(obj: T) -> T:
+        setattr(obj, VALIDATION_MODE_ATTR, mode)
+        return obj
+
+    return decorator
+
+
+def get_validation_mode(klass: t.Type) -> ValidationMode:
+    return getattr(klass, VALIDATION_MODE_ATTR, None) or ValidationMode.STRICT
+
+
 def fromdict(
-    d: dict[str, t.Any], klass: t.Type[T], *, config: t.Optional[dict] = None
+    d: dict[str, t.Any],
+    klass: t.Type[T],
+    *,
+    config: t.Optional[dict] = None,
+    mode: t.Optional[ValidationMode] = None,
 ) -> T:
+    converter = converter_for(
+        t.cast(t.Hashable, klass), mode or get_validation_mode(klass)
+    )
+    return t.cast(T, converter(d))
+
+
+@threadsafe_cache
+def converter_for(
+    klass: t.Type[T], mode: ValidationMode
+) -> t.Callable[[dict[str, t.Any]], T]:
+    strict = t.cast(
+        t.Callable[[dict[str, t.Any]], T], partial(strict_fromdict, klass=klass)
+    )
+    if mode is ValidationMode.TRUSTED:
+        return _trusted_converter(klass) or strict
+    if mode is ValidationMode.COMPILED:
+        return _compile_converter(klass, strict=strict) or strict
+    return strict
+
+
+def strict_fromdict(d: dict[str, t.Any], klass: t.Type[T]) -> T:
     schema = schema_for(t.cast(t.Hashable, klass))
     obj: pydantic.v1.BaseModel = schema.parse_obj(d)
     if dataclasses.is_dataclass(klass):
         return t.cast(T, klass(**obj.dict()))
     return t.cast(T, obj)
+
+
+def _trusted_converter(
+    klass: t.Type[T],
+) -> t.Optional[t.Callable[[dict[str, t.Any]], T]]:
+    if isinstance(klass, type) and issubclass(klass, pydantic.v1.BaseModel):
+        model = klass
+        return lambda d: t.cast(T, model.construct(**d))
+    if dataclasses.is_dataclass(klass):
+        names = frozenset(f.name for f in dataclasses.fields(klass) if f.init)
+        return lambda d: klass(**{k: v for k, v in d.items() if k in names})
+    return None
+
+
+_EXACT_TYPES: t.Final = (str, int, bool, bytes)
+
+
+class _Fallback(Exception):
+    """Raised by compiled converters when a value needs the strict path."""
+
+
+def _fallback() -> t.NoReturn:
+    raise _Fallback
+
+
+def _to_float(value: t.Any) -> float:
+    if type(value) is int:
+        return float(value)
+    raise _Fallback
+
+
+# Canonical `datetime.isoformat()` strings, parsed the same way by pydantic and
+# `datetime.fromisoformat`.
+_ISO_DATETIME_RE: t.Final = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{6})?(Z|[+-]\d{2}:\d{2})?"
+)
+
+
+def _to_datetime(value: t.Any) -> datetime:
+    if type(value) is str:
+        try:
+            if _ISO_DATETIME_RE.fullmatch(value):
+                return datetime.fromisoformat(value)
+            # Same parser as the one used by pydantic for datetime fields.
+            return pydantic.v1.datetime_parse.parse_datetime(value)
+        except (ValueError, TypeError, pydantic.v1.errors.PydanticValueError):
+            pass
+    raise _Fallback
+
+
+class _NestedConverter:
+    """Convert a nested dataclass, compiling its converter on first use so
+    recursive dataclasses are supported."""
+
+    __slots__ = ("klass", "converter")
+
+    def __init__(self, klass: t.Type) -> None:
+        self.klass = klass
+        self.converter: t.Optional[t.Callable[[dict[str, t.Any]], t.Any]] = None
+
+    def __call__(self, value: t.Any) -> t.Any:
+        if type(value) is self.klass:
+            return value
+        if type(value) is not dict:
+            raise _Fallback
+        if self.converter is None:
+            self.converter = _raw_converter(self.klass) or _unsupported
+        return self.converter(value)
+
+
+def _unsupported(value: dict[str, t.Any]) -> t.NoReturn:
+    raise _Fallback
+
+
+def _field_converter(
+    annotation: t.Any, value: str, namespace: dict[str, t.Any]
+) -> t.Optional[str]:
+    """Return an expression converting `value` the same way pydantic would,
+    or None if the annotation isn't supported."""
+
+    def ref(obj: t.Any) -> str:
+        name = f"_ref_{len(namespace)}"
+        namespace[name] = obj
+        return name
+
+    def typed(typ: type, otherwise: str) -> str:
+        return f"({value} if type({value}) is {ref(typ)} else {otherwise})"
+
+    if annotation is t.Any:
+        return value
+    if hasattr(annotation, "__supertype__"):
+        return _field_converter(annotation.__supertype__, value, namespace)
+    if annotation in _EXACT_TYPES:
+        return typed(annotation, "_fallback()")
+    if annotation is float:
+        return typed(float, f"_to_float({value})")
+    if annotation is datetime:
+        return typed(datetime, f"_to_datetime({value})")
+    if isinstance(annotation, type) and dataclasses.is_dataclass(annotation):
+        return f"{ref(_NestedConverter(annotation))}({value})"
+
+    origin = t.get_origin(annotation)
+    args = t.get_args(annotation)
+    if origin is t.Union:
+        if type(None) in args:
+            inner = [a for a in args if a is not type(None)]
+            inner_converter = _field_converter(t.Union[tuple(inner)], value, namespace)
+            if inner_converter is None:
+                return None
+            return f"(None if {value} is None else {inner_converter})"
+        # Pydantic keeps the first member that validates: only the first one
+        # can be tried, the others might only be used after a coercion failed.
+        return _field_converter(args[0], value, namespace)
+    if annotation is dict or origin is dict:
+        key_type, value_type = args if args else (t.Any, t.Any)
+        if key_type is not t.Any and key_type is not str:
+            return None
+        item = f"{value}_v"
+        item_converter = _field_converter(value_type, item, namespace)
+        if item_converter is None:
+            return None
+        if key_type is t.Any:
+            if item_converter == item:
+                return typed(dict, "_fallback()")
+            key_check = ""
+        else:
+            key_check = f" if type({value}_k) is str or _fallback()"
+        return (
+            f"({{{value}_k: {item_converter}"
+            f" for {value}_k, {item} in {value}.items(){key_check}}}"
+            f" if type({value}) is dict else _fallback())"
+        )
+    if annotation is list or origin is list:
+        item = f"{value}_i"
+        item_converter = _field_converter(args[0] if args else t.Any, item, namespace)
+        if item_converter is None:
+            return None
+        if item_converter == item:
+            return typed(list, "_fallback()")
+        return (
+            f"([{item_converter} for {item} in {value}]"
+            f" if type({value}) is list else _fallback())"
+        )
+    return None
+
+
+@threadsafe_cache
+def _raw_converter(klass: t.Type) -> t.Optional[t.Callable[[dict[str, t.Any]], t.Any]]:
+    """Generate a function building `klass` from a dict, raising `_Fallback`
+    if any field is missing or would need coercion."""
+    if not dataclasses.is_dataclass(klass):
+        return None
+    try:
+        hints = t.get_type_hints(klass)
+    except Exception:
+        return None
+
+    namespace: dict[str, t.Any] = {
+        "klass": klass,
+        "MISSING": dataclasses.MISSING,
+        "_fallback": _fallback,
+        "_to_float": _to_float,
+        "_to_datetime": _to_datetime,
+    }
+    lines = ["def convert(d):", "    kwargs = {}"]
+    for field in dataclasses.fields(klass):
+        if not field.init:
+            continue
+        converter = _field_converter(hints.get(field.name, t.Any), "v", namespace)
+        if converter is None:
+            return None
+        required = (
+            field.default is dataclasses.MISSING
+            and field.default_factory is dataclasses.MISSING
+        )
+        lines += [
+            f"    v = d.get({field.name!r}, MISSING)",
+            "    if v is MISSING:",
+            "        _fallback()" if required else "        pass",
+            "    else:",
+            f"        kwargs[{field.name!r}] = {converter}",
+        ]
+    lines.append("    return klass(**kwargs)")
+
+    # The generated code only references names from `namespace` and the
+    # dataclass fields names, which are valid identifiers.
+    exec("\n".join(lines), namespace)  # noqa: S102
+    return t.cast(t.Callable[[dict[str, t.Any]], t.Any], namespace["convert"])
+
+
+def _compile_converter(
+    klass: t.Type[T], *, strict: t.Callable[[dict[str, t.Any]], T]
+) -> t.Optional[t.Callable[[dict[str, t.Any]], T]]:
+    converter = _raw_converter(klass)
+    if converter is None:
+        return None
+
+    def convert(d: dict[str, t.Any]) -> T:
+        if type(d) is dict:
+            try:
+                return t.cast(T, converter(d))
+            except _Fallback:
+                pass
+        # Let pydantic coerce the values or report the validation errors.
+        return strict(d)
+
+    return convert
@@ -24,6 +24,10 @@ def upsert(
     raise ValueError(f"Dialect {session.bind.dialect} not supported")
 
 
+def is_sqlite(session: AnySession) -> bool:
+    return isinstance(session.get_bind().dialect, sqlite.dialect)
+
+
 def is_sqlite3_connection(connection: t.Any) -> bool:
     from sqlalchemy.dialects.sqlite import aiosqlite  # type: ignore
 
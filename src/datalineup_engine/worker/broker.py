@@ -1,9 +1,12 @@
+import typing as t
 from typing import Optional
 from typing import Protocol
 
 import asyncio
+from collections.abc import Awaitable
 
 from datalineup_engine.config import Config
+from datalineup_engine.utils.asyncutils import gather_limited
 from datalineup_engine.utils.log import getLogger
 
 from .executors.manager import ExecutorsManager
@@ -11,6 +14,8 @@ from .services import Services
 from .services.manager import ServicesManager
 from .work_manager import WorkManager
 
+T = t.TypeVar("T")
+
 
 class WorkManagerInit(Protocol):
     def __call__(self, *, services: Services) -> WorkManager: ...
@@ -91,17 +96,46 @@ class Broker:
                 self.executors_manager.add_queue(queue)
             for resource in work_sync.resources.add:
                 await self.resources_manager.add(resource)
-            for resources_provider in work_sync.resources_providers.add:
-                await resources_provider._open()
-
-            for resources_provider in work_sync.resources_providers.drop:
-                await resources_provider._close()
+            await self.run_concurrently(
+                "open resources provider",
+                lambda provider: provider._open(),
+                work_sync.resources_providers.add,
+            )
+
+            await self.run_concurrently(
+                "close resources provider",
+                lambda provider: provider._close(),
+                work_sync.resources_providers.drop,
+            )
             for resource in work_sync.resources.drop:
                 await self.resources_manager.remove(resource.key)
             for queue in work_sync.queues.drop:
                 self.executors_manager.remove_queue(queue)
-            for executor in work_sync.executors.drop:
-                await self.executors_manager.remove_executor(executor)
+            await self.run_concurrently(
+                "remove executor",
+                self.executors_manager.remove_executor,
+                work_sync.executors.drop,
+            )
+
+    async def run_concurrently(
+        self,
+        action: str,
+        func: t.Callable[[T], Awaitable[object]],
+        items: list[T],
+    ) -> None:
+        """Run `func` on items concurrently. A failing item is logged without
+        preventing the others from completing."""
+        results = await gather_limited(
+            func, items, limit=self.work_manager.open_concurrency
+        )
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                self.logger.error(
+                    "Failed to %s",
+                    action,
+                    exc_info=result,
+                    extra={"data": {"item": str(item)}},
+                )
 
     async def close(self) -> None:
         await self.executors_manager.close()
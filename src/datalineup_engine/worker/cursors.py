@@ -0,0 +1,123 @@
+"""Encoding of inventories cursors states.
+
+States are encoded as JSON objects with a version `v`. Version 1 is plain JSON
+and is kept for small cursors so they stay readable. Once larger than
+`COMPACT_MIN_SIZE`, cursors are encoded in the compact version 2 and are
+compressed once larger than `COMPRESS_MIN_SIZE`.
+
+Workers that can't read version 2 would resume from the whole encoded state,
+so version 2 is only written once enabled with the `job_state.compact_cursors`
+option, after every worker has been upgraded.
+"""
+
+import typing as t
+
+import base64
+import json
+import os
+import zlib
+from contextlib import suppress
+
+from datalineup_engine.core import Cursor
+
+COMPACT_MIN_SIZE: t.Final[int] = 1024
+COMPRESS_MIN_SIZE: t.Final[int] = 4096
+
+
+def encode(state: dict, *, compact: t.Optional[t.Callable[[], dict]]) -> Cursor:
+    """Encode a version 1 `state`, or the version 2 state built by `compact`
+    if the first is too large. Version 2 is never written without `compact`."""
+    raw = json.dumps(state)
+    if compact is None or len(raw) < COMPACT_MIN_SIZE:
+        return Cursor(raw)
+    raw = json.dumps(compact())
+    if len(raw) >= COMPRESS_MIN_SIZE:
+        compressed = base64.b64encode(zlib.compress(raw.encode())).decode()
+        raw = json.dumps({"v": 2, "z": compressed})
+    return Cursor(raw)
+
+
+def decode(raw: Cursor, *, keys: t.Collection[str]) -> t.Optional[dict]:
+    """Decode a versioned cursor state. Return None if `raw` isn't one, such
+    as cursors in the old unstructured format."""
+    with suppress(ValueError, zlib.error):
+        data = json.loads(raw)
+        if isinstance(data, dict) and data.get("v") == 2 and data.keys() == {"v", "z"}:
+            data = json.loads(zlib.decompress(base64.b64decode(data["z"])))
+        if (
+            isinstance(data, dict)
+            and data.get("v") in (1, 2)
+            and not (data.keys() - {"v", *keys})
+        ):
+            return data
+    return None
+
+
+def _is_integer(cursor: str) -> bool:
+    return cursor.isascii() and cursor.isdigit() and (cursor[0] != "0" or cursor == "0")
+
+
+def compact_cursors(cursors: t.Iterable[Cursor]) -> dict:
+    """Encode a set of cursors as ranges of integers `r` and other cursors `p`
+    sharing the prefix `x`.
+
+    >>> compact_cursors(["1", "2", "3", "5", "item-a", "item-b"])
+    {'r': [[1, 3], 5], 'x': 'item-', 'p': ['a', 'b']}
+    """
+    integers: list[int] = []
+    others: list[str] = []
+    for cursor in cursors:
+        if _is_integer(cursor):
+            integers.append(int(cursor))
+        else:
+            others.append(cursor)
+
+    data: dict = {}
+    if integers:
+        ranges: list[t.Any] = []
+        integers.sort()
+        start = end = integers[0]
+        for i in integers[1:]:
+            if i != end + 1:
+                ranges.append([start, end] if start != end else start)
+                start = i
+            end = i
+        ranges.append([start, end] if start != end else start)
+        data["r"] = ranges
+    if others:
+        others.sort()
+        prefix = os.path.commonprefix(others) if len(others) > 1 else ""
+        if prefix:
+            data["x"] = prefix
+        data["p"] = [c[len(prefix) :] for c in others]
+    return data
+
+
+def expand_cursors(data: dict) -> set[Cursor]:
+    """Decode cursors encoded by `compact_cursors`, or a plain list `p`."""
+    prefix = data.get("x", "")
+    cursors = {Cursor(prefix + c) for c in data.get("p") or []}
+    for r in data.get("r") or []:
+        if isinstance(r, list):
+            cursors.update(Cursor(str(i)) for i in range(r[0], r[1] + 1))
+        else:
+            cursors.add(Cursor(str(r)))
+    return cursors
+
+
+def embed(cursor: t.Optional[Cursor]) -> t.Any:
+    """Embed a nested JSON cursor as an object instead of an escaped string."""
+    if cursor is not None and cursor.startswith("{"):
+        with suppress(ValueError):
+            data = json.loads(cursor)
+            if json.dumps(data) == cursor:
+                return data
+    return cursor
+
+
+def unembed(value: t.Any) -> t.Optional[Cursor]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return Cursor(value)
+    return Cursor(json.dumps(value))
@@ -1,8 +1,11 @@
+import typing as t
 from typing import Type
 
+import asyncio
 from abc import ABC
 from abc import abstractmethod
 
+from datalineup_engine.core import PipelineInfo
 from datalineup_engine.core import PipelineResults
 from datalineup_engine.core import api
 from datalineup_engine.utils.inspect import import_name
@@ -13,16 +16,39 @@ from datalineup_engine.worker.services import Services
 
 class Executor(ABC, OptionsSchema):
     name: str
+    # Maximum number of messages dispatched together through `process_messages`
+    # and how long to wait for a batch to fill up. A `batch_size` of 1 disable
+    # batching.
+    batch_size: int = 1
+    batch_flush_after: float = 0.005
 
     @abstractmethod
     async def process_message(self, message: ExecutableMessage) -> PipelineResults:
         pass
 
+    async def process_messages(
+        self, messages: list[ExecutableMessage]
+    ) -> list[t.Union[PipelineResults, BaseException]]:
+        """Process a batch of messages, returning either the results or the
+        error of each message, in order. Executors with a costly dispatch should
+        override this to send the whole batch at once.
+        """
+        return await asyncio.gather(
+            *[self.process_message(message) for message in messages],
+            return_exceptions=True,
+        )
+
     @property
     @abstractmethod
     def concurrency(self) -> int:
         pass
 
+    def add_pipeline(self, info: PipelineInfo) -> None:
+        """Called when a job using this executor is assigned to the worker.
+        Executors can use it to prepare the pipeline ahead of its first message.
+        """
+        pass
+
     async def close(self) -> None:
         pass
 
@@ -1,6 +1,7 @@
 TIMEOUT = 1200
 TIMEOUT_DELAY = 60
 EXECUTE_FUNC_NAME = "remote_execute"
+EXECUTE_BATCH_FUNC_NAME = "remote_execute_batch"
 
 healthcheck_interval = 10
 
@@ -24,6 +24,7 @@ from datalineup_engine.worker.executors.executable import ExecutableMessage
 from datalineup_engine.worker.services import Services
 
 from .. import Executor
+from . import EXECUTE_BATCH_FUNC_NAME
 from . import EXECUTE_FUNC_NAME
 from . import TIMEOUT
 from . import TIMEOUT_DELAY
@@ -49,10 +50,14 @@ class ARQExecutor(Executor):
         queue_name: str = "arq:queue"
         timeout: int = TIMEOUT
         timeout_delay: int = TIMEOUT_DELAY
+        batch_size: int = 1
+        batch_flush_after: float = 0.005
 
     def __init__(self, options: Options, services: Services) -> None:
         self.logger = getLogger(__name__, self)
         self.options = options
+        self.batch_size = options.batch_size
+        self.batch_flush_after = options.batch_flush_after
         self.config = LazyConfig([{ARQ_EXECUTOR_NAMESPACE: self.options}])
 
         meter = get_meter("datalineup.metrics")
@@ -164,18 +169,59 @@ class ARQExecutor(Executor):
         await redis_queue.delete(self.options.queue_name)
 
     async def process_message(self, message: ExecutableMessage) -> PipelineResults:
+        return await self.run_job(
+            EXECUTE_FUNC_NAME,
+            message.message.as_remote(),
+            options=self.message_options(message),
+            name=f"process_message({message.id})",
+        )
+
+    async def process_messages(
+        self, messages: list[ExecutableMessage]
+    ) -> list[t.Union[PipelineResults, BaseException]]:
+        # A job has a single queue and timeout, so messages are sent in a job
+        # per distinct options.
+        groups: dict[tuple, tuple[ARQExecutor.Options, list[int]]] = {}
+        for i, message in enumerate(messages):
+            options = self.message_options(message)
+            key = (options.queue_name, options.timeout, options.timeout_delay)
+            groups.setdefault(key, (options, []))[1].append(i)
+
+        async def run_group(
+            options: ARQExecutor.Options, indexes: list[int]
+        ) -> list[t.Union[PipelineResults, BaseException]]:
+            group = [messages[i] for i in indexes]
+            return await self.run_job(
+                EXECUTE_BATCH_FUNC_NAME,
+                [message.message.as_remote() for message in group],
+                options=options,
+                name=f"process_messages({','.join(m.id for m in group)})",
+            )
+
+        groups_results = await asyncio.gather(
+            *(run_group(options, indexes) for options, indexes in groups.values())
+        )
+        results: dict[int, t.Union[PipelineResults, BaseException]] = {}
+        for (_, indexes), group_results in zip(groups.values(), groups_results):
+            results.update(zip(indexes, group_results))
+        return [results[i] for i in range(len(messages))]
+
+    def message_options(self, message: ExecutableMessage) -> "ARQExecutor.Options":
         config = self.config.load_object(message.config)
-        options = config.cast_namespace(ARQ_EXECUTOR_NAMESPACE, ARQExecutor.Options)
+        return config.cast_namespace(ARQ_EXECUTOR_NAMESPACE, ARQExecutor.Options)
 
+    async def run_job(
+        self, function: str, payload: object, *, options: Options, name: str
+    ) -> t.Any:
         job = await (await self.redis_queue).enqueue_job(
-            EXECUTE_FUNC_NAME,
-            message.message.as_remote(),
+            function,
+            payload,
             _expires=options.timeout + options.timeout_delay,
             _queue_name=options.queue_name,
         )
 
-        tasks = TasksGroup(name=f"datalineup.arq.process_message({message.id})")
-        result_task: asyncio.Task[PipelineResults] = tasks.create_task(
+        tasks = TasksGroup(name=f"datalineup.arq.{name}")
+        result_task: asyncio.Task[t.Any] = tasks.create_task(
             job.result(timeout=options.timeout)
         )
         healthcheck_task = tasks.create_task(self.monitor_job_healthcheck(job))
@@ -5,6 +5,7 @@ import enum
 import logging
 import multiprocessing
 from concurrent import futures
+from functools import partial
 
 import arq.worker
 from arq.connections import ArqRedis
@@ -19,12 +20,16 @@ from datalineup_engine.worker.services.loggers import logger
 from datalineup_engine.worker.services.loggers.logger import pipeline_message_data
 
 from ..bootstrap import PipelineBootstrap
+from ..bootstrap import RemoteException
 from ..bootstrap import wrap_remote_exception
+from . import EXECUTE_BATCH_FUNC_NAME
 from . import EXECUTE_FUNC_NAME
 from . import executor_healthcheck_key
 from . import healthcheck_interval
 from . import worker_healthcheck_key
 
+T = t.TypeVar("T")
+
 
 class WorkerType(enum.Enum):
     PROCESS = "process"
@@ -75,33 +80,69 @@ def remote_bootstrap(message: PipelineMessage) -> PipelineResults:
     return bootstraper.bootstrap_pipeline(message)
 
 
+def remote_bootstrap_batch(
+    messages: list[PipelineMessage],
+) -> list[t.Union[PipelineResults, RemoteException]]:
+    bootstraper = _ensure_bootstraper()
+    return bootstraper.bootstrap_pipelines(messages)
+
+
 async def remote_execute(ctx: Context, message: PipelineMessage) -> PipelineResults:
-    executor = ctx["executor"]
     with wrap_remote_exception():
-        cancellation_token = CancellationToken()
+        return await _run_with_healthcheck(
+            ctx,
+            [message],
+            partial(remote_bootstrap, message),
+            name=message.id,
+        )
+
+
+async def remote_execute_batch(
+    ctx: Context, messages: list[PipelineMessage]
+) -> list[t.Union[PipelineResults, RemoteException]]:
+    with wrap_remote_exception():
+        return await _run_with_healthcheck(
+            ctx,
+            messages,
+            partial(remote_bootstrap_batch, messages),
+            name=",".join(message.id for message in messages),
+        )
+
+
+async def _run_with_healthcheck(
+    ctx: Context,
+    messages: list[PipelineMessage],
+    execute: t.Callable[[], T],
+    *,
+    name: str,
+) -> T:
+    executor = ctx["executor"]
+    cancellation_token = CancellationToken()
+    for message in messages:
         message.set_meta_arg(meta_type=CancellationToken, value=cancellation_token)
 
-        loop = asyncio.get_running_loop()
-        tasks = TasksGroup(name=f"datalineup.arq.remote({message.id})")
-
-        async def execute_message() -> PipelineResults:
-            return await loop.run_in_executor(executor, remote_bootstrap, message)
-
-        executor_task = tasks.create_task(execute_message())
-        healthcheck_task = tasks.create_task(remote_job_healthcheck(ctx))
-        async with tasks:
-            while not (done := await tasks.wait(remove=False)):
-                pass
-            if executor_task in done:
-                tasks.remove(executor_task)
-                return executor_task.result()
-            if healthcheck_task in done:
-                cancellation_token._cancel()
+    loop = asyncio.get_running_loop()
+    tasks = TasksGroup(name=f"datalineup.arq.remote({name})")
+
+    async def execute_messages() -> T:
+        return await loop.run_in_executor(executor, execute)
+
+    executor_task = tasks.create_task(execute_messages())
+    healthcheck_task = tasks.create_task(remote_job_healthcheck(ctx))
+    async with tasks:
+        while not (done := await tasks.wait(remove=False)):
+            pass
+        if executor_task in done:
+            tasks.remove(executor_task)
+            return executor_task.result()
+        if healthcheck_task in done:
+            cancellation_token._cancel()
+            for message in messages:
                 logging.getLogger(__name__).error(
                     "Worker died", extra={"data": pipeline_message_data(message)}
                 )
-                raise RuntimeError("Job Cancelled")
-            raise RuntimeError("Unreachable")
+            raise RuntimeError("Job Cancelled")
+        raise RuntimeError("Unreachable")
 
 
 async def remote_job_healthcheck(ctx: Context) -> None:
@@ -159,7 +200,12 @@ class WorkerSettings:
             remote_execute,  # type: ignore[arg-type]
             name=EXECUTE_FUNC_NAME,
             max_tries=1,
-        )
+        ),
+        arq.worker.func(
+            remote_execute_batch,  # type: ignore[arg-type]
+            name=EXECUTE_BATCH_FUNC_NAME,
+            max_tries=1,
+        ),
     ]
     on_startup = startup
     on_shutdown = shutdown
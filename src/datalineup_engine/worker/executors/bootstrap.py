@@ -1,3 +1,5 @@
+import typing as t
+
 import contextlib
 import logging
 from collections.abc import Generator
@@ -6,6 +8,7 @@ from collections.abc import Iterator
 
 from pydantic.v1 import ValidationError
 
+from datalineup_engine.core import PipelineInfo
 from datalineup_engine.core import PipelineOutput
 from datalineup_engine.core import PipelineResults
 from datalineup_engine.core import ResourceUsed
@@ -17,6 +20,7 @@ from datalineup_engine.utils.hooks import EventHook
 from datalineup_engine.utils.traceback_data import TracebackData
 from datalineup_engine.worker.context import message_context
 from datalineup_engine.worker.context import pipeline_context
+from datalineup_engine.worker.pipeline_message import CompiledPipeline
 from datalineup_engine.worker.pipeline_message import PipelineMessage
 
 PipelineHook = ContextHook[PipelineMessage, PipelineResults]
@@ -27,18 +31,51 @@ class PipelineBootstrap:
         self.pipeline_hook: PipelineHook = ContextHook(
             error_handler=self.pipeline_hook_failed
         )
+        # Pipelines are compiled once per process, keyed by their name.
+        self.pipelines: dict[str, CompiledPipeline] = {}
         initialized_hook.emit(self)
 
         self.logger = logging.getLogger("datalineup.bootstrap")
 
+    def compiled_pipeline(self, info: PipelineInfo) -> CompiledPipeline:
+        pipeline = self.pipelines.get(info.name)
+        if pipeline is None:
+            pipeline = CompiledPipeline.from_info(info)
+            self.pipelines[info.name] = pipeline
+        return pipeline
+
+    def warmup(self, pipelines: Iterable[PipelineInfo]) -> None:
+        """Import and compile pipelines ahead of their first message."""
+        for info in pipelines:
+            try:
+                self.compiled_pipeline(info)
+            except Exception:
+                self.logger.exception(
+                    "Failed to warm up pipeline",
+                    extra={"data": {"pipeline": info.name}},
+                )
+
     def bootstrap_pipeline(self, message: PipelineMessage) -> PipelineResults:
         message.set_meta_arg(meta_type=TopicMessage, value=message.message)
         with pipeline_context(message.info), message_context(message.message):
             return self.pipeline_hook.emit(self.run_pipeline)(message)
 
+    def bootstrap_pipelines(
+        self, messages: list[PipelineMessage]
+    ) -> list[t.Union[PipelineResults, "RemoteException"]]:
+        """Run a batch of messages, isolating each message failure."""
+        results: list[t.Union[PipelineResults, RemoteException]] = []
+        for message in messages:
+            try:
+                with wrap_remote_exception():
+                    results.append(self.bootstrap_pipeline(message))
+            except RemoteException as e:
+                results.append(e)
+        return results
+
     def run_pipeline(self, message: PipelineMessage) -> PipelineResults:
         try:
-            execute_result = message.execute()
+            execute_result = message.execute(self.compiled_pipeline(message.info))
         except ValidationError:
             self.logger.error(
                 "Failed to deserialize message",
@@ -113,6 +113,7 @@ class ExecutableQueue:
 
         self.definition = definition
         self.name: str = definition.name
+        self.labels = definition.labels
         self.pipeline = definition.pipeline
         self.executor = definition.executor
 
@@ -136,6 +137,11 @@ class ExecutableQueue:
         batching_enabled: bool = False
         buffer_flush_after: t.Optional[float] = 5
         buffer_size: t.Optional[int] = 10
+        #: Number of batches emitted ahead of the one being processed. Hooks
+        #: loading cursors states for a batch might not see the states still
+        #: pending from earlier batches, so only enable it for jobs whose
+        #: batches never share cursors.
+        batches_lookahead: int = 0
         max_concurrency: t.Optional[int] = None
 
     async def run(self) -> AsyncGenerator[ExecutableMessage, None]:
@@ -271,11 +277,16 @@ class ExecutableQueue:
     async def log_message_error(self, error: Exception) -> None:
         self.logger.error("Failed to process message", exc_info=error)
 
-    async def _emit_batches(
+    def _emit_batches(
         self, iterator: t.AsyncIterator[list[tuple[TopicOutput, TopicMessage]]]
     ) -> t.AsyncIterator[list[tuple[TopicOutput, TopicMessage]]]:
-        async for items in iterator:
-            await self.services.s.hooks.items_batched.emit(
-                ItemsBatch(items=[i for _, i in items], job=self.definition)
-            )
-            yield items
+        # Emit the next batches while the current one is processed, so hooks
+        # loading their states don't stall the queue.
+        return iterators.async_lookahead(
+            iterator, self._emit_batch, lookahead=self.options.batches_lookahead
+        )
+
+    async def _emit_batch(self, items: list[tuple[TopicOutput, TopicMessage]]) -> None:
+        await self.services.s.hooks.items_batched.emit(
+            ItemsBatch(items=[i for _, i in items], job=self.definition)
+        )
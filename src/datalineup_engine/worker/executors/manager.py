@@ -1,5 +1,9 @@
+import typing as t
+
 import asyncio
 
+from opentelemetry.metrics import get_meter
+
 from datalineup_engine.core import api
 from datalineup_engine.utils.asyncutils import TasksGroupRunner
 from datalineup_engine.utils.log import getLogger
@@ -11,6 +15,8 @@ from .executable import ExecutableMessage
 from .executable import ExecutableQueue
 from .queue import ExecutorQueue
 from .scheduler import Scheduler
+from .scheduler import SchedulingPolicy
+from .scheduler import build_scheduling_policy
 
 
 class ExecutorsManager:
@@ -76,15 +82,30 @@ class ExecutorWorker:
         *,
         executor: Executor,
         services: Services,
+        scheduling_policy: t.Optional[SchedulingPolicy] = None,
     ) -> None:
         self.services = services
         self.executor_queue = ExecutorQueue(
             executor=executor,
             services=services,
+            on_executed=self.on_executed,
+        )
+        self.scheduler: Scheduler[ExecutableMessage] = Scheduler(
+            policy=scheduling_policy
         )
-        self.scheduler: Scheduler[ExecutableMessage] = Scheduler()
         self.logger = getLogger(__name__, self)
 
+        meter = get_meter("datalineup.metrics")
+        self.scheduled_counter = meter.create_counter(
+            name="datalineup.scheduler.scheduled",
+            description="Counts the messages scheduled from each queue.",
+        )
+        self.cost_counter = meter.create_counter(
+            name="datalineup.scheduler.cost",
+            unit="s",
+            description="Sums the execution time of the messages of each queue.",
+        )
+
     @classmethod
     def from_item(
         cls,
@@ -93,20 +114,28 @@ class ExecutorWorker:
         services: Services,
     ) -> "ExecutorWorker":
         executor = build_executor(executor_definition, services=services)
+        scheduling_policy = None
+        if scheduler := executor_definition.options.get("scheduler"):
+            scheduling_policy = build_scheduling_policy(
+                scheduler["type"], scheduler.get("options")
+            )
         return cls(
             executor=executor,
             services=services,
+            scheduling_policy=scheduling_policy,
         )
 
     async def run(self) -> None:
         """
-        Coroutine that keep polling the queues in round-robin and execute their
-        pipeline through an executor.
+        Coroutine that keep polling the queues in the order of the scheduling
+        policy, round-robin by default, and execute their pipeline through an
+        executor.
         """
         self.executor_queue.start()
 
         # Go through all queue in the Ready state.
         async for message in self.scheduler.run():
+            self.scheduled_counter.add(1, self.metrics_params(message))
             with message.datalineup_context():
                 await self.services.s.hooks.message_scheduled.emit(message)
                 await self.executor_queue.submit(message)
@@ -119,7 +148,19 @@ class ExecutorWorker:
         await self.executor_queue.close()
 
     def add_schedulable(self, schedulable: ExecutableQueue) -> None:
+        self.executor_queue.executor.add_pipeline(schedulable.pipeline.info)
         self.scheduler.add(schedulable)
 
     def remove_schedulable(self, schedulable: ExecutableQueue) -> None:
         self.scheduler.remove(schedulable)
+
+    def on_executed(self, message: ExecutableMessage, cost: float) -> None:
+        self.scheduler.record_cost(message.queue, cost)
+        self.cost_counter.add(cost, self.metrics_params(message))
+
+    def metrics_params(self, message: ExecutableMessage) -> dict[str, str]:
+        return {
+            "datalineup.executor.name": self.executor_queue.executor.name,
+            "datalineup.job.name": message.queue.name,
+            "datalineup.scheduler.policy": type(self.scheduler.policy).__name__,
+        }
@@ -7,6 +7,7 @@ import enum
 import os
 from functools import partial
 
+from datalineup_engine.core import PipelineInfo
 from datalineup_engine.core import PipelineResults
 from datalineup_engine.utils.hooks import EventHook
 from datalineup_engine.worker.executors.executable import ExecutableMessage
@@ -14,21 +15,39 @@ from datalineup_engine.worker.pipeline_message import PipelineMessage
 from datalineup_engine.worker.services import Services
 
 from . import Executor
+from . import shared_memory
 from .bootstrap import PipelineBootstrap
+from .bootstrap import RemoteException
 from .bootstrap import wrap_remote_exception
+from .shared_memory import SharedMemoryPool
+from .shared_memory import SharedPayload
 
 _bootstraper = None
 
+A = t.TypeVar("A")
+R = t.TypeVar("R")
+
+
+def _unlink_result(future: "concurrent.futures.Future[SharedPayload]") -> None:
+    if not future.cancelled() and future.exception() is None:
+        shared_memory.unlink_payload(future.result())
+
 
 class PoolType(enum.Enum):
     PROCESS = "process"
     THREAD = "thread"
 
 
+class TransportType(enum.Enum):
+    PICKLE = "pickle"
+    SHARED_MEMORY = "shared_memory"
+
+
 def process_initializer(
     *,
     executor_initialized: EventHook[PipelineBootstrap],
     pool_type: PoolType,
+    warmup_pipelines: t.Optional[dict[str, PipelineInfo]] = None,
 ) -> None:
     global _bootstraper
 
@@ -40,6 +59,8 @@ def process_initializer(
         signal.signal(signal.SIGINT, signal.SIG_IGN)
 
     _bootstraper = PipelineBootstrap(initialized_hook=executor_initialized)
+    if warmup_pipelines:
+        _bootstraper.warmup(list(warmup_pipelines.values()))
 
 
 class ProcessExecutor(Executor):
@@ -47,9 +68,38 @@ class ProcessExecutor(Executor):
     class Options:
         max_workers: t.Optional[int] = None
         pool_type: PoolType = PoolType.PROCESS
+        batch_size: int = 1
+        batch_flush_after: float = 0.005
+        # With the `shared_memory` transport, buffers of at least
+        # `shared_memory_min_size` bytes are passed to process workers through
+        # shared memory instead of the executor pipe.
+        transport: TransportType = TransportType.PICKLE
+        shared_memory_min_size: int = shared_memory.DEFAULT_MIN_SIZE
+        shared_memory_max_cached_bytes: int = shared_memory.DEFAULT_MAX_CACHED_BYTES
+        # Import the pipelines of the jobs assigned before the pool workers
+        # start, instead of on their first message.
+        warmup: bool = False
 
     def __init__(self, options: Options, services: Services) -> None:
         self.max_workers = options.max_workers or os.cpu_count() or 1
+        self.batch_size = options.batch_size
+        self.batch_flush_after = options.batch_flush_after
+        # Pool workers are started lazily, so pipelines added before the first
+        # message are passed to the worker initializer.
+        self.warmup_pipelines: t.Optional[dict[str, PipelineInfo]] = (
+            {} if options.warmup else None
+        )
+
+        self.shared_memory: t.Optional[SharedMemoryPool] = None
+        self.shared_memory_min_size = options.shared_memory_min_size
+        if (
+            options.transport is TransportType.SHARED_MEMORY
+            and options.pool_type is PoolType.PROCESS
+        ):
+            shared_memory.ensure_tracker_running()
+            self.shared_memory = SharedMemoryPool(
+                max_cached_bytes=options.shared_memory_max_cached_bytes
+            )
 
         pool_cls: t.Union[
             t.Type[concurrent.futures.ProcessPoolExecutor],
@@ -66,13 +116,63 @@ class ProcessExecutor(Executor):
                 process_initializer,
                 executor_initialized=services.s.hooks.executor_initialized,
                 pool_type=options.pool_type,
+                warmup_pipelines=self.warmup_pipelines,
             ),
         )
 
     async def process_message(self, message: ExecutableMessage) -> PipelineResults:
+        return await self.remote_call(self.remote_execute, message.message.as_remote())
+
+    async def process_messages(
+        self, messages: list[ExecutableMessage]
+    ) -> list[t.Union[PipelineResults, BaseException]]:
+        return list(
+            await self.remote_call(
+                self.remote_execute_batch,
+                [message.message.as_remote() for message in messages],
+            )
+        )
+
+    async def remote_call(self, func: t.Callable[[A], R], arg: A) -> R:
         loop = asyncio.get_running_loop()
-        execute = partial(self.remote_execute, message=message.message.as_remote())
-        return await loop.run_in_executor(self.pool_executor, execute)
+        if not self.shared_memory:
+            return await loop.run_in_executor(self.pool_executor, func, arg)
+
+        payload, segments = shared_memory.dumps(
+            arg,
+            allocate=self.shared_memory.allocate,
+            release=self.shared_memory.release,
+            min_size=self.shared_memory_min_size,
+        )
+        execute = partial(
+            self.remote_execute_shared,
+            func,
+            payload,
+            min_size=self.shared_memory_min_size,
+        )
+        future = self.pool_executor.submit(execute)
+        try:
+            result = await asyncio.wrap_future(future, loop=loop)
+        except asyncio.CancelledError:
+            # The worker might still be reading the segments, don't reuse them.
+            for segment in segments:
+                self.shared_memory.discard(segment)
+            # Nobody will load the results anymore, destroy their segments
+            # once the worker is done.
+            future.add_done_callback(_unlink_result)
+            raise
+        except BaseException:
+            for segment in segments:
+                self.shared_memory.release(segment)
+            raise
+
+        for segment in segments:
+            self.shared_memory.release(segment)
+        return shared_memory.loads(result, unlink=True)
+
+    def add_pipeline(self, info: PipelineInfo) -> None:
+        if self.warmup_pipelines is not None:
+            self.warmup_pipelines[info.name] = info
 
     @property
     def concurrency(self) -> int:
@@ -80,6 +180,8 @@ class ProcessExecutor(Executor):
 
     async def close(self) -> None:
         self.pool_executor.shutdown(wait=False, cancel_futures=True)
+        if self.shared_memory:
+            self.shared_memory.close()
 
     @staticmethod
     def remote_execute(message: PipelineMessage) -> PipelineResults:
@@ -87,3 +189,25 @@ class ProcessExecutor(Executor):
             raise ValueError("process_initializer must be called")
         with wrap_remote_exception():
             return _bootstraper.bootstrap_pipeline(message)
+
+    @staticmethod
+    def remote_execute_batch(
+        messages: list[PipelineMessage],
+    ) -> list[t.Union[PipelineResults, RemoteException]]:
+        if not _bootstraper:
+            raise ValueError("process_initializer must be called")
+        return _bootstraper.bootstrap_pipelines(messages)
+
+    @staticmethod
+    def remote_execute_shared(
+        func: t.Callable[[t.Any], object], payload: SharedPayload, *, min_size: int
+    ) -> SharedPayload:
+        result = func(shared_memory.loads(payload))
+        # The segments are owned by the host process once sent, it unlinks them
+        # after loading the results.
+        result_payload, segments = shared_memory.dumps(
+            result, allocate=shared_memory.create_segment, min_size=min_size
+        )
+        for segment in segments:
+            segment.close()
+        return result_payload
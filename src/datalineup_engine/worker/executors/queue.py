@@ -7,6 +7,7 @@ import sys
 
 from datalineup_engine.core import PipelineOutput
 from datalineup_engine.core import PipelineResults
+from datalineup_engine.core import TopicMessage
 from datalineup_engine.utils import ExceptionGroup
 from datalineup_engine.utils.asyncutils import Cancellable
 from datalineup_engine.utils.asyncutils import TasksGroupRunner
@@ -18,6 +19,7 @@ from datalineup_engine.worker.services import Services
 from datalineup_engine.worker.services.hooks import MessagePublished
 from datalineup_engine.worker.services.hooks import PipelineEventsEmitted
 from datalineup_engine.worker.services.hooks import ResultsProcessed
+from datalineup_engine.worker.topic import Topic
 
 from . import Executor
 from .executable import ExecutableMessage
@@ -30,8 +32,10 @@ class ExecutorQueue:
         self,
         executor: Executor,
         services: Services,
+        on_executed: t.Optional[t.Callable[[ExecutableMessage, float], None]] = None,
     ) -> None:
         self.logger = getLogger(__name__, self)
+        self.on_executed = on_executed
         self.submit_lock = asyncio.Lock()
         self.queue: asyncio.Queue[ExecutableMessage] = asyncio.Queue(maxsize=1)
         self.submit_tasks = TasksGroupRunner(name="executor-submit")
@@ -47,9 +51,12 @@ class ExecutorQueue:
         self.is_running = True
         for i in range(self.executor.concurrency):
             self.logger.debug("Spawning new queue task")
-            self.processing_tasks.create_task(
-                self.run_queue(), name=f"executor-queue-{i}"
+            run_queue = (
+                self.run_batch_queue()
+                if self.executor.batch_size > 1
+                else self.run_queue()
             )
+            self.processing_tasks.create_task(run_queue, name=f"executor-queue-{i}")
         self.consuming_tasks.start()
         self.submit_tasks.start()
         self.processing_tasks.start()
@@ -57,59 +64,112 @@ class ExecutorQueue:
     async def run_queue(self) -> None:
         while self.is_running:
             processable = await self.poll()
-            processable._executing_context.callback(self.queue.task_done)
-            with contextlib.suppress(BaseException), processable.datalineup_context():
-                async with (
-                    processable._context,
-                    processable._executing_context,
-                ):
-
-                    @self.services.s.hooks.message_executed.emit
-                    async def scope(
-                        xmsg: ExecutableMessage,
-                    ) -> PipelineResults:
-                        try:
-                            return await self.executor.process_message(xmsg)
-                        except Exception:
-                            exc_type, exc_value, exc_traceback = sys.exc_info()
-                            assert (  # noqa: S101
-                                exc_type and exc_value and exc_traceback
-                            )
-                            process_pipeline_exception(
-                                queue=xmsg.queue.definition,
-                                message=xmsg.message.message,
-                                exc_type=exc_type,
-                                exc_value=exc_value,
-                                exc_traceback=exc_traceback,
-                            )
-                            raise
+            await self.process(processable, execute=self.executor.process_message)
+
+    async def run_batch_queue(self) -> None:
+        while self.is_running:
+            processables = await self.poll_batch()
+            batch = MessagesBatch(executor=self.executor, size=len(processables))
+            await asyncio.gather(
+                *[
+                    self.process_in_batch(processable, batch=batch)
+                    for processable in processables
+                ]
+            )
+
+    async def poll_batch(self) -> list[ExecutableMessage]:
+        """Wait for a first message, then collect messages until the batch is
+        full or `batch_flush_after` elapsed."""
+        loop = asyncio.get_running_loop()
+        processables = [await self.poll()]
+        flush_at = loop.time() + self.executor.batch_flush_after
+        while len(processables) < self.executor.batch_size:
+            try:
+                processables.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = flush_at - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                processables.append(await asyncio.wait_for(self.poll(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return processables
+
+    async def process_in_batch(
+        self, processable: ExecutableMessage, *, batch: "MessagesBatch"
+    ) -> None:
+        try:
+            await self.process(processable, execute=batch.execute)
+        finally:
+            # Ensure the batch doesn't wait on a message that never reached
+            # the executor.
+            await batch.discard(processable)
 
-                    results = None
-                    error = None
+    async def process(
+        self,
+        processable: ExecutableMessage,
+        *,
+        execute: t.Callable[[ExecutableMessage], t.Awaitable[PipelineResults]],
+    ) -> None:
+        processable._executing_context.callback(self.queue.task_done)
+        with contextlib.suppress(BaseException), processable.datalineup_context():
+            async with (
+                processable._context,
+                processable._executing_context,
+            ):
+
+                @self.services.s.hooks.message_executed.emit
+                async def scope(
+                    xmsg: ExecutableMessage,
+                ) -> PipelineResults:
                     try:
-                        results = await scope(processable)
-                    except HandledError as e:
-                        results = e.results
-                        error = e
-                    finally:
-                        if results:
-                            self.consuming_tasks.create_task(
-                                self.process_results(
-                                    xmsg=processable,
-                                    results=results,
-                                    # Transfer the message context to the results
-                                    # processing scope.
-                                    context=processable._context.pop_all(),
-                                    context_error=(
-                                        error if error and not error.handled else None
-                                    ),
-                                )
+                        return await execute(xmsg)
+                    except Exception:
+                        exc_type, exc_value, exc_traceback = sys.exc_info()
+                        assert exc_type and exc_value and exc_traceback  # noqa: S101
+                        process_pipeline_exception(
+                            queue=xmsg.queue.definition,
+                            message=xmsg.message.message,
+                            exc_type=exc_type,
+                            exc_value=exc_value,
+                            exc_traceback=exc_traceback,
+                        )
+                        raise
+
+                results = None
+                error = None
+                started_at = asyncio.get_running_loop().time()
+                try:
+                    results = await scope(processable)
+                except HandledError as e:
+                    results = e.results
+                    error = e
+                finally:
+                    if self.on_executed:
+                        cost = asyncio.get_running_loop().time() - started_at
+                        self.on_executed(processable, cost)
+                    if results:
+                        self.consuming_tasks.create_task(
+                            self.process_results(
+                                xmsg=processable,
+                                results=results,
+                                # Transfer the message context to the results
+                                # processing scope.
+                                context=processable._context.pop_all(),
+                                context_error=(
+                                    error if error and not error.handled else None
+                                ),
                             )
+                        )
 
-                            processable.update_resources_used(results.resources)
+                        processable.update_resources_used(results.resources)
 
-                    if error:
-                        error.reraise()
+                if error:
+                    error.reraise()
 
     async def process_results(
         self,
@@ -196,37 +256,83 @@ class ExecutorQueue:
         self, *, processable: ExecutableMessage, output: list[PipelineOutput]
     ) -> None:
         try:
+            publishes = [
+                (item, topic)
+                for item in output
+                for topic in processable.output.get(item.channel, [])
+            ]
+            # Messages published to the same topic are sent together, so
+            # outputs to different topics are published concurrently. Outputs
+            # that couldn't be published at once fall back to blocking
+            # publishes, one after the other in the outputs order.
+            finished = [asyncio.Event() for _ in publishes]
+            batches: dict[int, OutputsBatch] = {}
+            for key, (_, topic) in enumerate(publishes):
+                if topic is not None:
+                    batch = batches.setdefault(id(topic), OutputsBatch(topic=topic))
+                    batch.add(key)
+
+            results = await asyncio.gather(
+                *(
+                    self.publish_output(
+                        processable=processable,
+                        item=item,
+                        topic=topic,
+                        batch=batches.get(id(topic)),
+                        key=key,
+                        finished=finished,
+                    )
+                    for key, (item, topic) in enumerate(publishes)
+                ),
+                return_exceptions=True,
+            )
             errors = []
-            for item in output:
-                topics = processable.output.get(item.channel, [])
-                for topic in topics:
+            for result in results:
+                if isinstance(result, Exception):
+                    errors.append(result)
+                elif isinstance(result, BaseException):
+                    raise result
+            if errors:
+                raise ExceptionGroup("Failed to process outputs", errors)
 
-                    @self.services.s.hooks.message_published.emit
-                    async def scope(message_published: MessagePublished) -> None:
-                        if topic is None:
-                            return
-                        with contextlib.suppress(Exception):
-                            if await topic.publish(item.message, wait=False):
-                                return
+        finally:
+            await processable.unpark()
 
-                        @self.services.s.hooks.output_blocked.emit
-                        async def scope(_: MessagePublished) -> None:
-                            processable.park()
-                            await topic.publish(item.message, wait=True)
+    async def publish_output(
+        self,
+        *,
+        processable: ExecutableMessage,
+        item: PipelineOutput,
+        topic: Topic,
+        batch: t.Optional["OutputsBatch"],
+        key: int,
+        finished: list[asyncio.Event],
+    ) -> None:
+        @self.services.s.hooks.message_published.emit
+        async def scope(message_published: MessagePublished) -> None:
+            if topic is None or batch is None:
+                return
+            published = False
+            with contextlib.suppress(Exception):
+                published = await batch.publish(key, item.message)
+            for previous in finished[:key]:
+                await previous.wait()
+            if published:
+                return
 
-                        await scope(message_published)
+            @self.services.s.hooks.output_blocked.emit
+            async def scope(_: MessagePublished) -> None:
+                processable.park()
+                await topic.publish(item.message, wait=True)
 
-                    try:
-                        await scope(
-                            MessagePublished(xmsg=processable, topic=topic, output=item)
-                        )
-                    except Exception as e:
-                        errors.append(e)
-            if errors:
-                raise ExceptionGroup("Failed to process outputs", errors)
+            await scope(message_published)
 
+        try:
+            await scope(MessagePublished(xmsg=processable, topic=topic, output=item))
         finally:
-            await processable.unpark()
+            if batch is not None:
+                await batch.discard(key)
+            finished[key].set()
 
     async def close(self) -> None:
         self.is_running = False
@@ -243,3 +349,112 @@ class ExecutorQueue:
 
         self.logger.debug("Closing executor")
         await self.executor.close()
+
+
+class MessagesBatch:
+    """Collect the messages of a batch as they reach the executor and dispatch
+    them together once every message of the batch is either ready or discarded.
+    """
+
+    def __init__(self, *, executor: Executor, size: int) -> None:
+        self.executor = executor
+        self.size = size
+        self.arrived: set[int] = set()
+        self.messages: list[ExecutableMessage] = []
+        self.futures: list[asyncio.Future[PipelineResults]] = []
+
+    async def execute(self, xmsg: ExecutableMessage) -> PipelineResults:
+        future: asyncio.Future[PipelineResults] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.messages.append(xmsg)
+        self.futures.append(future)
+        await self._done_waiting(xmsg)
+        return await future
+
+    async def discard(self, xmsg: ExecutableMessage) -> None:
+        await self._done_waiting(xmsg)
+
+    async def _done_waiting(self, xmsg: ExecutableMessage) -> None:
+        if id(xmsg) in self.arrived:
+            return
+        self.arrived.add(id(xmsg))
+        if len(self.arrived) == self.size and self.messages:
+            await self.dispatch()
+
+    async def dispatch(self) -> None:
+        results: list[t.Union[PipelineResults, BaseException]]
+        try:
+            results = await self.executor.process_messages(self.messages)
+            if len(results) != len(self.messages):
+                raise ValueError("Executor returned an invalid number of results")
+        except asyncio.CancelledError:
+            for future in self.futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(self.messages)
+
+        for future, result in zip(self.futures, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class OutputsBatch:
+    """Collect the messages a pipeline publishes to a topic and publish them
+    together once every message is either ready or discarded.
+
+    Messages that weren't published fall back to a blocking publish.
+    """
+
+    def __init__(self, *, topic: Topic) -> None:
+        self.topic = topic
+        self.keys: list[int] = []
+        self.arrived: set[int] = set()
+        self.messages: dict[int, TopicMessage] = {}
+        self.futures: dict[int, asyncio.Future[bool]] = {}
+
+    def add(self, key: int) -> None:
+        self.keys.append(key)
+
+    async def publish(self, key: int, message: TopicMessage) -> bool:
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self.messages[key] = message
+        self.futures[key] = future
+        await self._done_waiting(key)
+        return await future
+
+    async def discard(self, key: int) -> None:
+        await self._done_waiting(key)
+
+    async def _done_waiting(self, key: int) -> None:
+        if key in self.arrived:
+            return
+        self.arrived.add(key)
+        if len(self.arrived) == len(self.keys) and self.messages:
+            await self.dispatch()
+
+    async def dispatch(self) -> None:
+        keys = sorted(self.messages)
+        futures = [self.futures[key] for key in keys]
+        results: list[t.Union[bool, Exception]]
+        try:
+            results = await self.topic.publish_many(
+                [self.messages[key] for key in keys], wait=False
+            )
+            if len(results) != len(keys):
+                raise ValueError("Topic returned an invalid number of results")
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(keys)
+
+        for future, result in zip(futures, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
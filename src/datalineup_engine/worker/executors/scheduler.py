@@ -2,12 +2,16 @@ import typing as t
 
 import asyncio
 import dataclasses
+import itertools
+import math
 from collections.abc import AsyncGenerator
 from collections.abc import AsyncIterator
 from collections.abc import Coroutine
 
 from datalineup_engine.utils.asyncutils import TasksGroup
+from datalineup_engine.utils.inspect import import_name
 from datalineup_engine.utils.log import getLogger
+from datalineup_engine.utils.options import OptionsSchema
 
 T = t.TypeVar("T")
 
@@ -15,12 +19,30 @@ T = t.TypeVar("T")
 class SchedulableProtocol(t.Protocol, t.Generic[T]):
     iterable: AsyncGenerator[T, None]
     name: str
+    labels: dict[str, str]
 
 
 @dataclasses.dataclass(eq=False)
 class Schedulable(t.Generic[T]):
     iterable: AsyncGenerator[T, None]
     name: str
+    labels: dict[str, str] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class SchedulingStats:
+    #: Number of items scheduled.
+    scheduled: int = 0
+    #: Number of items whose cost was recorded and their total cost.
+    executed: int = 0
+    cost: float = 0
+    #: Exponential moving average of the items cost.
+    average_cost: t.Optional[float] = None
+    #: Values used by the scheduling policy.
+    weight: float = 1
+    priority: float = 0
+    virtual_time: float = 0
+    deficit: float = 0
 
 
 @dataclasses.dataclass
@@ -28,32 +50,223 @@ class ScheduleSlot(t.Generic[T]):
     generator: AsyncGenerator[T, None]
     task: asyncio.Task
     future: asyncio.Future[None]
+    #: Turn of the slot, the least recently scheduled slots come first.
     order: int = 0
     is_running: bool = True
+    index: int = 0
+    stats: SchedulingStats = dataclasses.field(default_factory=SchedulingStats)
+
+
+class SchedulingPolicy(OptionsSchema):
+    """Decide which ready item the scheduler yields first. Items are yielded in
+    the order of the key returned by `priority`, lowest first.
+
+    The default policy is round-robin, the item whose slot was scheduled least
+    recently comes first.
+    """
+
+    COST_SMOOTHING: t.ClassVar[float] = 0.2
+
+    @dataclasses.dataclass
+    class Options:
+        pass
+
+    def __init__(self, options: Options, **kwargs: object) -> None:
+        pass
+
+    def add(self, item: SchedulableProtocol, slot: ScheduleSlot) -> None:
+        pass
+
+    def priority(self, slot: ScheduleSlot) -> tuple[float, ...]:
+        return (slot.order,)
+
+    def scheduled(self, slot: ScheduleSlot) -> None:
+        pass
+
+    def executed(self, slot: ScheduleSlot, cost: float) -> None:
+        stats = slot.stats
+        if stats.average_cost is None:
+            stats.average_cost = cost
+        else:
+            stats.average_cost += (cost - stats.average_cost) * self.COST_SMOOTHING
+
+
+def label_value(item: SchedulableProtocol, label: str, default: float) -> float:
+    value = item.labels.get(label)
+    return float(value) if value is not None else default
+
+
+class RoundRobinPolicy(SchedulingPolicy):
+    pass
+
+
+class WeightedFairQueuingPolicy(SchedulingPolicy):
+    """Schedule items in proportion of their job weight label.
+
+    Slots are ordered by the virtual start time of their next item, which is
+    advanced by the inverse of their weight every time they are scheduled.
+    Slots that were idle restart from the current virtual time so they can't
+    build up credit.
+    """
+
+    @dataclasses.dataclass
+    class Options:
+        weight_label: str = "datalineup.io/scheduling-weight"
+        default_weight: float = 1
+
+    def __init__(self, options: Options, **kwargs: object) -> None:
+        self.options = options
+        self.virtual_time: float = 0
+
+    def add(self, item: SchedulableProtocol, slot: ScheduleSlot) -> None:
+        weight = label_value(
+            item, self.options.weight_label, self.options.default_weight
+        )
+        slot.stats.weight = max(weight, 1e-9)
+        slot.stats.virtual_time = self.virtual_time
+
+    def priority(self, slot: ScheduleSlot) -> tuple[float, ...]:
+        return (max(self.virtual_time, slot.stats.virtual_time),)
+
+    def scheduled(self, slot: ScheduleSlot) -> None:
+        start = max(self.virtual_time, slot.stats.virtual_time)
+        self.virtual_time = start
+        slot.stats.virtual_time = start + 1 / slot.stats.weight
+
+
+class StrictPriorityPolicy(SchedulingPolicy):
+    """Always schedule items from the jobs with the highest priority label
+    first, in round-robin between jobs of the same priority."""
+
+    @dataclasses.dataclass
+    class Options:
+        priority_label: str = "datalineup.io/scheduling-priority"
+        default_priority: float = 0
+
+    def __init__(self, options: Options, **kwargs: object) -> None:
+        self.options = options
+
+    def add(self, item: SchedulableProtocol, slot: ScheduleSlot) -> None:
+        slot.stats.priority = label_value(
+            item, self.options.priority_label, self.options.default_priority
+        )
+
+    def priority(self, slot: ScheduleSlot) -> tuple[float, ...]:
+        return (-slot.stats.priority, slot.order)
+
+
+class DeficitRoundRobinPolicy(SchedulingPolicy):
+    """Give each job a `quantum` of execution time per round, scaled by its
+    weight label. A job stays in the current round until its deficit is
+    exhausted by the measured cost of its items.
+    """
+
+    @dataclasses.dataclass
+    class Options:
+        quantum: float = 1
+        weight_label: str = "datalineup.io/scheduling-weight"
+        default_weight: float = 1
+        #: Cost of items from jobs that were never executed yet.
+        initial_cost: float = 0.1
+
+    def __init__(self, options: Options, **kwargs: object) -> None:
+        self.options = options
+        self.round: float = 0
+
+    def add(self, item: SchedulableProtocol, slot: ScheduleSlot) -> None:
+        weight = label_value(
+            item, self.options.weight_label, self.options.default_weight
+        )
+        slot.stats.weight = max(weight, 1e-9)
+        slot.stats.virtual_time = self.round
+        slot.stats.deficit = self.options.quantum * slot.stats.weight
+
+    def priority(self, slot: ScheduleSlot) -> tuple[float, ...]:
+        return (max(self.round, slot.stats.virtual_time), slot.order)
+
+    def scheduled(self, slot: ScheduleSlot) -> None:
+        stats = slot.stats
+        if stats.virtual_time < self.round:
+            # The slot was idle, it starts the current round with a new quantum.
+            stats.virtual_time = self.round
+            stats.deficit = self.options.quantum * stats.weight
+        self.round = stats.virtual_time
+
+        cost = stats.average_cost
+        stats.deficit -= self.options.initial_cost if cost is None else cost
+        if stats.deficit <= 0:
+            quantum = self.options.quantum * stats.weight
+            rounds = math.floor(-stats.deficit / quantum) + 1
+            stats.virtual_time += rounds
+            stats.deficit += rounds * quantum
+
+
+BUILTINS: dict[str, t.Type[SchedulingPolicy]] = {
+    "RoundRobin": RoundRobinPolicy,
+    "WeightedFairQueuing": WeightedFairQueuingPolicy,
+    "StrictPriority": StrictPriorityPolicy,
+    "DeficitRoundRobin": DeficitRoundRobinPolicy,
+}
+
+
+def build_scheduling_policy(
+    policy_type: str, options: t.Optional[dict[str, t.Any]] = None
+) -> SchedulingPolicy:
+    klass = BUILTINS.get(policy_type)
+    if klass is None:
+        klass = import_name(policy_type)
+    if klass is None:
+        raise ValueError(f"Unknown scheduling policy type: {policy_type}")
+    if not issubclass(klass, SchedulingPolicy):
+        raise ValueError(f"{klass} must be a SchedulingPolicy")
+    return klass.from_options(options or {})
 
 
 class Scheduler(t.Generic[T]):
     schedule_slots: dict[SchedulableProtocol[T], ScheduleSlot[T]]
     tasks: dict[asyncio.Task, SchedulableProtocol[T]]
 
-    def __init__(self) -> None:
+    def __init__(self, policy: t.Optional[SchedulingPolicy] = None) -> None:
         self.logger = getLogger(__name__, self)
         self.schedule_slots = {}
         self.tasks = {}
         self.tasks_group = TasksGroup()
+        self.ready: set[asyncio.Task] = set()
         self.is_running: t.Optional[bool] = None
+        self.policy = policy or RoundRobinPolicy.from_options({})
+        self.slots_index = itertools.count()
+        self.turns = itertools.count()
 
     def add(self, item: SchedulableProtocol[T]) -> asyncio.Future[None]:
         generator = t.cast(AsyncGenerator[T, None], item.iterable.__aiter__())
         name = f"scheduler.anext({item.name})"
         anext = t.cast(Coroutine[t.Any, t.Any, T], generator.__anext__())
         task = asyncio.create_task(anext, name=name)
-        slot = ScheduleSlot(task=task, generator=generator, future=asyncio.Future())
+        slot = ScheduleSlot(
+            task=task,
+            generator=generator,
+            future=asyncio.Future(),
+            order=next(self.turns),
+            index=next(self.slots_index),
+        )
+        self.policy.add(item, slot)
         self.schedule_slots[item] = slot
         self.tasks[task] = item
         self.tasks_group.add(task)
         return slot.future
 
+    def record_cost(self, item: SchedulableProtocol[T], cost: float) -> None:
+        """Record the cost, such as the execution time, of an item."""
+        slot = self.schedule_slots.get(item)
+        if slot is None:
+            return
+        slot.stats.executed += 1
+        slot.stats.cost += cost
+        self.policy.executed(slot, cost)
+
+    def stats(self) -> dict[str, SchedulingStats]:
+        return {item.name: slot.stats for item, slot in self.schedule_slots.items()}
+
     def remove(self, item: SchedulableProtocol[T]) -> None:
         schedule_slot = self.schedule_slots.get(item)
         if schedule_slot:
@@ -62,7 +275,18 @@ class Scheduler(t.Generic[T]):
     async def close(self) -> None:
         self.is_running = False
 
+        # Items ready but not yielded yet are dropped, like the pending ones.
+        # Their generators are closed so they can clean up.
+        dropped_slots = []
+        for task in self.ready:
+            schedulable = self.tasks.pop(task, None)
+            if schedulable and (slot := self.schedule_slots.get(schedulable)):
+                slot.is_running = False
+                dropped_slots.append(slot)
+        self.ready.clear()
         await self.tasks_group.close()
+        for slot in dropped_slots:
+            await self.stop_slot_generator(slot)
         for item in self.schedule_slots.values():
             self.stop_slot(item)
 
@@ -85,18 +309,26 @@ class Scheduler(t.Generic[T]):
             return
 
         self.is_running = True
-        while self.is_running or self.tasks_group.tasks:
-            done = await self.tasks_group.wait()
-            if not done:
-                continue
-            self.logger.debug(
-                "task ready",
-                extra={"data": {"tasks": ",".join(t.get_name() for t in done)}},
-            )
-
-            for task in sorted(done, key=self.task_order):
-                async for item in self.process_task(task):
-                    yield item
+        while self.is_running or self.tasks_group.tasks or self.ready:
+            if self.ready:
+                # Let the requeued tasks run once and pick up items that got
+                # ready meanwhile so the policy can choose between all of them.
+                await asyncio.sleep(0)
+                self.ready.update(self.tasks_group.pop_done())
+            else:
+                done = await self.tasks_group.wait()
+                if not done:
+                    continue
+                self.logger.debug(
+                    "task ready",
+                    extra={"data": {"tasks": ",".join(t.get_name() for t in done)}},
+                )
+                self.ready.update(done)
+
+            task = min(self.ready, key=self.task_order)
+            self.ready.remove(task)
+            async for item in self.process_task(task):
+                yield item
 
     async def process_task(self, task: asyncio.Task) -> AsyncIterator[T]:
         item = self.tasks[task]
@@ -110,6 +342,9 @@ class Scheduler(t.Generic[T]):
 
             exception = task.exception()
             if exception is None:
+                slot = self.schedule_slots[item]
+                slot.stats.scheduled += 1
+                self.policy.scheduled(slot)
                 yield task.result()
             elif isinstance(exception, asyncio.CancelledError):
                 pass
@@ -150,15 +385,15 @@ class Scheduler(t.Generic[T]):
         self.tasks_group.add(new_task)
 
         schedule_slot.task = new_task
-        schedule_slot.order += 1
+        schedule_slot.order = next(self.turns)
 
-    def task_order(self, task: asyncio.Task) -> int:
+    def task_order(self, task: asyncio.Task) -> tuple[tuple[float, ...], int]:
         item = self.tasks[task]
         schedule_slot = self.schedule_slots.get(item)
         if schedule_slot is None:
             # Maximum priority so we clean the task as soon as possible.
-            return -1
-        return schedule_slot.order
+            return (-math.inf,), -1
+        return self.policy.priority(schedule_slot), schedule_slot.index
 
     def __len__(self) -> int:
         return len(self.schedule_slots)
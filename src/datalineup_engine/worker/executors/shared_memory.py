@@ -0,0 +1,223 @@
+import typing as t
+
+import dataclasses
+import io
+import pickle  # noqa: S403
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+DEFAULT_MIN_SIZE: t.Final[int] = 64 * 1024
+DEFAULT_MAX_CACHED_BYTES: t.Final[int] = 256 * 1024 * 1024
+_MIN_SEGMENT_SIZE: t.Final[int] = 4096
+
+
+@dataclasses.dataclass
+class SharedBuffer:
+    name: str
+    size: int
+    readonly: bool
+
+
+@dataclasses.dataclass
+class SharedPayload:
+    """A pickled object whose large buffers live in shared memory segments.
+
+    Only this payload goes through the executor pipe, the buffers are
+    referenced by their segment name.
+    """
+
+    data: bytes
+    buffers: list[SharedBuffer]
+
+
+class SharedMemoryPool:
+    """Allocate shared memory segments by power-of-two size classes and keep
+    released segments around to be reused by the next payloads.
+    """
+
+    def __init__(self, *, max_cached_bytes: int = DEFAULT_MAX_CACHED_BYTES) -> None:
+        self.max_cached_bytes = max_cached_bytes
+        self.cached_bytes = 0
+        self.free: dict[int, list[SharedMemory]] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def size_class(size: int) -> int:
+        """
+        >>> SharedMemoryPool.size_class(1)
+        4096
+        >>> SharedMemoryPool.size_class(5000)
+        8192
+        """
+        return max(_MIN_SEGMENT_SIZE, 1 << (size - 1).bit_length())
+
+    def allocate(self, size: int) -> SharedMemory:
+        size_class = self.size_class(size)
+        with self.lock:
+            segments = self.free.get(size_class)
+            if segments:
+                self.cached_bytes -= size_class
+                return segments.pop()
+        return SharedMemory(create=True, size=size_class)
+
+    def release(self, segment: SharedMemory) -> None:
+        """Return a segment to the pool once no process use it anymore."""
+        size_class = segment.size
+        with self.lock:
+            if self.cached_bytes + size_class <= self.max_cached_bytes:
+                self.cached_bytes += size_class
+                self.free.setdefault(size_class, []).append(segment)
+                return
+        self.discard(segment)
+
+    def discard(self, segment: SharedMemory) -> None:
+        """Unlink a segment that might still be in use by another process."""
+        segment.close()
+        segment.unlink()
+
+    def close(self) -> None:
+        with self.lock:
+            segments = [s for size in self.free.values() for s in size]
+            self.free.clear()
+            self.cached_bytes = 0
+        for segment in segments:
+            self.discard(segment)
+
+
+def ensure_tracker_running() -> None:
+    """Start the resource tracker before spawning workers so they all share it
+    and segments created in one process can be unlinked by another."""
+    resource_tracker.ensure_running()
+
+
+def create_segment(size: int) -> SharedMemory:
+    return SharedMemory(create=True, size=max(size, 1))
+
+
+def _as_is(buffer: object) -> object:
+    return buffer
+
+
+class _SharedBytes:
+    """Mark a bytes-like object to be pickled out-of-band."""
+
+    def __init__(self, data: t.Union[bytes, bytearray]) -> None:
+        self.data = data
+
+
+def _wrap_buffers(obj: t.Any, min_size: int) -> t.Any:
+    typ = type(obj)
+    if typ in (bytes, bytearray) and len(obj) >= min_size:
+        return _SharedBytes(obj)
+    if typ is dict:
+        return {k: _wrap_buffers(v, min_size) for k, v in obj.items()}
+    if typ is list:
+        return [_wrap_buffers(v, min_size) for v in obj]
+    if typ is tuple:
+        return tuple(_wrap_buffers(v, min_size) for v in obj)
+    return obj
+
+
+class _SharedPickler(pickle.Pickler):
+    def __init__(self, file: t.IO[bytes], *, min_size: int, **kwargs: t.Any) -> None:
+        super().__init__(file, protocol=5, **kwargs)
+        self.min_size = min_size
+
+    def reducer_override(self, obj: object) -> t.Any:
+        # bytes and bytearray are always pickled in-band, wrap large ones into a
+        # PickleBuffer so they go through the buffer callback. Since the pickler
+        # never calls this method for builtins such as bytes and dict, buffers
+        # are found by walking the state of dataclasses such as messages args.
+        if isinstance(obj, _SharedBytes):
+            return _as_is, (pickle.PickleBuffer(obj.data),)
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            reduced = obj.__reduce_ex__(5)
+            if isinstance(reduced, tuple) and len(reduced) >= 3:
+                return (
+                    *reduced[:2],
+                    _wrap_buffers(reduced[2], self.min_size),
+                    *reduced[3:],
+                )
+        return NotImplemented
+
+
+def dumps(
+    obj: object,
+    *,
+    allocate: t.Callable[[int], SharedMemory],
+    release: t.Optional[t.Callable[[SharedMemory], None]] = None,
+    min_size: int = DEFAULT_MIN_SIZE,
+) -> tuple[SharedPayload, list[SharedMemory]]:
+    """Pickle `obj`, copying buffers of at least `min_size` bytes into shared
+    memory segments. Return the payload and the segments it references, which
+    must be released by the caller once the payload has been loaded.
+
+    If pickling fails, allocated segments are given back to `release`, or
+    destroyed if it isn't set.
+    """
+    segments: list[SharedMemory] = []
+    buffers: list[SharedBuffer] = []
+
+    def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+        with buffer.raw() as view:
+            if view.nbytes < min_size:
+                return True
+            segment = allocate(view.nbytes)
+            segments.append(segment)
+            t.cast(memoryview, segment.buf)[: view.nbytes] = view
+            buffers.append(
+                SharedBuffer(
+                    name=segment.name, size=view.nbytes, readonly=view.readonly
+                )
+            )
+        return False
+
+    file = io.BytesIO()
+    pickler = _SharedPickler(file, min_size=min_size, buffer_callback=buffer_callback)
+    try:
+        pickler.dump(_wrap_buffers(obj, min_size))
+    except BaseException:
+        for segment in segments:
+            if release:
+                release(segment)
+            else:
+                segment.close()
+                segment.unlink()
+        raise
+    return SharedPayload(data=file.getvalue(), buffers=buffers), segments
+
+
+def loads(payload: SharedPayload, *, unlink: bool = False) -> t.Any:
+    """Unpickle a payload. Buffers are copied out of the segments so the
+    loaded objects own their memory. If `unlink` is set, the segments are
+    destroyed afterward, even if loading fails.
+    """
+    buffers: list[t.Union[bytes, bytearray]] = []
+    try:
+        for shared_buffer in payload.buffers:
+            segment = SharedMemory(name=shared_buffer.name)
+            try:
+                view = t.cast(memoryview, segment.buf)[: shared_buffer.size]
+                buffers.append(
+                    bytes(view) if shared_buffer.readonly else bytearray(view)
+                )
+                view.release()
+            finally:
+                segment.close()
+    finally:
+        if unlink:
+            unlink_payload(payload)
+    return pickle.loads(payload.data, buffers=buffers)  # noqa: S301
+
+
+def unlink_payload(payload: SharedPayload) -> None:
+    """Destroy the segments referenced by a payload, skipping the ones
+    already gone."""
+    for shared_buffer in payload.buffers:
+        try:
+            segment = SharedMemory(name=shared_buffer.name)
+        except FileNotFoundError:
+            continue
+        segment.close()
+        segment.unlink()
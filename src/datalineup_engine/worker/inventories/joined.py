@@ -53,7 +53,9 @@ class JoinInventory(IteratorInventory):
         return build_inventory(inventory, services=self.__services)
 
     async def iterate(self, after: t.Optional[Cursor] = None) -> t.AsyncIterator[Item]:
-        self._multi_cursors = MultiCursorsState.from_cursor(after)
+        self._multi_cursors = MultiCursorsState.from_cursor(
+            after, compact=self.compact_cursors
+        )
 
         async with (TasksGroup(name=f"join-inventory({self.root_name})") as group,):
             group.create_task(
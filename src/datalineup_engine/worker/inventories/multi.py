@@ -8,6 +8,7 @@ from contextlib import AsyncExitStack
 from functools import reduce
 
 from datalineup_engine.core import Cursor
+from datalineup_engine.worker import cursors
 from datalineup_engine.worker.inventory import Inventory
 from datalineup_engine.worker.inventory import Item
 
@@ -69,31 +70,34 @@ class MultiItems(t.NamedTuple):
 class MultiCursorsState:
     after: t.Optional[Cursor] = None
     partials: dict[Cursor, Cursor] = dataclasses.field(default_factory=dict)
+    #: Write large cursors in the compact version 2.
+    compact: bool = dataclasses.field(default=False, compare=False)
 
     @classmethod
-    def from_cursor(cls, raw: t.Optional[Cursor], /) -> "MultiCursorsState":
+    def from_cursor(
+        cls, raw: t.Optional[Cursor], /, *, compact: bool = False
+    ) -> "MultiCursorsState":
         state = None
         if raw:
-            # Try parsing cursor format that might be in the old unstructured
-            # format. We valid it is both parseable in json and has the
-            # expected fields.
-            with contextlib.suppress(json.JSONDecodeError):
-                data = json.loads(raw)
-                if (
-                    isinstance(data, dict)
-                    and data.get("v") == 1
-                    and not (data.keys() - ["v", "a", "p"])
-                ):
-                    state = data
-            if state is None:
-                state = {"a": raw}
-        return cls.from_dict(state or {})
+            # Cursors that aren't versioned are in the old unstructured format.
+            state = cursors.decode(raw, keys=["a", "p"]) or {"a": raw}
+        return cls.from_dict(state or {}, compact=compact)
 
     @classmethod
-    def from_dict(cls, state: dict) -> "MultiCursorsState":
+    def from_dict(cls, state: dict, *, compact: bool = False) -> "MultiCursorsState":
+        if state.get("v") == 2:
+            return cls(
+                after=cursors.unembed(state.get("a")),
+                partials={
+                    k: t.cast(Cursor, cursors.unembed(v))
+                    for k, v in (state.get("p") or {}).items()
+                },
+                compact=compact,
+            )
         return cls(
             after=state.get("a"),
             partials=state.get("p") or {},
+            compact=compact,
         )
 
     def as_dict(self) -> dict:
@@ -104,8 +108,18 @@ class MultiCursorsState:
             data["p"] = self.partials
         return data
 
+    def as_compact_dict(self) -> dict:
+        data: dict = {"v": 2}
+        if self.after is not None:
+            data["a"] = cursors.embed(self.after)
+        if self.partials:
+            data["p"] = {k: cursors.embed(v) for k, v in self.partials.items()}
+        return data
+
     def as_cursor(self) -> Cursor:
-        return Cursor(json.dumps(self.as_dict()))
+        return cursors.encode(
+            self.as_dict(), compact=self.as_compact_dict if self.compact else None
+        )
 
     def process_root(self, inventory: Inventory) -> "RootCursors":
         return RootCursors(cursors=self, inventory=inventory)
@@ -2,14 +2,13 @@ import typing as t
 
 import abc
 import asyncio
+import collections
 import contextlib
 import dataclasses
-import json
 import logging
 import uuid
 from collections.abc import AsyncIterator
 from contextlib import AsyncExitStack
-from contextlib import suppress
 from datetime import timedelta
 from functools import cached_property
 from itertools import islice
@@ -21,6 +20,7 @@ from datalineup_engine.core import MessageId
 from datalineup_engine.core.topic import TopicMessage
 from datalineup_engine.utils.log import getLogger
 from datalineup_engine.utils.options import OptionsSchema
+from datalineup_engine.worker import cursors
 
 MISSING = object()
 
@@ -95,7 +95,8 @@ class RetryBatch(Exception):
             raise MaxRetriesError() from self.__cause__
 
 
-class PendingItem(t.NamedTuple):
+@dataclasses.dataclass(slots=True)
+class PendingItem:
     is_pending: bool
     item: Item
 
@@ -105,40 +106,54 @@ class CursorsState:
     after: t.Optional[Cursor] = None
     partials: set[Cursor] = dataclasses.field(default_factory=set)
     max_partials: t.Optional[int] = None
+    #: Write large cursors in the compact version 2.
+    compact: bool = dataclasses.field(default=False, compare=False)
 
-    _pendings: dict[int, PendingItem] = dataclasses.field(
+    #: Items being processed or done, in processing order. Items are
+    #: committed once all the items before them are done.
+    _pendings: collections.deque[PendingItem] = dataclasses.field(
+        default_factory=collections.deque, init=False, repr=False
+    )
+    #: Cursors of items done but not committed yet, by item id.
+    _done: dict[int, Cursor] = dataclasses.field(
         default_factory=dict, init=False, repr=False
     )
+    _cursor: t.Optional[Cursor] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _cursor_changed: bool = dataclasses.field(
+        default=True, init=False, repr=False, compare=False
+    )
 
     @classmethod
     def from_cursor(
-        cls, raw: t.Optional[Cursor], /, *, max_partials: t.Optional[int] = None
+        cls,
+        raw: t.Optional[Cursor],
+        /,
+        *,
+        max_partials: t.Optional[int] = None,
+        compact: bool = False,
     ) -> "CursorsState":
         state = None
         if raw:
-            # Try parsing cursor format that might be in the old unstructured
-            # format. We valid it is both parseable in json and has the
-            # expected fields.
-            with suppress(json.JSONDecodeError):
-                data = json.loads(raw)
-                if (
-                    isinstance(data, dict)
-                    and data.get("v") == 1
-                    and not (data.keys() - ["v", "a", "p"])
-                ):
-                    state = data
-            if state is None:
-                state = {"a": raw}
-        return cls.from_dict(state or {}, max_partials=max_partials)
+            # Cursors that aren't versioned are in the old unstructured format.
+            state = cursors.decode(raw, keys=["a", "p", "r", "x"]) or {"a": raw}
+        return cls.from_dict(state or {}, max_partials=max_partials, compact=compact)
 
     @classmethod
     def from_dict(
-        cls, state: dict, /, *, max_partials: t.Optional[int] = None
+        cls,
+        state: dict,
+        /,
+        *,
+        max_partials: t.Optional[int] = None,
+        compact: bool = False,
     ) -> "CursorsState":
         return cls(
             after=state.get("a"),
-            partials=set(state.get("p") or set()),
+            partials=cursors.expand_cursors(state),
             max_partials=max_partials,
+            compact=compact,
         )
 
     def as_dict(self) -> dict:
@@ -147,11 +162,7 @@ class CursorsState:
             data["a"] = self.after
 
         if self.max_partials != 0:
-            partials_cursors = (
-                p.item.cursor
-                for p in self._pendings.values()
-                if not p.is_pending and p.item.cursor is not None
-            )
+            partials_cursors = self._done.values()
             if self.max_partials:
                 partials = set(islice(partials_cursors, self.max_partials))
                 partials = (
@@ -166,38 +177,50 @@ class CursorsState:
 
         return data
 
+    def as_compact_dict(self) -> dict:
+        data = self.as_dict()
+        partials = data.pop("p", [])
+        return data | {"v": 2} | cursors.compact_cursors(partials)
+
     def as_cursor(self) -> t.Optional[Cursor]:
-        d = self.as_dict()
-        return Cursor(json.dumps(d)) if d != {"v": 1} else None
+        if self._cursor_changed:
+            d = self.as_dict()
+            self._cursor = (
+                cursors.encode(
+                    d, compact=self.as_compact_dict if self.compact else None
+                )
+                if d != {"v": 1}
+                else None
+            )
+            self._cursor_changed = False
+        return self._cursor
 
     @contextlib.asynccontextmanager
     async def process_item(self, item: Item) -> t.AsyncIterator[bool]:
-        self._pendings[id(item)] = PendingItem(True, item)
+        pending = PendingItem(True, item)
+        self._pendings.append(pending)
         try:
             if item.cursor and item.cursor in self.partials:
                 self.partials.remove(item.cursor)
+                self._cursor_changed = True
                 yield False
             else:
                 yield True
         finally:
-            self._pendings[id(item)] = PendingItem(False, item)
-
-            # Collect the serie of done item from the beginning.
-            items_done = []
-            for pending, item in self._pendings.values():
-                if pending:
-                    break
-                items_done.append(item)
-
-            # Remove all done item from the pendings
-            for item in items_done:
-                del self._pendings[id(item)]
+            pending.is_pending = False
+            self._cursor_changed = True
 
-            # Commit last cursor.
-            for item in reversed(items_done):
-                if item.cursor:
-                    self.after = item.cursor
-                    break
+            if pending is not self._pendings[0]:
+                # Items before are still pending, keep it as a partial.
+                if item.cursor is not None:
+                    self._done[id(item)] = item.cursor
+            else:
+                # Commit the serie of done items from the beginning.
+                while self._pendings and not self._pendings[0].is_pending:
+                    done = self._pendings.popleft().item
+                    self._done.pop(id(done), None)
+                    if done.cursor:
+                        self.after = done.cursor
 
     def has_pendings(self) -> bool:
         return bool(self._pendings)
@@ -209,6 +232,9 @@ class Inventory(abc.ABC, OptionsSchema):
     _is_done_event: t.Optional[asyncio.Event] = None
 
     max_partials: t.Optional[int] = 100
+    #: Write large cursors in the compact format, set from the
+    #: `job_state.compact_cursors` option when the inventory is built.
+    compact_cursors: bool = False
 
     @abc.abstractmethod
     async def next_batch(self, after: t.Optional[Cursor] = None) -> list[Item]:
@@ -239,7 +265,9 @@ class Inventory(abc.ABC, OptionsSchema):
 
     async def run(self, after: t.Optional[Cursor] = None) -> t.AsyncIterator[Item]:
         self._is_done_event = asyncio.Event()
-        self._cursors = CursorsState.from_cursor(after, max_partials=self.max_partials)
+        self._cursors = CursorsState.from_cursor(
+            after, max_partials=self.max_partials, compact=self.compact_cursors
+        )
         async for item in self.iterate(after=self._cursors.after):
             item.context.callback(self._check_has_pendings)
             self._is_done_event.clear()
@@ -4,10 +4,39 @@ import dataclasses
 
 from datalineup_engine.core import PipelineInfo
 from datalineup_engine.core import TopicMessage
+from datalineup_engine.utils.inspect import BaseParamsDataclass
 from datalineup_engine.utils.inspect import dataclass_from_params
 from datalineup_engine.utils.inspect import get_import_name
 from datalineup_engine.utils.inspect import import_name
 from datalineup_engine.utils.options import fromdict
+from datalineup_engine.utils.options import schema_for
+
+
+@dataclasses.dataclass
+class CompiledPipeline:
+    """A pipeline resolved once so it can be executed many time without
+    importing and inspecting it again."""
+
+    pipeline: t.Callable
+    args_def: t.Type[BaseParamsDataclass]
+    meta_args: dict[str, t.Optional[str]] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def from_info(cls, info: PipelineInfo) -> "CompiledPipeline":
+        pipeline = info.into_pipeline()
+        args_def = dataclass_from_params(pipeline)
+        # Build the validation schema ahead of the first message.
+        schema_for(args_def)
+        return cls(pipeline=pipeline, args_def=args_def)
+
+    def find_meta_arg(self, meta_name: str) -> t.Optional[str]:
+        """Return the argument receiving the meta arg of type `meta_name`."""
+        try:
+            return self.meta_args[meta_name]
+        except KeyError:
+            arg = self.args_def.find_by_type(import_name(meta_name))
+            self.meta_args[meta_name] = arg
+            return arg
 
 
 @dataclasses.dataclass
@@ -44,18 +73,16 @@ class PipelineMessage:
     def set_meta_arg(self, *, meta_type: t.Type, value: t.Any) -> None:
         self.meta_args[get_import_name(meta_type)] = value
 
-    def execute(self) -> object:
-        pipeline = self.info.into_pipeline()
-        pipeline_args_def = dataclass_from_params(pipeline)
+    def execute(self, pipeline: t.Optional[CompiledPipeline] = None) -> object:
+        pipeline = pipeline or CompiledPipeline.from_info(self.info)
         args = dict(self.message.args)
 
         for meta_name, value in self.meta_args.items():
-            meta_type = import_name(meta_name)
-            arg = pipeline_args_def.find_by_type(meta_type)
+            arg = pipeline.find_meta_arg(meta_name)
             if arg:
                 args[arg] = value
 
-        pipeline_args = fromdict(args, pipeline_args_def)
+        pipeline_args = fromdict(args, pipeline.args_def)
         return pipeline_args.call(kwargs=args)
 
     def as_remote(self) -> "PipelineMessage":
@@ -3,8 +3,11 @@ import typing as t
 import asyncio
 import contextlib
 import dataclasses
+import os
+import socket
 import time
-from collections import defaultdict
+import uuid
+from collections import deque
 from collections.abc import Iterable
 from functools import cached_property
 
@@ -12,8 +15,15 @@ from limits import RateLimitItem
 from limits import parse_many
 from limits.aio import storage
 from limits.aio.strategies import STRATEGIES
+from limits.aio.strategies import FixedWindowRateLimiter
 from limits.aio.strategies import RateLimiter
 
+from datalineup_engine.utils.log import getLogger
+from datalineup_engine.utils.options import OptionsSchema
+from datalineup_engine.worker.resources.shared import ResourceLeases
+from datalineup_engine.worker.resources.shared import SharedStorage
+from datalineup_engine.worker.resources.shared import build_shared_storage
+
 
 @dataclasses.dataclass(frozen=True)
 class ResourceKey:
@@ -89,15 +99,8 @@ class ResourceContext:
 
         release_ats: list[int] = []
         for rate_limit_item in rate_limit_items:
-            reset_time, remaining = await self.rate_limiter.get_window_stats(
-                rate_limit_item, self.resource.type, self.resource.name
-            )
-            await self.rate_limiter.hit(
-                rate_limit_item, self.resource.type, self.resource.name
-            )
-            # using remaining below 1 because we are actually
-            # consuming the last request available
-            if remaining <= 1:
+            reset_time = await self._hit_rate_limit(rate_limit_item)
+            if reset_time is not None:
                 release_ats.append(reset_time)
 
         if release_ats:
@@ -105,6 +108,32 @@ class ResourceContext:
             if not self.release_at or rate_limit_release_at > self.release_at:
                 self.release_at = rate_limit_release_at
 
+    async def _hit_rate_limit(self, item: RateLimitItem) -> t.Optional[int]:
+        """Consume the rate limit and return when it resets if this hit used the
+        last request available.
+
+        For fixed windows, the hit count is read from the hit itself so the
+        common case costs a single storage call.
+        """
+        assert self.rate_limiter and self.resource  # noqa: S101
+        limiter = self.rate_limiter
+        identifiers = (self.resource.type, self.resource.name)
+
+        if type(limiter) is FixedWindowRateLimiter:
+            key = item.key_for(*identifiers)
+            hits = await limiter.storage.incr(
+                key, item.get_expiry(), elastic_expiry=False
+            )
+            if hits < item.amount:
+                return None
+            return int(await limiter.storage.get_expiry(key))
+
+        reset_time, remaining = await limiter.get_window_stats(item, *identifiers)
+        await limiter.hit(item, *identifiers)
+        # using remaining below 1 because we are actually
+        # consuming the last request available
+        return reset_time if remaining <= 1 else None
+
     async def __aenter__(self) -> "ResourceContext":
         if self.resource is None:
             raise ValueError("Cannot enter a released context")
@@ -140,26 +169,72 @@ class ResourcesContext:
 
 
 class ExclusiveResources:
-    def __init__(self, limiters_storage: storage.Storage) -> None:
+    """Pool of resources of a single type.
+
+    Acquiring an available resource is synchronous and doesn't take any lock.
+    Tasks that have to wait are queued and woken up one at a time as resources
+    are released. With `fifo`, new acquirers can't take a resource while
+    other tasks are already waiting for one.
+
+    With `leases`, resources are also leased in a storage shared between
+    workers. Resources leased by another worker are set aside and retried
+    later.
+    """
+
+    def __init__(
+        self,
+        limiters_storage: storage.Storage,
+        *,
+        fifo: bool = False,
+        leases: t.Optional[ResourceLeases] = None,
+    ) -> None:
         self.availables: set[ResourceData] = set()
         self.used: set[ResourceData] = set()
-        self.condition = asyncio.Condition(asyncio.Lock())
+        self.leased_elsewhere: set[ResourceData] = set()
+        self.waiters: deque[ResourcesWaiter] = deque()
+        self.fifo = fifo
+        self.leases = leases
         self.resources: dict[str, ResourceData] = {}
         self.limiters_storage: storage.Storage = limiters_storage
         self.limiters: dict[str, RateLimiter] = {}
 
     async def acquire(self, *, wait: bool = True) -> ResourceContext:
-        async with self.condition:
-            if not wait:
-                resource = self.try_acquire()
-                if not resource:
+        while True:
+            resource = self.try_acquire() if self.can_barge() else None
+            if resource is None:
+                if not wait:
                     raise ResourceUnavailable()
+                resource = await ResourcesWaiter([self]).wait_for(self.try_acquire)
+            if await self.lease(resource):
                 return ResourceContext(resource, self)
-            resource = await self.condition.wait_for(self.try_acquire)
-            # wait_for above always return a non-none value. Assert is there
-            # to make mypy happy.
-            assert resource is not None  # noqa: S101
-            return ResourceContext(resource, self)
+
+    async def lease(self, resource: ResourceData) -> bool:
+        """Lease an acquired resource in the shared storage. If another worker
+        holds the lease, the resource is set aside and False is returned."""
+        if not self.leases:
+            return True
+        try:
+            leased = await self.leases.acquire(self.lease_key(resource))
+        except BaseException:
+            self.put_back(resource)
+            self.wake_up_waiter()
+            raise
+        if not leased:
+            self.used.discard(resource)
+            self.leased_elsewhere.add(resource)
+            asyncio.get_running_loop().call_later(
+                self.leases.retry_after, self._retry_leased_elsewhere, resource
+            )
+        return leased
+
+    def lease_key(self, resource: ResourceData) -> str:
+        return ResourceLeases.key(resource.type, resource.name)
+
+    def _retry_leased_elsewhere(self, resource: ResourceData) -> None:
+        if resource in self.leased_elsewhere:
+            self.leased_elsewhere.remove(resource)
+            self.availables.add(resource)
+            self.wake_up_waiter()
 
     def _build_rate_limiter(
         self, resource_name: str, resource_rate_limit: ResourceRateLimit
@@ -179,20 +254,27 @@ class ExclusiveResources:
         if resource.name in self.resources:
             raise ValueError("Cannot add a resource twice")
 
-        async with self.condition:
-            self.availables.add(resource)
-            self.resources[resource.name] = resource
-            if resource.rate_limit:
-                self._build_rate_limiter(resource.name, resource.rate_limit)
+        self.availables.add(resource)
+        self.resources[resource.name] = resource
+        if resource.rate_limit:
+            self._build_rate_limiter(resource.name, resource.rate_limit)
 
-            self.condition.notify()
+        self.wake_up_waiter()
 
     async def remove(self, resource_name: str) -> None:
         resource = self.resources.pop(resource_name, None)
         if resource:
             self.availables.discard(resource)
-            self.used.discard(resource)
+            self.leased_elsewhere.discard(resource)
             self.limiters.pop(resource.name, None)
+            if resource in self.used:
+                self.used.remove(resource)
+                if self.leases:
+                    await self.leases.release(self.lease_key(resource))
+
+    def can_barge(self) -> bool:
+        """Whether a new acquirer may take a resource before queued waiters."""
+        return not (self.fifo and self.waiters)
 
     def try_acquire(self) -> t.Optional[ResourceData]:
         if self.availables:
@@ -201,48 +283,228 @@ class ExclusiveResources:
             return resource
         return None
 
+    def put_back(self, resource: ResourceData) -> None:
+        """Undo a `try_acquire` that wasn't handed over to anyone."""
+        self.used.discard(resource)
+        self.availables.add(resource)
+
     async def release(self, resource: ResourceData) -> None:
         if resource in self.used:
-            async with self.condition:
+            if self.leases:
+                await self.leases.release(self.lease_key(resource))
+            # The resource might have been removed while releasing its lease.
+            if resource in self.used:
                 self.used.remove(resource)
                 self.availables.add(resource)
-                self.condition.notify()
-
+                self.wake_up_waiter()
 
-class ResourcesManager:
+    def wake_up_waiter(self, *, exclude: t.Optional["ResourcesWaiter"] = None) -> None:
+        if not self.availables:
+            return
+        for waiter in self.waiters:
+            if waiter is exclude:
+                continue
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+            # A waiter is already woken up and will pick the resource.
+            if not waiter.future.cancelled():
+                return
+
+
+R = t.TypeVar("R")
+
+
+class ResourcesWaiter:
+    """Wait in the queues of one or more resource types until `acquire` succeeds.
+
+    The waiter keeps its position in the queues across wake ups, so a task
+    waiting for multiple resources isn't starved by single resource acquirers
+    in FIFO mode.
+    """
+
+    def __init__(self, exclusives: list[ExclusiveResources]) -> None:
+        self.exclusives = exclusives
+        self.future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+    async def wait_for(self, acquire: t.Callable[[], t.Optional[R]]) -> R:
+        for exclusive in self.exclusives:
+            exclusive.waiters.append(self)
+        try:
+            while True:
+                try:
+                    await self.future
+                except asyncio.CancelledError:
+                    # Pass our wake up to the next waiter.
+                    self.wake_up_others()
+                    raise
+
+                result = acquire()
+                if result is not None:
+                    return result
+                # The resources were taken or only some of them are available.
+                # Let other waiters try their luck and wait for the next release.
+                self.future = asyncio.get_running_loop().create_future()
+                self.wake_up_others()
+        finally:
+            for exclusive in self.exclusives:
+                exclusive.waiters.remove(self)
+            # Resources might still be available for the next waiters.
+            self.wake_up_others()
+
+    def wake_up_others(self) -> None:
+        for exclusive in self.exclusives:
+            exclusive.wake_up_waiter(exclude=self)
+
+
+class ResourcesManager(OptionsSchema):
     name = "resources_manager"
 
-    def __init__(self) -> None:
+    @dataclasses.dataclass
+    class Options:
+        #: Serve tasks waiting for resources in arrival order. Otherwise, a new
+        #: acquirer can take a resource released while other tasks wait.
+        fifo: bool = False
+        #: Storage shared between workers for rate limits and exclusive leases,
+        #: either a Redis URL or `memory://<name>` for a process-local stand-in.
+        #: Redis requires the `shared-resources` extra.
+        shared_storage_url: t.Optional[str] = None
+        #: Resource types using the shared storage, all of them if empty.
+        shared_resource_types: list[str] = dataclasses.field(default_factory=list)
+        #: Leases expire after `lease_ttl` seconds unless renewed while the
+        #: resource is held.
+        lease_ttl: float = 30
+        #: Delay before retrying a resource leased by another worker.
+        lease_retry_after: float = 1
+
+    def __init__(self, options: t.Optional[Options] = None, **kwargs: object) -> None:
+        self.logger = getLogger(__name__, self)
+        self.options = options or self.Options()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
         self.limiters_storage: storage.Storage = storage.MemoryStorage()
-        self.resources: dict[str, ExclusiveResources] = defaultdict(
-            lambda: ExclusiveResources(self.limiters_storage)
+        self.shared_storage: t.Optional[SharedStorage] = None
+        self.resources: dict[str, ExclusiveResources] = {}
+
+    def exclusive_resources(self, resource_type: str) -> ExclusiveResources:
+        exclusive = self.resources.get(resource_type)
+        if exclusive is None:
+            exclusive = self._build_exclusive_resources(resource_type)
+            self.resources[resource_type] = exclusive
+        return exclusive
+
+    def _build_exclusive_resources(self, resource_type: str) -> ExclusiveResources:
+        options = self.options
+        if not options.shared_storage_url or (
+            options.shared_resource_types
+            and resource_type not in options.shared_resource_types
+        ):
+            return ExclusiveResources(self.limiters_storage, fifo=options.fifo)
+
+        if self.shared_storage is None:
+            self.shared_storage = build_shared_storage(options.shared_storage_url)
+        return ExclusiveResources(
+            self.shared_storage.limiters,
+            fifo=options.fifo,
+            leases=ResourceLeases(
+                self.shared_storage.leases,
+                owner=self.owner,
+                ttl=options.lease_ttl,
+                retry_after=options.lease_retry_after,
+            ),
         )
 
     async def acquire(self, resource_type: str, wait: bool = True) -> ResourceContext:
-        return await self.resources[resource_type].acquire(wait=wait)
+        return await self.exclusive_resources(resource_type).acquire(wait=wait)
 
     async def acquire_many(
         self, resource_types: Iterable[str], wait: bool = True
     ) -> ResourcesContext:
-        # Ensure we lock in sorted order to avoid deadlock.
-        sorted_types = sorted(resource_types)
+        """Acquire one resource of each type, all at once.
+
+        Resources are never held while waiting for the others, which avoids
+        deadlocks between tasks acquiring overlapping resource types.
+        """
+        exclusives = {
+            resource_type: self.exclusive_resources(resource_type)
+            for resource_type in dict.fromkeys(resource_types)
+        }
+
+        def try_acquire_all() -> t.Optional[dict[str, ResourceData]]:
+            acquired: dict[str, ResourceData] = {}
+            for resource_type, exclusive in exclusives.items():
+                resource = exclusive.try_acquire()
+                if resource is None:
+                    for acquired_type, acquired_resource in acquired.items():
+                        exclusives[acquired_type].put_back(acquired_resource)
+                    return None
+                acquired[resource_type] = resource
+            return acquired
+
+        async def lease_all(acquired: dict[str, ResourceData]) -> bool:
+            leased: list[str] = []
+            try:
+                for resource_type, resource in acquired.items():
+                    if not await exclusives[resource_type].lease(resource):
+                        return False
+                    leased.append(resource_type)
+                return True
+            finally:
+                if len(leased) < len(acquired):
+                    # Undo the leases, the resources that failed to be leased
+                    # were already given back by `lease`.
+                    for resource_type, resource in acquired.items():
+                        exclusive = exclusives[resource_type]
+                        if resource_type in leased:
+                            await exclusive.release(resource)
+                        elif resource in exclusive.used:
+                            exclusive.put_back(resource)
+                            exclusive.wake_up_waiter()
+
+        while True:
+            acquired = None
+            if all(exclusive.can_barge() for exclusive in exclusives.values()):
+                acquired = try_acquire_all()
+            if acquired is None:
+                if not wait:
+                    raise ResourceUnavailable()
+                waiter = ResourcesWaiter(list(exclusives.values()))
+                acquired = await waiter.wait_for(try_acquire_all)
+            if await lease_all(acquired):
+                break
+
         resources = {}
-        # Use an ExitStack to ensure that any error while acquiring a resource
-        # will release previously locked resource.
+        # Use an ExitStack to ensure that any error while entering a resource
+        # will release all locked resources.
         async with contextlib.AsyncExitStack() as stack:
-            for resource_type in sorted_types:
-                resource = await self.acquire(resource_type, wait=wait)
-                resources[resource_type] = await stack.enter_async_context(resource)
+            contexts = {
+                resource_type: ResourceContext(resource, exclusives[resource_type])
+                for resource_type, resource in acquired.items()
+            }
+            for context in contexts.values():
+                stack.push_async_callback(context.release)
+            for resource_type, context in contexts.items():
+                resources[resource_type] = await context.__aenter__()
             # Disown the exit stack from this context. ResourcesContext is
             # going to be the new owner.
             stack = stack.pop_all()
         return ResourcesContext(resources, stack)
 
     async def release(self, resource: ResourceData) -> None:
-        await self.resources[resource.type].release(resource)
+        await self.exclusive_resources(resource.type).release(resource)
 
     async def add(self, resource: ResourceData) -> None:
-        await self.resources[resource.type].add(resource)
+        await self.exclusive_resources(resource.type).add(resource)
 
     async def remove(self, resource: ResourceKey) -> None:
-        await self.resources[resource.type].remove(resource.name)
+        await self.exclusive_resources(resource.type).remove(resource.name)
+
+    async def close(self) -> None:
+        for exclusive in self.resources.values():
+            if exclusive.leases:
+                await exclusive.leases.close()
+        if self.shared_storage:
+            try:
+                await self.shared_storage.close()
+            except Exception:
+                self.logger.exception("Failed to close shared storage")
+            self.shared_storage = None
@@ -0,0 +1,283 @@
+import typing as t
+
+import abc
+import asyncio
+import dataclasses
+import time
+
+from limits.aio import storage
+
+from datalineup_engine.utils.log import getLogger
+
+if t.TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+class LeaseStorage(abc.ABC):
+    """Store exclusive leases shared between workers.
+
+    A lease is held by a single owner until it is released or its TTL expires.
+    """
+
+    @abc.abstractmethod
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool: ...
+
+    @abc.abstractmethod
+    async def renew(self, key: str, owner: str, ttl: float) -> bool: ...
+
+    @abc.abstractmethod
+    async def release(self, key: str, owner: str) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryLeaseStorage(LeaseStorage):
+    """Process-local stand-in for a shared lease storage."""
+
+    def __init__(self) -> None:
+        self.leases: dict[str, tuple[str, float]] = {}
+
+    def _owner(self, key: str) -> t.Optional[str]:
+        lease = self.leases.get(key)
+        if lease is None:
+            return None
+        owner, expire_at = lease
+        if expire_at <= time.monotonic():
+            del self.leases[key]
+            return None
+        return owner
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        if self._owner(key) not in (None, owner):
+            return False
+        self.leases[key] = (owner, time.monotonic() + ttl)
+        return True
+
+    async def renew(self, key: str, owner: str, ttl: float) -> bool:
+        if self._owner(key) != owner:
+            return False
+        self.leases[key] = (owner, time.monotonic() + ttl)
+        return True
+
+    async def release(self, key: str, owner: str) -> None:
+        if self._owner(key) == owner:
+            del self.leases[key]
+
+
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLeaseStorage(LeaseStorage):
+    def __init__(self, redis: "Redis") -> None:
+        self.redis = redis
+        self.renew_script = redis.register_script(_RENEW_SCRIPT)
+        self.release_script = redis.register_script(_RELEASE_SCRIPT)
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        if await self.redis.set(key, owner, px=int(ttl * 1000), nx=True):
+            return True
+        # We might already own the lease, from a previous acquire that
+        # didn't get its response.
+        return bool(await self.renew(key, owner, ttl))
+
+    async def renew(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(await self.renew_script(keys=[key], args=[owner, int(ttl * 1000)]))
+
+    async def release(self, key: str, owner: str) -> None:
+        await self.release_script(keys=[key], args=[owner])
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+_INCR_SCRIPT = """
+local current = redis.call('incrby', KEYS[1], ARGV[2])
+if tonumber(current) == tonumber(ARGV[2]) or ARGV[3] == '1' then
+    redis.call('expire', KEYS[1], ARGV[1])
+end
+return current
+"""
+
+_ACQUIRE_ENTRY_SCRIPT = """
+local timestamp = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local expiry = tonumber(ARGV[3])
+local amount = tonumber(ARGV[4])
+local entry = redis.call('lindex', KEYS[1], limit - amount)
+if entry and tonumber(entry) >= timestamp - expiry then
+    return 0
+end
+for i = 1, amount do
+    redis.call('lpush', KEYS[1], ARGV[1])
+end
+redis.call('ltrim', KEYS[1], 0, limit - 1)
+redis.call('expire', KEYS[1], expiry)
+return 1
+"""
+
+_MOVING_WINDOW_SCRIPT = """
+local items = redis.call('lrange', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+local oldest = nil
+local count = 0
+for _, item in ipairs(items) do
+    if tonumber(item) >= tonumber(ARGV[1]) - tonumber(ARGV[3]) then
+        oldest = item
+        count = count + 1
+    end
+end
+return {oldest or ARGV[1], count}
+"""
+
+
+class RedisLimiterStorage(storage.Storage, storage.MovingWindowSupport):
+    """`limits` storage on top of redis-py, shared by all workers.
+
+    `limits` own Redis storage for asyncio depends on coredis while we already
+    rely on redis-py.
+    """
+
+    STORAGE_SCHEME = None
+
+    def __init__(self, redis: "Redis") -> None:
+        super().__init__()
+        self.redis = redis
+        self.incr_script = redis.register_script(_INCR_SCRIPT)
+        self.acquire_entry_script = redis.register_script(_ACQUIRE_ENTRY_SCRIPT)
+        self.moving_window_script = redis.register_script(_MOVING_WINDOW_SCRIPT)
+
+    async def incr(
+        self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1
+    ) -> int:
+        return int(
+            await self.incr_script(
+                keys=[key], args=[expiry, amount, int(elastic_expiry)]
+            )
+        )
+
+    async def get(self, key: str) -> int:
+        return int(await self.redis.get(key) or 0)
+
+    async def get_expiry(self, key: str) -> int:
+        return int(max(await self.redis.ttl(key), 0) + time.time())
+
+    async def check(self) -> bool:
+        return bool(await self.redis.ping())
+
+    async def reset(self) -> t.Optional[int]:
+        return None
+
+    async def clear(self, key: str) -> None:
+        await self.redis.delete(key)
+
+    async def acquire_entry(
+        self, key: str, limit: int, expiry: int, amount: int = 1
+    ) -> bool:
+        return bool(
+            await self.acquire_entry_script(
+                keys=[key], args=[time.time(), limit, expiry, amount]
+            )
+        )
+
+    async def get_moving_window(
+        self, key: str, limit: int, expiry: int
+    ) -> tuple[int, int]:
+        oldest, count = await self.moving_window_script(
+            keys=[key], args=[time.time(), limit, expiry]
+        )
+        return int(float(oldest)), int(count)
+
+
+@dataclasses.dataclass
+class SharedStorage:
+    limiters: storage.Storage
+    leases: LeaseStorage
+
+    async def close(self) -> None:
+        await self.leases.close()
+
+
+_MEMORY_STORAGES: dict[str, SharedStorage] = {}
+
+
+def build_shared_storage(url: str) -> SharedStorage:
+    """Build the storage for `url`, either a Redis URL or `memory://<name>`
+    for a stand-in shared by the resources managers of the current process.
+    """
+    if url.startswith("memory://"):
+        if url not in _MEMORY_STORAGES:
+            _MEMORY_STORAGES[url] = SharedStorage(
+                limiters=storage.MemoryStorage(), leases=MemoryLeaseStorage()
+            )
+        return _MEMORY_STORAGES[url]
+
+    from redis.asyncio import Redis
+
+    redis = Redis.from_url(url)
+    return SharedStorage(
+        limiters=RedisLimiterStorage(redis), leases=RedisLeaseStorage(redis)
+    )
+
+
+class ResourceLeases:
+    """Hold leases on exclusive resources, renewing them in the background
+    until they are released."""
+
+    def __init__(
+        self, leases: LeaseStorage, *, owner: str, ttl: float, retry_after: float
+    ) -> None:
+        self.logger = getLogger(__name__, self)
+        self.leases = leases
+        self.owner = owner
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.heartbeats: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def key(resource_type: str, resource_name: str) -> str:
+        return f"datalineup:resources:lease:{resource_type}:{resource_name}"
+
+    async def acquire(self, key: str) -> bool:
+        if not await self.leases.acquire(key, self.owner, self.ttl):
+            return False
+        self.heartbeats[key] = asyncio.create_task(
+            self._heartbeat(key), name=f"resource-lease-heartbeat({key})"
+        )
+        return True
+
+    async def release(self, key: str) -> None:
+        heartbeat = self.heartbeats.pop(key, None)
+        if heartbeat:
+            heartbeat.cancel()
+        try:
+            await self.leases.release(key, self.owner)
+        except Exception:
+            # The lease is going to expire on its own.
+            self.logger.exception("Failed to release lease: %s", key)
+
+    async def close(self) -> None:
+        """Release all the leases still held."""
+        for key in list(self.heartbeats):
+            await self.release(key)
+
+    async def _heartbeat(self, key: str) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                if not await self.leases.renew(key, self.owner, self.ttl):
+                    self.logger.warning("Lost resource lease: %s", key)
+                    return
+            except Exception:
+                self.logger.exception("Failed to renew lease: %s", key)
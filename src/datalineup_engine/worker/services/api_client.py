@@ -47,6 +47,7 @@ class StandaloneApiClient(Service[StandaloneServices, None]):
     client: StandaloneWorkerManagerClient
 
     SYNC_DELAY = 60
+    RETENTION_DELAY = 3600
 
     async def open(self) -> None:
         await self.init_db()
@@ -59,6 +60,9 @@ class StandaloneApiClient(Service[StandaloneServices, None]):
         self.services.tasks_runner.create_task(
             self._sync_jobs(), name="StandaloneClient.sync-jobs"
         )
+        self.services.tasks_runner.create_task(
+            self._apply_retention(), name="StandaloneClient.apply-retention"
+        )
 
     async def init_db(self) -> None:
         # TODO: Eventually figure out some nice monadic pattern to support both
@@ -77,3 +81,8 @@ class StandaloneApiClient(Service[StandaloneServices, None]):
         while True:
             await asyncio.sleep(self.SYNC_DELAY)
             await self.client.sync_jobs()
+
+    async def _apply_retention(self) -> None:
+        while True:
+            await asyncio.sleep(self.RETENTION_DELAY)
+            await self.client.apply_retention()
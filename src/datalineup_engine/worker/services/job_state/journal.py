@@ -0,0 +1,129 @@
+import typing as t
+
+import concurrent.futures
+import dataclasses
+import json
+import os
+from pathlib import Path
+
+from datalineup_engine.core import JobId
+from datalineup_engine.utils.log import getLogger
+from datalineup_engine.utils.options import fromdict
+from datalineup_engine.utils.options import json_serializer
+
+if t.TYPE_CHECKING:
+    from .store import JobsStates
+    from .store import JobState
+
+SEGMENT_SUFFIX: t.Final[str] = ".journal"
+
+
+class JobsStatesJournal:
+    """Append-only journal of jobs states updates, kept in local segment files.
+
+    Updates are written to the current segment as they happen. Flushing the
+    store rotates to a new segment and discards the previous ones once the
+    flush succeeded, so segments left on disk after a restart hold exactly
+    the updates that never reached the manager.
+
+    Files are written by a dedicated thread to keep the event loop free.
+    Segments are owned by a single process, the journal directory must not
+    be shared between workers.
+    """
+
+    def __init__(self, path: Path, *, fsync: bool = False) -> None:
+        self.logger = getLogger(__name__, self)
+        self.path = path
+        self.fsync = fsync
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._segments = sorted(
+            (p for p in self.path.glob(f"*{SEGMENT_SUFFIX}") if p.stem.isdigit()),
+            key=lambda p: int(p.stem),
+        )
+        self._last_index = int(self._segments[-1].stem) if self._segments else 0
+        self._segment: t.Optional[Path] = None
+        self._file: t.Optional[t.TextIO] = None
+        self._writer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="jobs-states-journal"
+        )
+
+    def replay(self) -> "JobsStates":
+        """Load the updates left by a previous process."""
+        from .store import JobsStates
+        from .store import JobState
+
+        states = JobsStates()
+        for segment in self._segments:
+            with segment.open() as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        job_name = JobId(entry["job"])
+                        state = fromdict(entry["state"], JobState)
+                    except Exception:
+                        # A crash might have left the last update truncated.
+                        self.logger.warning("Skipping invalid entry in %s", segment)
+                        continue
+                    states.merge(JobsStates(jobs={job_name: state}))
+        if self._segments:
+            self.logger.info(
+                "Replayed %d jobs states from %d segments",
+                len(states.jobs),
+                len(self._segments),
+            )
+        return states
+
+    def append(self, job_name: JobId, state: "JobState") -> None:
+        if self._segment is None:
+            self._last_index += 1
+            self._segment = self.path / f"{self._last_index:012d}{SEGMENT_SUFFIX}"
+            self._segments.append(self._segment)
+        data = {k: v for k, v in dataclasses.asdict(state).items() if v}
+        line = json_serializer({"job": job_name, "state": data}) + "\n"
+        self._submit(self._write, self._segment, line)
+
+    def rotate(self) -> list[Path]:
+        """Start a new segment for the next updates and return the segments
+        holding the previous ones."""
+        self._segment = None
+        self._submit(self._close_file)
+        segments, self._segments = self._segments, []
+        return segments
+
+    def discard(self, segments: list[Path]) -> None:
+        self._submit(self._unlink, segments)
+
+    def restore(self, segments: list[Path]) -> None:
+        """Keep segments returned by `rotate` whose updates failed to flush."""
+        self._segments = segments + self._segments
+
+    def close(self) -> None:
+        """Wait for the pending writes and close the current segment."""
+        self._segment = None
+        self._submit(self._close_file)
+        self._writer.shutdown(wait=True)
+
+    def _submit(self, func: t.Callable[..., None], *args: t.Any) -> None:
+        # A single writer thread keeps the writes in order.
+        self._writer.submit(func, *args).add_done_callback(self._log_error)
+
+    def _log_error(self, future: concurrent.futures.Future) -> None:
+        if error := future.exception():
+            self.logger.error("Failed to write journal", exc_info=error)
+
+    def _write(self, segment: Path, line: str) -> None:
+        if self._file is None:
+            self._file = segment.open("a")
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _unlink(self, segments: list[Path]) -> None:
+        for segment in segments:
+            segment.unlink(missing_ok=True)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,9 +1,15 @@
 import typing as t
 
+import asyncio
 import dataclasses
 import enum
 import hashlib
+import time
+from collections import OrderedDict
 from collections import defaultdict
+from pathlib import Path
+
+from opentelemetry.metrics import get_meter
 
 from datalineup_engine.client.worker_manager import WorkerManagerClient
 from datalineup_engine.core import Cursor
@@ -18,6 +24,7 @@ from datalineup_engine.core.types import CursorStateKey
 from datalineup_engine.utils import assert_never
 from datalineup_engine.utils.asyncutils import DelayedThrottle
 from datalineup_engine.utils.log import getLogger
+from datalineup_engine.utils.telemetry import get_timer
 from datalineup_engine.worker.executors.executable import ExecutableMessage
 from datalineup_engine.worker.services.hooks import ItemsBatch
 from datalineup_engine.worker.services.hooks import PipelineEventsEmitted
@@ -25,6 +32,7 @@ from datalineup_engine.worker.services.hooks import PipelineEventsEmitted
 from .. import BaseServices
 from .. import Service
 from ..api_client import ApiClient
+from .journal import JobsStatesJournal
 from .store import JobsStates
 from .store import JobsStatesSyncStore
 
@@ -56,6 +64,24 @@ class Options:
         default_factory=lambda: [CursorFormat.SHA256]
     )
     save_cursor_format: CursorFormat = CursorFormat.SHA256
+    #: Number of cursors states kept in memory once fetched or saved, 0 to
+    #: always fetch them from the manager. Cached states are only invalidated
+    #: when a job is assigned to this worker, so the cache is bypassed for
+    #: jobs setting `cursors_states_namespace`, as other workers might update
+    #: their states.
+    cursors_states_cache_size: int = 0
+    #: Seconds before a cached cursor state is fetched again.
+    cursors_states_cache_ttl: float = 600.0
+    #: Directory of a local journal of the updates not flushed yet, replayed
+    #: on restart so a crash doesn't lose them. Each worker process needs its
+    #: own directory.
+    journal_path: t.Optional[str] = None
+    #: Sync each journal update to the disk, surviving host crashes as well.
+    journal_fsync: bool = False
+    #: Write large inventories cursors in the compact format. Only enable once
+    #: every worker can read it, older workers would resume from the whole
+    #: encoded cursor.
+    compact_cursors: bool = False
 
 
 @dataclasses.dataclass
@@ -85,6 +111,92 @@ class FormattedRequest:
         return self.by_formatted.get(key)
 
 
+class CursorsStatesCache:
+    """Bounded cache of the cursors states, including the cursors without
+    state, evicting the least recently used ones."""
+
+    def __init__(self, *, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+        #: Cursor state with its expiration time, by job and cursor.
+        self.entries: OrderedDict[
+            tuple[JobId, Cursor], tuple[float, t.Optional[dict]]
+        ] = OrderedDict()
+        #: Cached cursors by job.
+        self.cursors: dict[JobId, set[Cursor]] = defaultdict(set)
+        #: Jobs whose states are never cached.
+        self.bypass: set[JobId] = set()
+
+        meter = get_meter("datalineup.metrics")
+        self.hit_counter = meter.create_counter(
+            name="datalineup.job_state.cursors_states_cache.hit",
+            description="Counts the cursors states found in the cache.",
+        )
+        self.miss_counter = meter.create_counter(
+            name="datalineup.job_state.cursors_states_cache.miss",
+            description="Counts the cursors states missing from the cache.",
+        )
+
+    def get(
+        self, job_name: JobId, *, cursors: list[Cursor]
+    ) -> tuple[dict[Cursor, dict], list[Cursor]]:
+        """Return the cached states and the cursors missing from the cache."""
+        if job_name in self.bypass:
+            return {}, cursors
+
+        states = {}
+        missing = []
+        now = time.monotonic()
+        for cursor in cursors:
+            key = (job_name, cursor)
+            entry = self.entries.get(key)
+            if entry is None:
+                missing.append(cursor)
+                continue
+            expire_at, state = entry
+            if expire_at <= now:
+                self._remove(key)
+                missing.append(cursor)
+                continue
+            self.entries.move_to_end(key)
+            if state is not None:
+                states[cursor] = state
+
+        params = {"datalineup.job.name": job_name}
+        if hits := len(cursors) - len(missing):
+            self.hit_counter.add(hits, params)
+        if missing:
+            self.miss_counter.add(len(missing), params)
+        return states, missing
+
+    def set(self, job_name: JobId, cursor: Cursor, state: t.Optional[dict]) -> None:
+        if job_name in self.bypass:
+            return
+        key = (job_name, cursor)
+        self.entries[key] = (time.monotonic() + self.ttl, state)
+        self.entries.move_to_end(key)
+        self.cursors[job_name].add(cursor)
+        while len(self.entries) > self.size:
+            self._remove(next(iter(self.entries)))
+
+    def add(self, job_name: JobId, cursor: Cursor, state: t.Optional[dict]) -> None:
+        """Cache a fetched state, unless a newer one was set meanwhile."""
+        if (job_name, cursor) not in self.entries:
+            self.set(job_name, cursor, state)
+
+    def invalidate(self, job_name: JobId) -> None:
+        for cursor in self.cursors.pop(job_name, ()):
+            del self.entries[(job_name, cursor)]
+
+    def _remove(self, key: tuple[JobId, Cursor]) -> None:
+        del self.entries[key]
+        job_name, cursor = key
+        cursors = self.cursors[job_name]
+        cursors.discard(cursor)
+        if not cursors:
+            del self.cursors[job_name]
+
+
 class CursorsStatesFetcher:
     def __init__(
         self,
@@ -92,9 +204,11 @@ class CursorsStatesFetcher:
         client: WorkerManagerClient,
         formats: list[CursorFormat],
         fetch_delay: float = 0,
+        cache: t.Optional[CursorsStatesCache] = None,
     ) -> None:
         self.client = client
         self.formats = formats
+        self.cache = cache
         self.pending_queries: dict[JobId, set[Cursor]] = defaultdict(set)
         self._delayed_fetch = DelayedThrottle(self._do_fetch, delay=fetch_delay)
 
@@ -121,14 +235,26 @@ class CursorsStatesFetcher:
                 if v is not None
                 and (fk := formatted_cursors[job_name].map(k)) is not None
             }
+
+        if self.cache:
+            for job_name, cursors in queries.items():
+                states = mapped_cursors.get(job_name, {})
+                for cursor in cursors:
+                    self.cache.add(job_name, cursor, states.get(cursor))
         return mapped_cursors
 
     async def fetch(
         self, job_name: JobId, *, cursors: list[Cursor]
     ) -> dict[Cursor, dict]:
+        states: dict[Cursor, dict] = {}
+        if self.cache:
+            states, cursors = self.cache.get(job_name, cursors=cursors)
+            if not cursors:
+                return states
+
         self.pending_queries[job_name].update(cursors)
         result = await self._delayed_fetch()
-        return result.get(job_name, {})
+        return states | result.get(job_name, {})
 
 
 class JobStateService(Service[Services, Options]):
@@ -137,20 +263,45 @@ class JobStateService(Service[Services, Options]):
     Services = Services
     Options = Options
 
+    _journal: t.Optional[JobsStatesJournal]
+    _cursors_cache: t.Optional[CursorsStatesCache]
     _store: JobsStatesSyncStore
     _delayed_flush: DelayedThrottle
 
     async def open(self) -> None:
         self.logger = getLogger(__name__, self)
-        self._store = JobsStatesSyncStore()
+        self._journal = None
+        if self.options.journal_path:
+            self._journal = JobsStatesJournal(
+                Path(self.options.journal_path), fsync=self.options.journal_fsync
+            )
+        self._store = JobsStatesSyncStore(journal=self._journal)
+        self._cursors_cache = None
+        if self.options.cursors_states_cache_size > 0:
+            self._cursors_cache = CursorsStatesCache(
+                size=self.options.cursors_states_cache_size,
+                ttl=self.options.cursors_states_cache_ttl,
+            )
         self._cursors_fetcher = CursorsStatesFetcher(
             client=self.services.api_client.client,
             formats=self.options.fetch_cursor_formats,
+            cache=self._cursors_cache,
         )
         self._delayed_flush = DelayedThrottle(
             self.flush, delay=self.options.flush_delay
         )
 
+        meter = get_meter("datalineup.metrics")
+        self.fetch_duration = meter.create_histogram(
+            name="datalineup.job_state.cursors_states_fetch.duration",
+            unit="ms",
+            description="Time spent loading the cursors states of a batch.",
+        )
+        self.fetch_errors = meter.create_counter(
+            name="datalineup.job_state.cursors_states_fetch.errors",
+            description="Counts the batches whose cursors states failed to load.",
+        )
+
         self.services.hooks.work_queue_built.register(self.on_work_queue_built)
         self.services.hooks.items_batched.register(self.on_items_batched)
         self.services.hooks.message_polled.register(self.on_message_polled)
@@ -158,12 +309,26 @@ class JobStateService(Service[Services, Options]):
             self.on_pipeline_events_emitted
         )
 
+        # Send the updates replayed from the journal.
+        if not self._store.is_empty:
+            self._maybe_flush()
+
     async def on_work_queue_built(self, queue_item: QueueItemWithState) -> None:
         # Ensure the job batching is enabled when we have cursors states enabled.
         # Otherwise on_items_batch won't emit.
         if queue_item.config.get("job_state", {}).get("cursors_states_enabled"):
             queue_item.config.setdefault("job", {})["batching_enabled"] = True
 
+        # The job might have been processed by other workers since we last
+        # cached its cursors states.
+        if self._cursors_cache:
+            namespace = queue_item.config.get("job_state", {}).get(
+                "cursors_states_namespace"
+            )
+            if namespace:
+                self._cursors_cache.bypass.add(JobId(namespace))
+            self._cursors_cache.invalidate(namespace or queue_item.name)
+
     async def on_items_batched(self, batch: ItemsBatch) -> None:
         # Default `i.metadata["job_state"]["state_cursor"]` to `i.cursor`
         for item in batch.items:
@@ -179,9 +344,15 @@ class JobStateService(Service[Services, Options]):
             or batch.job.name
         )
 
-        cursors_states: dict = await self.fetch_cursors_states(
-            namespace, cursors=cursors
-        )
+        params = {"datalineup.job.name": batch.job.name}
+        try:
+            with get_timer(self.fetch_duration).time(params):
+                cursors_states: dict = await self.fetch_cursors_states(
+                    namespace, cursors=cursors
+                )
+        except Exception:
+            self.fetch_errors.add(1, params)
+            raise
         for item in batch.items:
             metadata = item.metadata.setdefault("job_state", {})
             metadata["cursor_state"] = cursors_states.get(metadata["state_cursor"])
@@ -235,6 +406,8 @@ class JobStateService(Service[Services, Options]):
         self._store.set_job_cursor_state(
             job_name, cursor=cursor, cursor_state=cursor_state
         )
+        if self._cursors_cache:
+            self._cursors_cache.set(job_name, cursor, cursor_state)
         self._maybe_flush()
 
     async def fetch_cursors_states(
@@ -266,6 +439,8 @@ class JobStateService(Service[Services, Options]):
         self.logger.info("Closing")
         self._maybe_flush()
         await self._delayed_flush.flush()
+        if self._journal:
+            await asyncio.get_event_loop().run_in_executor(None, self._journal.close)
 
     def _prepare_jobs_states(self, states: JobsStates) -> api.JobsStates:
         jobs = {}
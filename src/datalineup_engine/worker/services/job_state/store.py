@@ -9,6 +9,8 @@ from datalineup_engine.core import JobId
 from datalineup_engine.core import api
 from datalineup_engine.utils import utcnow
 
+from .journal import JobsStatesJournal
+
 
 @dataclasses.dataclass
 class JobCompletion(api.JobCompletion):
@@ -64,24 +66,31 @@ class JobsStates:
 
 
 class JobsStatesSyncStore:
-    def __init__(self) -> None:
+    def __init__(self, journal: t.Optional[JobsStatesJournal] = None) -> None:
+        self._journal = journal
         self._current_state = JobsStates()
         self._flushing_state: t.Optional[JobsStates] = None
+        if journal:
+            self._current_state = journal.replay()
 
     def set_job_cursor(self, job_name: JobId, cursor: Cursor) -> None:
         self._current_state.jobs[job_name].cursor = cursor
+        if self._journal:
+            self._journal.append(job_name, JobState(cursor=cursor))
 
     def set_job_completed(self, job_name: JobId) -> None:
-        self._current_state.jobs[job_name].completion = JobCompletion(
-            completed_at=utcnow(),
-        )
+        self._set_job_completion(job_name, JobCompletion(completed_at=utcnow()))
 
     def set_job_failed(self, job_name: JobId, error: str) -> None:
-        self._current_state.jobs[job_name].completion = JobCompletion(
-            completed_at=utcnow(),
-            error=error,
+        self._set_job_completion(
+            job_name, JobCompletion(completed_at=utcnow(), error=error)
         )
 
+    def _set_job_completion(self, job_name: JobId, completion: JobCompletion) -> None:
+        self._current_state.jobs[job_name].completion = completion
+        if self._journal:
+            self._journal.append(job_name, JobState(completion=completion))
+
     def set_job_cursor_state(
         self,
         job_name: JobId,
@@ -90,6 +99,14 @@ class JobsStatesSyncStore:
         cursor_state: dict,
     ) -> None:
         self._current_state.jobs[job_name].cursors_states[cursor] = cursor_state
+        if self._journal:
+            self._journal.append(
+                job_name, JobState(cursors_states={cursor: cursor_state})
+            )
+
+    @property
+    def is_empty(self) -> bool:
+        return self._current_state.is_empty
 
     @contextlib.contextmanager
     def flush(self) -> t.Iterator[JobsStates]:
@@ -97,16 +114,23 @@ class JobsStatesSyncStore:
         The yielded object won't be updated while inside the context.
         If an error happen inside the context, the state is restored and
         merged with any change that occured during the flush.
+        With a journal, the flushed updates are discarded from it once the
+        context exits without error.
         """
         self._flushing_state = self._current_state
         self._current_state = JobsStates()
+        segments = self._journal.rotate() if self._journal else []
 
         try:
             yield self._flushing_state
         except BaseException:
             self._current_state = self._flushing_state.merge(self._current_state)
             self._flushing_state = None
+            if self._journal:
+                self._journal.restore(segments)
             raise
+        if self._journal:
+            self._journal.discard(segments)
 
     def job_state(self, job_name: JobId) -> JobState:
         return self._current_state.jobs[job_name]
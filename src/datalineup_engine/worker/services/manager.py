@@ -21,10 +21,15 @@ class MissingServiceError(Exception):
 class ServicesManager:
     def __init__(self, config: Config) -> None:
         config = config.register_interface(Hooks.name, Hooks.Options())
+        config = config.register_interface(
+            ResourcesManager.name, ResourcesManager.Options()
+        )
         self.services: Services = ServicesNamespace(
             config=config,
             hooks=Hooks.from_options(config.r.get("hooks", {})),
-            resources_manager=ResourcesManager(),
+            resources_manager=ResourcesManager.from_options(
+                config.r.get("resources_manager", {})
+            ),
         )
         self.loaded_services: list[Service] = []
         self.is_opened = False
@@ -65,6 +70,7 @@ class ServicesManager:
             return
         for service in reversed(self.loaded_services):
             await service.close()
+        await self.services.s.resources_manager.close()
 
     def _load_service(self, service_cls: Type[TService]) -> TService:
         if service_cls.name in self.services:
@@ -29,6 +29,29 @@ class Topic(OptionsSchema):
     async def publish(self, message: TopicMessage, wait: bool) -> bool:
         raise NotImplementedError()
 
+    async def publish_many(
+        self, messages: list[TopicMessage], wait: bool
+    ) -> list[t.Union[bool, Exception]]:
+        """Publish messages in order. Return for each message whether it was
+        published or the exception that failed its publishing.
+
+        By default, once a message couldn't be published, the following ones
+        aren't published either.
+        """
+        results: list[t.Union[bool, Exception]] = []
+        for message in messages:
+            try:
+                published = await self.publish(message, wait)
+            except Exception as e:
+                results.append(e)
+                published = False
+            else:
+                results.append(published)
+            if not published:
+                break
+        results.extend([False] * (len(messages) - len(results)))
+        return results
+
     async def open(self) -> None:
         pass
 
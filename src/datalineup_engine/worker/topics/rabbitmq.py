@@ -6,6 +6,8 @@ import dataclasses
 import enum
 import json
 import pickle  # noqa: S403
+import zlib
+from collections import deque
 from collections.abc import AsyncGenerator
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -33,6 +35,10 @@ from ..topic import TopicClosedError
 class RabbitMQSerializer(enum.Enum):
     JSON = "json"
     PICKLE = "pickle"
+    # Same encoding as `JSON`, using orjson (`rabbitmq-serializers` extra).
+    ORJSON = "orjson"
+    # Requires msgpack (`rabbitmq-serializers` extra).
+    MSGPACK = "msgpack"
 
     @property
     def content_type(self) -> str:
@@ -46,13 +52,80 @@ class RabbitMQSerializer(enum.Enum):
 SerializerToContentType = {
     RabbitMQSerializer.JSON: "application/json",
     RabbitMQSerializer.PICKLE: "application/python-pickle",
+    RabbitMQSerializer.ORJSON: "application/json",
+    RabbitMQSerializer.MSGPACK: "application/msgpack",
 }
 
+# The first serializer of a content type is the one used to decode it.
 ContentTypeToSerializer: dict[str, RabbitMQSerializer] = {
-    v: k for k, v in SerializerToContentType.items()
+    v: k for k, v in reversed(SerializerToContentType.items())
 }
 
 
+class RabbitMQCompression(enum.Enum):
+    """Compression applied to message bodies, set as their content encoding."""
+
+    ZLIB = "deflate"
+    # Requires zstandard (`rabbitmq-compression` extra).
+    ZSTD = "zstd"
+    # Requires lz4 (`rabbitmq-compression` extra).
+    LZ4 = "lz4"
+
+    @classmethod
+    def from_content_encoding(
+        cls, content_encoding: str
+    ) -> "RabbitMQCompression | None":
+        try:
+            return cls(content_encoding)
+        except ValueError:
+            return None
+
+    def compress(self, data: bytes) -> bytes:
+        if self is RabbitMQCompression.ZSTD:
+            import zstandard
+
+            return zstandard.ZstdCompressor().compress(data)
+        if self is RabbitMQCompression.LZ4:
+            import lz4.frame
+
+            return lz4.frame.compress(data)
+        return zlib.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        if self is RabbitMQCompression.ZSTD:
+            import zstandard
+
+            return zstandard.ZstdDecompressor().decompress(data)
+        if self is RabbitMQCompression.LZ4:
+            import lz4.frame
+
+            return lz4.frame.decompress(data)
+        return zlib.decompress(data)
+
+
+def json_loads(data: bytes) -> t.Any:
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(data)
+
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # orjson is stricter than json, such as with NaN.
+        return json.loads(data)
+
+
+def orjson_dumps(obj: t.Any) -> bytes:
+    import orjson
+
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        # Such as integers larger than 64 bits.
+        return json.dumps(obj).encode()
+
+
 @dataclasses.dataclass
 class Exchange:
     name: str
@@ -65,8 +138,120 @@ class Exchange:
     timeout: int | float | None = None
 
 
+@dataclasses.dataclass(eq=False)
+class Delivery:
+    message: aio_pika.abc.AbstractIncomingMessage
+    generation: int
+    settled: bool = False
+    acked: bool = False
+
+
+class BatchAcker:
+    """Acknowledge the deliveries of a channel in batch.
+
+    Deliveries complete in any order, but only the oldest contiguous settled
+    deliveries can be acknowledged, with a single ack on the highest delivery
+    tag. Failed deliveries are rejected right away.
+    """
+
+    def __init__(self, *, batch_size: int, flush_after: float) -> None:
+        self.logger = getLogger(__name__, self)
+        self.batch_size = batch_size
+        self.flush_after = flush_after
+        self.deliveries: deque[Delivery] = deque()
+        self.generation = 0
+        self.lock = asyncio.Lock()
+        self.flush_task: t.Optional[asyncio.Task] = None
+
+    def track(self, message: aio_pika.abc.AbstractIncomingMessage) -> Delivery:
+        """Must be called in the deliveries order."""
+        delivery = Delivery(message=message, generation=self.generation)
+        self.deliveries.append(delivery)
+        return delivery
+
+    @asynccontextmanager
+    async def process(
+        self, delivery: Delivery, *, requeue: bool
+    ) -> AsyncIterator[None]:
+        try:
+            yield
+        except BaseException:
+            await self.settle(delivery, ack=False, requeue=requeue)
+            raise
+        await self.settle(delivery, ack=True)
+
+    async def settle(
+        self, delivery: Delivery, *, ack: bool, requeue: bool = False
+    ) -> None:
+        if delivery.generation != self.generation:
+            # The channel was closed, the message is going to be redelivered.
+            return
+        if not ack:
+            await delivery.message.reject(requeue=requeue)
+        delivery.acked = ack
+        delivery.settled = True
+
+        ready = 0
+        for pending in self.deliveries:
+            if not pending.settled:
+                break
+            ready += 1
+        if ready == len(self.deliveries) or ready >= self.batch_size:
+            await self.flush()
+        elif ready and self.flush_task is None:
+            self.flush_task = asyncio.create_task(
+                self.flush_later(), name="rabbitmq.batch-acker.flush"
+            )
+
+    async def flush(self) -> None:
+        async with self.lock:
+            last: t.Optional[Delivery] = None
+            while self.deliveries and self.deliveries[0].settled:
+                delivery = self.deliveries.popleft()
+                if delivery.acked:
+                    last = delivery
+            if last is not None:
+                await last.message.ack(multiple=True)
+
+    async def flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_after)
+            self.flush_task = None
+            await self.flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.logger.exception("Failed to acknowledge messages")
+
+    def reset(self) -> None:
+        """Forget all deliveries, such as when their channel is closed."""
+        self.generation += 1
+        self.deliveries.clear()
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+
+    async def close(self) -> None:
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            self.logger.exception("Failed to acknowledge messages")
+        self.reset()
+
+
 class RabbitMQTopic(Topic):
-    """A queue that consume message from RabbitMQ"""
+    """A queue that consume message from RabbitMQ
+
+    `publish_many` keeps up to `publish_window` messages waiting on their
+    publisher confirm at once.
+
+    With `ack_batch_size` greater than 1, processed messages are acknowledged
+    together with a single ack up to `ack_batch_size` messages or after
+    `ack_flush_after` seconds. `prefetch_count` should be raised accordingly.
+    """
 
     RETRY_PUBLISH_DELAY = timedelta(seconds=10)
     PUBLISH_TIMEOUT = timedelta(seconds=30)
@@ -83,13 +268,18 @@ class RabbitMQTopic(Topic):
         overflow: t.Optional[str] = "reject-publish"
         prefetch_count: t.Optional[int] = 1
         serializer: RabbitMQSerializer = RabbitMQSerializer.JSON
+        compression: RabbitMQCompression | None = None
+        compress_above_size: int = 4096
         log_above_size: t.Optional[int] = None
         max_publish_concurrency: int = 0
+        publish_window: int = 1
         max_retry: int | None = None
         arguments: dict[str, t.Any] = dataclasses.field(default_factory=dict)
         exchange: Exchange | None = None
         routing_key: str | None = None
         bind_arguments: dict[str, t.Any] | None = None
+        ack_batch_size: int = 1
+        ack_flush_after: float = 0.05
 
     class TopicServices:
         rabbitmq: RabbitMQService
@@ -107,6 +297,12 @@ class RabbitMQTopic(Topic):
         self.attempt_by_message: LRUDefaultDict[str, int] = LRUDefaultDict(
             cache_len=1024, default_factory=lambda: 0
         )
+        self.acker: t.Optional[BatchAcker] = None
+        if options.ack_batch_size > 1:
+            self.acker = BatchAcker(
+                batch_size=options.ack_batch_size,
+                flush_after=options.ack_flush_after,
+            )
 
         self.queue_arguments: dict[str, t.Any] = self.options.arguments
 
@@ -150,7 +346,8 @@ class RabbitMQTopic(Topic):
                 async with queue.iterator() as queue_iter:
                     async for message in queue_iter:
                         attempt = 0
-                        yield self.message_context(message)
+                        delivery = self.acker.track(message) if self.acker else None
+                        yield self.message_context(message, delivery=delivery)
                         self.received_bytes_counter.add(
                             message.body_size, {"topic": self.name}
                         )
@@ -169,15 +366,18 @@ class RabbitMQTopic(Topic):
         if self.is_closed:
             raise TopicClosedError()
 
-        attempt = 0
-
         # Wait for the queue to unblock.
         if not wait and self._publish_lock.locked_reservations():
             return False
 
+        return await self._publish(message, wait)
+
+    async def _publish(self, message: TopicMessage, wait: bool) -> bool:
+        attempt = 0
         async with self._publish_lock.reserve() as reservation:
             while True:
                 body = self._serialize(message)
+                body, content_encoding = self._compress(body)
                 try:
                     await self.ensure_queue()  # Ensure the queue is created.
                     exchange = await self.exchange
@@ -187,6 +387,7 @@ class RabbitMQTopic(Topic):
                                 body=body,
                                 delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
                                 content_type=self.options.serializer.content_type,
+                                content_encoding=content_encoding,
                                 expiration=message.expire_after,
                             ),
                             routing_key=self.options.routing_key
@@ -234,6 +435,43 @@ class RabbitMQTopic(Topic):
 
             return False
 
+    async def publish_many(
+        self, messages: list[TopicMessage], wait: bool
+    ) -> list[t.Union[bool, Exception]]:
+        if self.is_closed:
+            raise TopicClosedError()
+        if self.options.publish_window <= 1:
+            return await super().publish_many(messages, wait)
+
+        # Wait for the queue to unblock.
+        if not wait and self._publish_lock.locked_reservations():
+            return [False] * len(messages)
+
+        window = asyncio.Semaphore(self.options.publish_window)
+        stopped = False
+
+        async def publish(message: TopicMessage) -> t.Union[bool, Exception]:
+            nonlocal stopped
+            async with window:
+                # Like publishing one by one, messages following one that
+                # couldn't be published aren't published either.
+                if stopped or (not wait and self._publish_lock.locked()):
+                    stopped = True
+                    return False
+                try:
+                    # Wait for a reservation while the window holds the others
+                    # instead of giving up like `publish`.
+                    published = await self._publish(message, wait)
+                except Exception as e:
+                    stopped = True
+                    return e
+                stopped = stopped or not published
+                return published
+
+        # Tasks start in order, so messages are sent in order and only their
+        # confirms are awaited concurrently.
+        return list(await asyncio.gather(*(publish(m) for m in messages)))
+
     async def backoff_sleep(self, attempt: int) -> bool:
         if attempt >= len(self.FAILURE_RETRY_BACKOFFS):
             return False
@@ -243,7 +481,10 @@ class RabbitMQTopic(Topic):
 
     @asynccontextmanager
     async def message_context(
-        self, message: aio_pika.abc.AbstractIncomingMessage
+        self,
+        message: aio_pika.abc.AbstractIncomingMessage,
+        *,
+        delivery: t.Optional[Delivery] = None,
     ) -> AsyncIterator[TopicMessage]:
         requeue: bool = False
         if message.message_id and self.options.max_retry:
@@ -251,7 +492,12 @@ class RabbitMQTopic(Topic):
                 self.attempt_by_message.get(message.message_id, 0)
                 < self.options.max_retry
             )
-        async with message.process(requeue=requeue):
+        process: t.AsyncContextManager
+        if self.acker and delivery:
+            process = self.acker.process(delivery, requeue=requeue)
+        else:
+            process = message.process(requeue=requeue)
+        async with process:
             try:
                 yield self._deserialize(message)
             except Exception:
@@ -299,6 +545,8 @@ class RabbitMQTopic(Topic):
     def channel_closed(
         self, channel: aio_pika.abc.AbstractChannel, reason: t.Optional[Exception]
     ) -> None:
+        if self.acker:
+            self.acker.reset()
         extra = {"data": {"topic": {"id": self.name}}}
         if isinstance(reason, BaseException):
             self.logger.error("Channel closed", exc_info=reason, extra=extra)
@@ -337,11 +585,20 @@ class RabbitMQTopic(Topic):
 
     async def close(self) -> None:
         self.is_closed = True
+        if self.acker:
+            await self.acker.close()
         await self.exit_stack.aclose()
 
     def _serialize(self, message: TopicMessage) -> bytes:
-        if self.options.serializer == RabbitMQSerializer.PICKLE:
+        serializer = self.options.serializer
+        if serializer is RabbitMQSerializer.PICKLE:
             serialized_message = pickle.dumps(message)
+        elif serializer is RabbitMQSerializer.ORJSON:
+            serialized_message = orjson_dumps(asdict(message))
+        elif serializer is RabbitMQSerializer.MSGPACK:
+            import msgpack
+
+            serialized_message = msgpack.packb(asdict(message), use_bin_type=True)
         else:
             serialized_message = json.dumps(asdict(message)).encode()
 
@@ -364,9 +621,26 @@ class RabbitMQTopic(Topic):
             )
         return serialized_message
 
+    def _compress(self, body: bytes) -> tuple[bytes, t.Optional[str]]:
+        compression = self.options.compression
+        if compression is None or len(body) < self.options.compress_above_size:
+            return body, None
+        return compression.compress(body), compression.value
+
     def _deserialize(
         self, message: aio_pika.abc.AbstractIncomingMessage
     ) -> TopicMessage:
+        body = message.body
+        # Other producers might set encodings such as "utf-8", these bodies
+        # are left as is.
+        compression = None
+        if message.content_encoding:
+            compression = RabbitMQCompression.from_content_encoding(
+                message.content_encoding
+            )
+        if compression:
+            body = compression.decompress(body)
+
         serializer = self.options.serializer
         if message.content_type:
             message_serializer = RabbitMQSerializer.from_content_type(
@@ -376,9 +650,15 @@ class RabbitMQTopic(Topic):
                 serializer = message_serializer
 
         if serializer is RabbitMQSerializer.PICKLE:
-            deserialized = pickle.loads(message.body)  # noqa: S301
+            deserialized = pickle.loads(body)  # noqa: S301
             if not isinstance(deserialized, TopicMessage):
                 raise Exception("Deserialized RabbitMQ message is not a TopicMessage.")
             return deserialized
 
-        return fromdict(json.loads(message.body.decode()), TopicMessage)
+        if serializer is RabbitMQSerializer.MSGPACK:
+            import msgpack
+
+            data = msgpack.unpackb(body, raw=False, strict_map_key=False)
+        else:
+            data = json_loads(body)
+        return fromdict(data, TopicMessage)
@@ -13,6 +13,7 @@ from .executors.executable import ExecutableQueue
 from .inventories import Inventory
 from .job import Job
 from .services import Services
+from .services.job_state.service import JobStateService
 from .topics import Topic
 
 
@@ -53,9 +54,17 @@ def build_item(
     options = {"name": item_definition.name} | item_definition.options
     item = klass.from_options(options, services=services)
     item.name = item_definition.name
+    if isinstance(item, Inventory):
+        item.compact_cursors = _compact_cursors(services)
     return item
 
 
+def _compact_cursors(services: Services) -> bool:
+    # Inventories might be built without services, such as in tests.
+    job_state = services.get(JobStateService.name) if services else None
+    return isinstance(job_state, JobStateService) and job_state.options.compact_cursors
+
+
 def build_topic(topic_item: ComponentDefinition, *, services: Services) -> Topic:
     topic = build_item(topic_item, services=services)
     if not isinstance(topic, Topic):
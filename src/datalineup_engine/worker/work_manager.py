@@ -15,6 +15,8 @@ from datalineup_engine.core.api import ComponentDefinition
 from datalineup_engine.core.api import LockResponse
 from datalineup_engine.core.api import QueueItemWithState
 from datalineup_engine.core.api import ResourceItem
+from datalineup_engine.core.api import lock_version
+from datalineup_engine.utils.asyncutils import gather_limited
 from datalineup_engine.utils.log import getLogger
 from datalineup_engine.worker import work_factory
 from datalineup_engine.worker.context import job_context
@@ -57,6 +59,19 @@ class WorkSync:
 
 WorkerItems = dict[JobId, ExecutableQueue]
 
+#: How many queues or resources providers are built or opened at once.
+DEFAULT_OPEN_CONCURRENCY = 16
+
+
+def diff_names(
+    current: set[T], synced: set[T], dropped: Optional[list[T]]
+) -> tuple[set[T], set[T]]:
+    """Return the names to add and to drop. Without `dropped`, `synced` is all
+    the work to hold, otherwise it is only the work added."""
+    if dropped is None:
+        return synced - current, current - synced
+    return synced - current, current.intersection(dropped)
+
 
 class WorkManager:
     def __init__(
@@ -70,18 +85,31 @@ class WorkManager:
         self.worker_executors: dict[str, ComponentDefinition] = {}
         self.last_sync_at: Optional[datetime] = None
         self.sync_period = timedelta(seconds=60)
+        self.open_concurrency = DEFAULT_OPEN_CONCURRENCY
         self.services = services
 
     async def sync(self) -> WorkSync:
+        # Long poll the work until the end of the sync period, the lock returns
+        # early as soon as the work changes.
+        wait: Optional[float] = None
         if self.last_sync_at:
-            last_sync_elapsed = datetime.now() - self.last_sync_at
-            if last_sync_elapsed < self.sync_period:
-                await asyncio.sleep(
-                    (self.sync_period - last_sync_elapsed).total_seconds()
-                )
+            wait = max(
+                (self.last_sync_at + self.sync_period - datetime.now()).total_seconds(),
+                0,
+            )
+        lock_response = await self.client.lock(version=self.lock_version(), wait=wait)
+        work_sync = await self.load_work_sync(lock_response)
+
+        if self.last_sync_at and work_sync == WorkSync.empty():
+            # The lock returned early without any change, the worker manager
+            # doesn't support long polling. Poll at the end of the period.
+            remaining = self.last_sync_at + self.sync_period - datetime.now()
+            if remaining > timedelta(0):
+                await asyncio.sleep(remaining.total_seconds())
         self.last_sync_at = datetime.now()
-        lock_response = await self.client.lock()
+        return work_sync
 
+    async def load_work_sync(self, lock_response: LockResponse) -> WorkSync:
         queues_sync = await self.load_queues(lock_response)
         resources_sync = await self.load_resources(lock_response)
         resources_providers_sync = await self.load_resources_providers(lock_response)
@@ -94,14 +122,25 @@ class WorkManager:
             executors=executors_sync,
         )
 
+    def lock_version(self) -> str:
+        return lock_version(
+            items=self.worker_items.keys(),
+            resources=self.worker_resources.keys(),
+            resources_providers=self.worker_resources_providers.keys(),
+            executors=self.worker_executors.keys(),
+        )
+
     async def load_queues(
         self, lock_response: LockResponse
     ) -> ItemsSync[ExecutableQueue]:
         current_items = set(self.worker_items.keys())
         sync_items = {item.name: item for item in lock_response.items}
-        sync_items_ids = set(sync_items.keys())
-        add = sync_items_ids - current_items
-        drop = current_items - sync_items_ids
+        dropped = lock_response.dropped
+        add, drop = diff_names(
+            current_items,
+            set(sync_items.keys()),
+            dropped.items if dropped else None,
+        )
 
         added_items = await self.build_queues_for_worker_items(
             sync_items[i] for i in add
@@ -118,10 +157,15 @@ class WorkManager:
     async def build_queues_for_worker_items(
         self, items: Iterator[QueueItemWithState]
     ) -> WorkerItems:
+        # Queues are built concurrently, items failing to build are skipped.
+        queue_items = list(items)
+        queues = await gather_limited(
+            self.build_queue_for_worker_item, queue_items, limit=self.open_concurrency
+        )
         return {
             item.name: queue
-            for item in items
-            if (queue := await self.build_queue_for_worker_item(item))
+            for item, queue in zip(queue_items, queues)
+            if isinstance(queue, ExecutableQueue)
         }
 
     async def build_queue_for_worker_item(
@@ -136,6 +180,7 @@ class WorkManager:
 
                 return await scope(item)
             except Exception:
+                self.logger.exception("Failed to build queue")
                 return None
 
     async def load_resources(
@@ -143,9 +188,12 @@ class WorkManager:
     ) -> ItemsSync[ResourceData]:
         current_items = set(self.worker_resources.keys())
         sync_items = {item.name: item for item in lock_response.resources}
-        sync_items_ids = set(sync_items.keys())
-        add = sync_items_ids - current_items
-        drop = current_items - sync_items_ids
+        dropped = lock_response.dropped
+        add, drop = diff_names(
+            current_items,
+            set(sync_items.keys()),
+            dropped.resources if dropped else None,
+        )
 
         added_items = {i: self.build_resource_data(sync_items[i]) for i in add}
         self.worker_resources.update(added_items)
@@ -159,9 +207,12 @@ class WorkManager:
     ) -> ItemsSync[ResourcesProvider]:
         current_items = set(self.worker_resources_providers.keys())
         sync_items = {item.name: item for item in lock_response.resources_providers}
-        sync_items_ids = set(sync_items.keys())
-        add = sync_items_ids - current_items
-        drop = current_items - sync_items_ids
+        dropped = lock_response.dropped
+        add, drop = diff_names(
+            current_items,
+            set(sync_items.keys()),
+            dropped.resources_providers if dropped else None,
+        )
 
         added_items = {
             i: work_factory.build_resources_provider(
@@ -180,9 +231,12 @@ class WorkManager:
     ) -> ItemsSync[ComponentDefinition]:
         current_items = set(self.worker_executors.keys())
         sync_items = {item.name: item for item in lock_response.executors}
-        sync_items_ids = set(sync_items.keys())
-        add = sync_items_ids - current_items
-        drop = current_items - sync_items_ids
+        dropped = lock_response.dropped
+        add, drop = diff_names(
+            current_items,
+            set(sync_items.keys()),
+            dropped.executors if dropped else None,
+        )
 
         added_items = {i: sync_items[i] for i in add}
         self.worker_executors.update(added_items)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import asyncio
 
 from sqlalchemy.orm import sessionmaker
@@ -13,6 +15,7 @@ from datalineup_engine.core.api import LockResponse
 from datalineup_engine.stores import jobs_store
 from datalineup_engine.worker_manager.context import WorkerManagerContext
 from datalineup_engine.worker_manager.services.lock import lock_jobs
+from datalineup_engine.worker_manager.services.retention import apply_retention
 from datalineup_engine.worker_manager.services.sync import sync_jobs
 
 
@@ -31,10 +34,14 @@ class StandaloneWorkerManagerClient(AbstractWorkerManagerClient):
         with self.sessionmaker() as session:
             self.context.load_static_definition(session=session)
 
-    async def lock(self) -> LockResponse:
+    async def lock(
+        self, version: Optional[str] = None, wait: Optional[float] = None
+    ) -> LockResponse:
+        # Waiting for changes isn't supported, the lock returns at once.
         return await asyncio.get_event_loop().run_in_executor(
             None,
             self._sync_lock,
+            version,
         )
 
     async def sync(self, sync_input: JobsStatesSyncInput) -> JobsStatesSyncResponse:
@@ -59,16 +66,23 @@ class StandaloneWorkerManagerClient(AbstractWorkerManagerClient):
             self._sync_jobs,
         )
 
-    def _sync_lock(self) -> LockResponse:
+    async def apply_retention(self) -> None:
+        return await asyncio.get_event_loop().run_in_executor(
+            None,
+            self._apply_retention,
+        )
+
+    def _sync_lock(self, version: Optional[str]) -> LockResponse:
+        lock_input = LockInput(worker_id=self.worker_id, version=version)
         with self.sessionmaker() as session:
             lock = lock_jobs(
-                LockInput(worker_id=self.worker_id),
+                lock_input,
                 max_assigned_items=self.max_assigned_items,
                 static_definitions=self.context.static_definitions,
                 session=session,
             )
             session.commit()
-            return lock
+            return self.context.lock_versions.diff(lock_input, lock)
 
     def _sync_state(self, sync_input: JobsStatesSyncInput) -> JobsStatesSyncResponse:
         with self.sessionmaker() as session:
@@ -98,3 +112,11 @@ class StandaloneWorkerManagerClient(AbstractWorkerManagerClient):
                 session=session,
             )
             session.commit()
+
+    def _apply_retention(self) -> None:
+        with self.sessionmaker() as session:
+            apply_retention(
+                static_definitions=self.context.static_definitions,
+                config=self.context.config,
+                session=session,
+            )
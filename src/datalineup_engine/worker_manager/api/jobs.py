@@ -1,3 +1,7 @@
+import typing as t
+
+import itertools
+
 import flask
 from flask import Blueprint
 
@@ -6,10 +10,12 @@ from datalineup_engine.core.api import FetchCursorsStatesResponse
 from datalineup_engine.core.api import JobInput
 from datalineup_engine.core.api import JobResponse
 from datalineup_engine.core.api import JobsResponse
+from datalineup_engine.core.api import JobsRetentionResponse
 from datalineup_engine.core.api import JobsStartResponse
 from datalineup_engine.core.api import JobsStatesSyncInput
 from datalineup_engine.core.api import JobsStatesSyncResponse
 from datalineup_engine.core.api import JobsSyncResponse
+from datalineup_engine.core.api import JobStatus
 from datalineup_engine.core.api import StartJobInput
 from datalineup_engine.core.api import UpdateResponse
 from datalineup_engine.database import session_scope
@@ -19,7 +25,9 @@ from datalineup_engine.utils.flask import abort
 from datalineup_engine.utils.flask import check_found
 from datalineup_engine.utils.flask import jsonify
 from datalineup_engine.utils.flask import marshall_request
+from datalineup_engine.utils.options import asdict
 from datalineup_engine.worker_manager.app import current_app
+from datalineup_engine.worker_manager.services.retention import apply_retention
 from datalineup_engine.worker_manager.services.sync import sync_jobs
 
 bp = Blueprint("jobs", __name__, url_prefix="/api/jobs")
@@ -27,14 +35,71 @@ bp = Blueprint("jobs", __name__, url_prefix="/api/jobs")
 
 @bp.route("", methods=("GET",))
 def get_jobs() -> Json[JobsResponse]:
-    with session_scope() as session:
-        return jsonify(
-            JobsResponse(
-                items=[
-                    job.as_core_item() for job in jobs_store.get_jobs(session=session)
-                ]
+    """List jobs ordered by name.
+
+    Pages hold up to `limit` jobs, `jobs_page_size` by default, and continue
+    from the `next_after` of the previous page. Jobs can be filtered with
+    `job_definition`, `status`, `assigned_to` and `label=<key>=<value>`.
+
+    The response is streamed so large pages don't have to be held in memory.
+    The query runs before the response starts, but a database error while
+    streaming the rows of a page larger than a fetch batch truncates the
+    response after its success status.
+    """
+    args = flask.request.args
+    limit = args.get("limit", type=int)
+    if limit is None:
+        limit = current_app.datalineup.config.jobs_page_size
+    elif limit <= 0:
+        abort(http_code=400, error_code="INVALID_INPUT", message="Invalid limit")
+    status = args.get("status")
+    if status is not None and status not in t.get_args(JobStatus):
+        abort(http_code=400, error_code="INVALID_INPUT", message="Invalid status")
+    labels = {}
+    for label in args.getlist("label"):
+        key, sep, value = label.partition("=")
+        if not sep:
+            abort(http_code=400, error_code="INVALID_INPUT", message="Invalid label")
+        labels[key] = value
+
+    static_definitions = current_app.datalineup.static_definitions
+
+    def generate() -> t.Iterator[str]:
+        dumps = current_app.json.dumps
+        with session_scope() as session:
+            jobs = jobs_store.iter_jobs(
+                session=session,
+                # Fetch an extra job to know if there is a next page.
+                limit=limit + 1,
+                after=args.get("after"),
+                job_definition_name=args.get("job_definition"),
+                status=t.cast(t.Optional[JobStatus], status),
+                assigned_to=args.get("assigned_to"),
+                labels=labels,
+                static_definitions=static_definitions,
             )
-        )
+            first_job = next(jobs, None)
+            yield ""
+            yield '{"items": ['
+            last_name = None
+            for i, job in enumerate(
+                itertools.chain([first_job] if first_job else [], jobs)
+            ):
+                if i == limit:
+                    yield f'], "next_after": {dumps(last_name)}}}'
+                    return
+                yield ("," if i else "") + dumps(asdict(job.as_core_item()))
+                last_name = job.name
+            yield "]}"
+
+    stream = generate()
+    # Run the query before sending the response status, so errors aren't
+    # reported as a truncated listing.
+    next(stream)
+    return t.cast(
+        Json[JobsResponse],
+        flask.Response(flask.stream_with_context(stream), mimetype="application/json"),
+    )
 
 
 @bp.route("/<string:job_name>", methods=("GET",))
@@ -69,13 +134,33 @@ def post_sync() -> Json[JobsSyncResponse]:
     with session_scope() as session:
         # We reset static definition at each jobs sync
         current_app.datalineup.load_static_definition(session=session)
-        sync_jobs(
+        created_jobs = sync_jobs(
             static_definitions=current_app.datalineup.static_definitions,
             session=session,
         )
+    if created_jobs:
+        current_app.datalineup.work_notifier.notify()
     return jsonify(JobsSyncResponse())
 
 
+@bp.route("/_retention", methods=("POST",))
+def post_retention() -> Json[JobsRetentionResponse]:
+    """Delete jobs and cursors states past their retention.
+
+    Meant to be called periodically, apart from the jobs sync. Deletions are
+    committed by batches, up to `max_batches` of each if set.
+    """
+    max_batches = flask.request.args.get("max_batches", type=int)
+    with session_scope() as session:
+        deleted = apply_retention(
+            static_definitions=current_app.datalineup.static_definitions,
+            config=current_app.datalineup.config,
+            session=session,
+            max_batches=max_batches,
+        )
+    return jsonify(JobsRetentionResponse(deleted=deleted))
+
+
 @bp.route("/_states", methods=("PUT", "POST"))
 def post_sync_jobs_states() -> Json[JobsStatesSyncResponse]:
     """Sync jobs states to the database in batch."""
@@ -119,5 +204,8 @@ def post_start_job() -> Json[JobsStartResponse]:
             )
         except ValueError as e:
             abort(http_code=400, error_code="JOB_START_ERROR", message=str(e))
+        job_name = job.name
 
-        return jsonify(JobsStartResponse(name=job.name))
+    # Wake up workers waiting for work now that the job is committed.
+    current_app.datalineup.work_notifier.notify()
+    return jsonify(JobsStartResponse(name=job_name))
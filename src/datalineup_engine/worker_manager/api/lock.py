@@ -1,13 +1,19 @@
+import typing as t
+
+import contextlib
 import threading
+import time
 
 from flask import Blueprint
 
 from datalineup_engine.core.api import LockInput
 from datalineup_engine.core.api import LockResponse
+from datalineup_engine.database import scoped_session
 from datalineup_engine.database import session_scope
 from datalineup_engine.utils.flask import Json
 from datalineup_engine.utils.flask import jsonify
 from datalineup_engine.utils.flask import marshall_request
+from datalineup_engine.utils.sqlalchemy import is_sqlite
 from datalineup_engine.worker_manager.app import current_app
 from datalineup_engine.worker_manager.services.lock import lock_jobs
 
@@ -16,18 +22,44 @@ bp = Blueprint("lock", __name__, url_prefix="/api/lock")
 _LOCK_LOCK = threading.Lock()
 
 
+def _lock_context() -> t.ContextManager:
+    # SQLite has no row locking, concurrent lock requests are serialized
+    # instead of failing with "database is locked".
+    if is_sqlite(scoped_session()):
+        return _LOCK_LOCK
+    return contextlib.nullcontext()
+
+
 @bp.route("", methods=("POST",))
 def post_lock() -> Json[LockResponse]:
-    with _LOCK_LOCK:
-        lock_input = marshall_request(LockInput)
-        max_assigned_items: int = current_app.datalineup.config.work_items_per_worker
-        static_definitions = current_app.datalineup.static_definitions
-        with session_scope() as session:
+    """Lock work for a worker. When the worker already holds its work, the
+    request can wait up to `wait` seconds for new work before answering.
+
+    Waiting holds a server thread for the whole wait, so it is disabled unless
+    `lock_max_wait` is set, and at most `lock_max_waiters` requests wait at
+    once. It requires a threaded server with a thread per waiting worker on
+    top of the threads serving other requests.
+    """
+    lock_input = marshall_request(LockInput)
+    config = current_app.datalineup.config
+    work_notifier = current_app.datalineup.work_notifier
+    deadline = time.monotonic() + min(lock_input.wait or 0, config.lock_max_wait)
+    while True:
+        generation = work_notifier.generation
+        with _lock_context(), session_scope() as session:
             lock_response = lock_jobs(
                 lock_input,
-                max_assigned_items=max_assigned_items,
-                static_definitions=static_definitions,
+                max_assigned_items=config.work_items_per_worker,
+                static_definitions=current_app.datalineup.static_definitions,
                 session=session,
             )
 
-        return jsonify(lock_response)
+        lock_response = current_app.datalineup.lock_versions.diff(
+            lock_input, lock_response
+        )
+        if not lock_response.unchanged or not work_notifier.wait(
+            generation,
+            deadline - time.monotonic(),
+            max_waiters=config.lock_max_waiters,
+        ):
+            return jsonify(lock_response)
@@ -1,13 +1,19 @@
+import typing as t
 from typing import DefaultDict
 
 import dataclasses
+import hashlib
+import json
 import logging
 import re
+import threading
 from collections import defaultdict
 
 from datalineup_engine.models.topology_patches import TopologyPatch
 from datalineup_engine.utils import dict as dict_utils
+from datalineup_engine.utils.declarative_config import BaseObject
 from datalineup_engine.utils.declarative_config import UncompiledObject
+from datalineup_engine.utils.declarative_config import UncompiledObjectsLoader
 from datalineup_engine.utils.declarative_config import load_uncompiled_objects_from_path
 from datalineup_engine.utils.declarative_config import load_uncompiled_objects_from_str
 from datalineup_engine.utils.options import fromdict
@@ -30,11 +36,31 @@ from .declarative_topic_item import TOPIC_ITEM_KIND
 from .declarative_topic_item import TopicItem
 from .static_definitions import StaticDefinitions
 
+#: Compiled objects by the digest of their uncompiled object.
+CompiledObjectsCache = dict[str, BaseObject]
+
+# Kinds in the order they must be added, later kinds depending on earlier ones.
+_COMPILE_ORDER: list[tuple[str, t.Type[BaseObject]]] = [
+    (EXECUTOR_KIND, Executor),
+    (INVENTORY_KIND, Inventory),
+    (TOPIC_ITEM_KIND, TopicItem),
+    (JOB_DEFINITION_KIND, JobDefinition),
+    (JOB_KIND, Job),
+    (RESOURCE_KIND, Resource),
+    (RESOURCE_PROVIDER_KIND, ResourcesProvider),
+    (DYNAMIC_TOPOLOGY_KIND, DynamicTopology),
+]
+
 
 def compile_static_definitions(
     uncompiled_objects: list[UncompiledObject],
     patches: list[TopologyPatch] | None = None,
+    *,
+    cache: CompiledObjectsCache | None = None,
 ) -> StaticDefinitions:
+    """Compile objects into static definitions. With a `cache`, objects whose
+    digest was already compiled are reused instead of being parsed again.
+    """
     objects_by_kind: DefaultDict[str, dict[str, UncompiledObject]] = defaultdict(dict)
 
     if patches:
@@ -53,80 +79,43 @@ def compile_static_definitions(
 
     definitions: StaticDefinitions = StaticDefinitions()
 
-    for uncompiled_executor in objects_by_kind.pop(
-        EXECUTOR_KIND,
-        dict(),
-    ).values():
-        executor: Executor = fromdict(uncompiled_executor.data, Executor)
-        definitions.add(executor)
-
-    for uncompiled_inventory in objects_by_kind.pop(
-        INVENTORY_KIND,
-        dict(),
-    ).values():
-        inventory: Inventory = fromdict(uncompiled_inventory.data, Inventory)
-        definitions.add(inventory)
-
-    for uncompiled_topic in objects_by_kind.pop(
-        TOPIC_ITEM_KIND,
-        dict(),
-    ).values():
-        topic_item: TopicItem = fromdict(uncompiled_topic.data, TopicItem)
-        definitions.add(topic_item)
-
-    for uncompiled_job_definition in objects_by_kind.pop(
-        JOB_DEFINITION_KIND,
-        dict(),
-    ).values():
-        job_definition: JobDefinition = fromdict(
-            uncompiled_job_definition.data, JobDefinition
-        )
-        definitions.add(job_definition)
-
-    for uncompiled_job in objects_by_kind.pop(
-        JOB_KIND,
-        dict(),
-    ).values():
-        job_data: Job = fromdict(uncompiled_job.data, Job)
-        definitions.add(job_data)
-
-    for uncompiled_resource in objects_by_kind.pop(
-        RESOURCE_KIND,
-        dict(),
-    ).values():
-        resource: Resource = fromdict(uncompiled_resource.data, Resource)
-        definitions.add(resource)
-
-    for uncompied_resources_provider in objects_by_kind.pop(
-        RESOURCE_PROVIDER_KIND,
-        dict(),
-    ).values():
-        resources_provider = fromdict(
-            uncompied_resources_provider.data, ResourcesProvider
-        )
-        definitions.add(resources_provider)
-
-    for uncompiled_dynamic_topology in objects_by_kind.pop(
-        DYNAMIC_TOPOLOGY_KIND,
-        dict(),
-    ).values():
-        dynamic_topology: DynamicTopology = fromdict(
-            uncompiled_dynamic_topology.data, DynamicTopology
-        )
-
-        try:
-            definitions.add(dynamic_topology)
-        except Exception:
-            logging.getLogger(__name__).exception(
-                "Failed to build dynamic topology: %s", dynamic_topology.metadata.name
-            )
+    for kind, object_class in _COMPILE_ORDER:
+        for uncompiled_object in objects_by_kind.pop(kind, dict()).values():
+            compiled_object = _compile_object(uncompiled_object, object_class, cache)
+            if kind != DYNAMIC_TOPOLOGY_KIND:
+                definitions.add(compiled_object)
+                continue
+
+            try:
+                definitions.add(compiled_object)
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    "Failed to build dynamic topology: %s",
+                    compiled_object.metadata.name,
+                )
 
     for object_kind in objects_by_kind.keys():
         raise Exception(f"Unsupported kind {object_kind}")
 
+    definitions.index_job_templates()
     return definitions
 
 
+def _compile_object(
+    uncompiled_object: UncompiledObject,
+    object_class: t.Type[BaseObject],
+    cache: CompiledObjectsCache | None,
+) -> BaseObject:
+    if cache is None or not uncompiled_object.digest:
+        return fromdict(uncompiled_object.data, object_class)
+
+    compiled_object = cache.get(uncompiled_object.digest)
+    if compiled_object is None:
+        compiled_object = fromdict(uncompiled_object.data, object_class)
+        cache[uncompiled_object.digest] = compiled_object
+    return compiled_object
+
+
 def load_definitions_from_str(definitions: str) -> StaticDefinitions:
     return compile_static_definitions(load_uncompiled_objects_from_str(definitions))
 
@@ -151,12 +140,29 @@ def filter_with_jobs_selector(
         for name, job in definitions.job_definitions.items()
         if pattern.search(name)
     }
-    return dataclasses.replace(definitions, jobs=jobs, job_definitions=job_definitions)
+    return dataclasses.replace(
+        definitions,
+        jobs=jobs,
+        job_definitions=job_definitions,
+        job_templates={
+            name: template
+            for name, template in definitions.job_templates.items()
+            if name in jobs
+        },
+        job_definition_templates={
+            name: template
+            for name, template in definitions.job_definition_templates.items()
+            if name in job_definitions
+        },
+    )
 
 
 def merge_with_patches(
     uncompiled_objects: list[UncompiledObject], patches: list[TopologyPatch]
 ) -> list[UncompiledObject]:
+    """Return the objects with their patches applied. Patched objects are
+    copies, the given objects are left untouched so they can be cached.
+    """
     uncompiled_object_by_kind_and_name = {
         (u.kind, u.name): u for u in uncompiled_objects
     }
@@ -170,7 +176,64 @@ def merge_with_patches(
             )
             continue
 
-        uncompiled_object.data = dict_utils.deep_merge(
-            a=uncompiled_object.data, b=patch.data
+        patch_digest = hashlib.sha256(
+            json.dumps(patch.data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        uncompiled_object_by_kind_and_name[(patch.kind, patch.name)] = UncompiledObject(
+            api_version=uncompiled_object.api_version,
+            kind=uncompiled_object.kind,
+            name=uncompiled_object.name,
+            data=dict_utils.deep_merge(a=uncompiled_object.data, b=patch.data),
+            digest=(
+                f"{uncompiled_object.digest}+{patch_digest}"
+                if uncompiled_object.digest
+                else ""
+            ),
         )
-    return uncompiled_objects
+    return list(uncompiled_object_by_kind_and_name.values())
+
+
+class StaticDefinitionsLoader:
+    """Load static definitions from paths, recompiling only what changed since
+    the previous load.
+
+    Files are parsed again only when their content changed and objects are
+    compiled again only when they or their patch changed. When nothing
+    changed, the previous definitions are returned as is.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.files = UncompiledObjectsLoader()
+        self.compiled_objects: CompiledObjectsCache = {}
+        self.digests: tuple[str, ...] = ()
+        self.definitions: StaticDefinitions | None = None
+
+    def load(
+        self, config_dirs: list[str], patches: list[TopologyPatch] | None = None
+    ) -> StaticDefinitions:
+        with self.lock:
+            uncompiled_objects = self.files.load_paths(config_dirs)
+            if patches:
+                uncompiled_objects = merge_with_patches(
+                    uncompiled_objects=uncompiled_objects, patches=patches
+                )
+
+            digests = tuple(u.digest for u in uncompiled_objects)
+            # Dynamic topologies are built from code, their output can't be
+            # reused based on their definition only.
+            is_static = all(u.kind != DYNAMIC_TOPOLOGY_KIND for u in uncompiled_objects)
+            if self.definitions is not None and is_static and digests == self.digests:
+                return self.definitions
+
+            definitions = compile_static_definitions(
+                uncompiled_objects, cache=self.compiled_objects
+            )
+            self.compiled_objects = {
+                digest: self.compiled_objects[digest]
+                for digest in digests
+                if digest in self.compiled_objects
+            }
+            self.digests = digests
+            self.definitions = definitions
+            return definitions
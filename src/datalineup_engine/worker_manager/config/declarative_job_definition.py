@@ -1,6 +1,7 @@
 import typing as t
 
 import dataclasses
+from datetime import timedelta
 
 from datalineup_engine.core import api
 from datalineup_engine.utils.declarative_config import BaseObject
@@ -11,10 +12,17 @@ from .static_definitions import StaticDefinitions
 JOB_DEFINITION_KIND: t.Final[str] = "DatalineupJobDefinition"
 
 
+@dataclasses.dataclass
+class JobRetentionSpec:
+    maxAge: t.Optional[timedelta] = None
+    maxRuns: t.Optional[int] = None
+
+
 @dataclasses.dataclass
 class JobDefinitionSpec:
     template: JobSpec
     minimalInterval: str
+    retention: t.Optional[JobRetentionSpec] = None
 
 
 @dataclasses.dataclass(kw_only=True)
@@ -26,6 +34,12 @@ class JobDefinition(BaseObject):
         self,
         static_definitions: StaticDefinitions,
     ) -> t.Iterator[api.JobDefinition]:
+        retention = None
+        if self.spec.retention:
+            retention = api.JobRetention(
+                max_age=self.spec.retention.maxAge,
+                max_runs=self.spec.retention.maxRuns,
+            )
         for template in self.spec.template.to_core_objects(
             self.metadata.name,
             self.metadata.labels,
@@ -35,4 +49,5 @@ class JobDefinition(BaseObject):
                 name=template.name,
                 template=template,
                 minimal_interval=self.spec.minimalInterval,
+                retention=retention,
             )
@@ -6,11 +6,32 @@ from collections import defaultdict
 from datalineup_engine.core.api import ComponentDefinition
 from datalineup_engine.core.api import JobDefinition
 from datalineup_engine.core.api import QueueItem
+from datalineup_engine.core.api import QueueItemState
+from datalineup_engine.core.api import QueueItemWithState
 from datalineup_engine.core.api import ResourceItem
 from datalineup_engine.core.api import ResourcesProviderItem
+from datalineup_engine.core.types import JobId
 from datalineup_engine.utils.declarative_config import BaseObject
 
 
+@dataclasses.dataclass
+class JobTemplate:
+    """A job queue item with the resources and executor it requires, resolved
+    from the static definitions."""
+
+    queue_item: QueueItem
+    resources: dict[str, ResourceItem]
+    resources_providers: dict[str, ResourcesProviderItem]
+    executor: t.Optional[ComponentDefinition]
+    #: A resource type required by the pipeline without any definition.
+    missing_resource: t.Optional[str] = None
+
+    def instantiate(self, name: JobId, state: QueueItemState) -> QueueItemWithState:
+        return QueueItemWithState(
+            **{**self.queue_item.__dict__, "name": name}, state=state
+        )
+
+
 @dataclasses.dataclass
 class StaticDefinitions:
     executors: dict[str, ComponentDefinition] = dataclasses.field(default_factory=dict)
@@ -27,6 +48,61 @@ class StaticDefinitions:
     resources_by_type: dict[str, list[t.Union[ResourceItem, ResourcesProviderItem]]] = (
         dataclasses.field(default_factory=lambda: defaultdict(list))
     )
+    #: Templates indexed by `index_job_templates`, by job and job definition
+    #: name. Templates not indexed are resolved on each lookup.
+    job_templates: dict[str, JobTemplate] = dataclasses.field(
+        default_factory=dict, repr=False, compare=False
+    )
+    job_definition_templates: dict[str, JobTemplate] = dataclasses.field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def index_job_templates(self) -> None:
+        """Resolve the templates of all jobs and job definitions. Must only be
+        called once the definitions are complete."""
+        self.job_templates = {
+            name: self.resolve_job_template(queue_item)
+            for name, queue_item in self.jobs.items()
+        }
+        self.job_definition_templates = {
+            name: self.resolve_job_template(job_definition.template)
+            for name, job_definition in self.job_definitions.items()
+        }
+
+    def job_template(
+        self, *, job_name: str, job_definition_name: t.Optional[str]
+    ) -> JobTemplate:
+        if job_definition_name is None:
+            template = self.job_templates.get(job_name)
+            if template is None:
+                template = self.resolve_job_template(self.jobs[job_name])
+            return template
+
+        template = self.job_definition_templates.get(job_definition_name)
+        if template is None:
+            template = self.resolve_job_template(
+                self.job_definitions[job_definition_name].template
+            )
+        return template
+
+    def resolve_job_template(self, queue_item: QueueItem) -> JobTemplate:
+        template = JobTemplate(
+            queue_item=queue_item,
+            resources={},
+            resources_providers={},
+            executor=self.executors.get(queue_item.executor),
+        )
+        for resource_type in queue_item.pipeline.info.resources.values():
+            resources = self.resources_by_type.get(resource_type)
+            if not resources:
+                template.missing_resource = resource_type
+                break
+            for resource in resources:
+                if isinstance(resource, ResourceItem):
+                    template.resources[resource.name] = resource
+                elif isinstance(resource, ResourcesProviderItem):
+                    template.resources_providers[resource.name] = resource
+        return template
 
     def add(self, obj: BaseObject) -> None:
         from datalineup_engine.worker_manager.config.declarative_dynamic_topology import (
@@ -1,8 +1,10 @@
 from datalineup_engine.config import WorkerManagerConfig
 from datalineup_engine.stores import topologies_store
 from datalineup_engine.utils.sqlalchemy import AnySession
+from datalineup_engine.worker_manager.config.declarative import StaticDefinitionsLoader
 from datalineup_engine.worker_manager.config.declarative import filter_with_jobs_selector
-from datalineup_engine.worker_manager.config.declarative import load_definitions_from_paths
+from datalineup_engine.worker_manager.services.lock import LockVersions
+from datalineup_engine.worker_manager.services.lock import WorkNotifier
 
 from .config.static_definitions import StaticDefinitions
 
@@ -16,6 +18,9 @@ class WorkerManagerContext:
     def __init__(self, config: WorkerManagerConfig) -> None:
         self.config: WorkerManagerConfig = config
         self._static_definitions: StaticDefinitions | None
+        self._static_definitions_loader = StaticDefinitionsLoader()
+        self.lock_versions = LockVersions()
+        self.work_notifier = WorkNotifier()
 
     @property
     def static_definitions(self) -> StaticDefinitions:
@@ -24,13 +29,19 @@ class WorkerManagerContext:
         return self._static_definitions
 
     def load_static_definition(self, session: AnySession) -> None:
+        # Definitions are swapped at once, readers either get the previous or
+        # the new definitions.
         self._static_definitions = _load_static_definition(
-            session=session, config=self.config
+            session=session,
+            config=self.config,
+            loader=self._static_definitions_loader,
         )
 
 
 def _load_static_definition(
-    config: WorkerManagerConfig, session: AnySession
+    config: WorkerManagerConfig,
+    session: AnySession,
+    loader: StaticDefinitionsLoader,
 ) -> StaticDefinitions:
     """
     Static definitions contain objects defined in a declarative configuration:
@@ -43,9 +54,7 @@ def _load_static_definition(
         return StaticDefinitions()
 
     patches = topologies_store.get_patches(session=session)
-    definitions = load_definitions_from_paths(
-        config.static_definitions_directories, patches=patches
-    )
+    definitions = loader.load(config.static_definitions_directories, patches=patches)
 
     if config.static_definitions_jobs_selector:
         definitions = filter_with_jobs_selector(
@@ -1,16 +1,25 @@
+import typing as t
+
+import dataclasses
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from datetime import timedelta
 
 from datalineup_engine.core.api import ComponentDefinition
+from datalineup_engine.core.api import LockDropped
 from datalineup_engine.core.api import LockInput
 from datalineup_engine.core.api import LockResponse
 from datalineup_engine.core.api import ResourceItem
 from datalineup_engine.core.api import ResourcesProviderItem
+from datalineup_engine.core.api import lock_version
+from datalineup_engine.core.types import JobId
 from datalineup_engine.models.queue import Queue
 from datalineup_engine.stores import jobs_store
 from datalineup_engine.stores import queues_store
 from datalineup_engine.utils.sqlalchemy import AnySyncSession
+from datalineup_engine.worker_manager.config.static_definitions import JobTemplate
 from datalineup_engine.worker_manager.config.static_definitions import StaticDefinitions
 
 
@@ -28,20 +37,25 @@ def lock_jobs(
 
     assigned_items: list[Queue] = []
 
-    # Obtains items that were already assigned.
+    # Obtains items that were already assigned. Rows are locked until the
+    # transaction ends and rows locked by concurrent lock requests are skipped
+    # so workers and manager replicas never wait on each others.
     assigned_items.extend(
         queues_store.get_assigned_queues(
             session=session,
             worker_id=lock_input.worker_id,
             selector=lock_input.selector,
             assigned_after=assignation_expiration_cutoff,
+            for_update=True,
         )
     )
 
     # Unassign extra items.
-    for unassigned_item in assigned_items[max_assigned_items:]:
-        unassigned_item.assigned_at = None
-        unassigned_item.assigned_to = None
+    queues_store.unassign_queues(
+        session=session,
+        names=[item.name for item in assigned_items[max_assigned_items:]],
+        worker_id=lock_input.worker_id,
+    )
 
     assigned_items = assigned_items[:max_assigned_items]
 
@@ -58,12 +72,14 @@ def lock_jobs(
                     else None
                 ),
                 selector=lock_input.selector,
+                for_update=True,
             )
         )
     # Join definitions and filtered out by executors
+    templates: dict[str, JobTemplate] = {}
     for item in assigned_items.copy():
         try:
-            item.join_definitions(static_definitions)
+            templates[item.name] = item.join_definitions(static_definitions)
             if (
                 lock_input.executors
                 and item.queue_item.executor not in lock_input.executors
@@ -74,64 +90,51 @@ def lock_jobs(
                 jobs_store.set_failed(item.job.name, session=session, error=repr(e))
             assigned_items.remove(item)
 
-    static_definitions = static_definitions
     resources: dict[str, ResourceItem] = {}
     resources_providers: dict[str, ResourcesProviderItem] = {}
     executors: dict[str, ComponentDefinition] = {}
     # Copy list since the iteration could drop items from assigned_items.
     for item in assigned_items.copy():
-        # Collect resource for assigned work
-        item_resources: dict[str, ResourceItem] = {}
-        item_resources_providers: dict[str, ResourcesProviderItem] = {}
-        missing_resource = False
-        for resource_type in item.queue_item.pipeline.info.resources.values():
-            pipeline_resources = static_definitions.resources_by_type.get(resource_type)
-
-            if not pipeline_resources:
-                logger.error(
-                    "Skipping queue item, resource missing: item=%s, " "resource=%s",
-                    item.name,
-                    resource_type,
-                )
-                # Do not update assign the object in the database.
-                assigned_items.remove(item)
-                missing_resource = True
-                break
-
-            # assert to make mypy happy.
-            assert item_resources is not None  # noqa: S101
-            for resource in pipeline_resources:
-                if isinstance(resource, ResourceItem):
-                    item_resources[resource.name] = resource
-                elif isinstance(resource, ResourcesProviderItem):
-                    item_resources_providers[resource.name] = resource
-
-        # A resource was missing, we can't schedule this item.
-        if missing_resource:
+        template = templates[item.name]
+        if template.missing_resource:
+            logger.error(
+                "Skipping queue item, resource missing: item=%s, " "resource=%s",
+                item.name,
+                template.missing_resource,
+            )
+            # Do not update assign the object in the database.
+            assigned_items.remove(item)
             continue
 
-        resources.update(item_resources)
-        resources_providers.update(item_resources_providers)
-
-        # Collect executor for assigned work
-        executor_name = item.queue_item.executor
-        executor = static_definitions.executors.get(executor_name)
+        executor = template.executor
         if not executor:
             logger.error(
                 "Skipping queue item, executor missing: item=%s, " "executor=%s",
                 item.name,
-                executor_name,
+                item.queue_item.executor,
             )
             # Do not update assign the object in the database.
             assigned_items.remove(item)
             continue
 
+        # Collect resources and executor for assigned work
+        resources.update(template.resources)
+        resources_providers.update(template.resources_providers)
         executors.setdefault(executor.name, executor)
-    # Refresh assignments
-    new_assigned_at = datetime.now()
-    for assigned_item in assigned_items:
-        assigned_item.assigned_at = new_assigned_at
-        assigned_item.assigned_to = lock_input.worker_id
+
+    # Refresh assignments. The update only applies to items still unassigned
+    # or assigned to this worker, so items claimed concurrently on databases
+    # without row locking, such as SQLite, are never assigned twice.
+    new_assigned_names = queues_store.assign_queues(
+        session=session,
+        names=[item.name for item in assigned_items],
+        worker_id=lock_input.worker_id,
+        assigned_at=datetime.now(),
+        assigned_before=assignation_expiration_cutoff,
+    )
+    assigned_items = [
+        item for item in assigned_items if item.name in new_assigned_names
+    ]
 
     queue_items = []
     for item in assigned_items:
@@ -145,3 +148,117 @@ def lock_jobs(
         ),
         executors=list(sorted(executors.values(), key=lambda e: e.name)),
     )
+
+
+@dataclasses.dataclass
+class LockedNames:
+    version: str
+    items: set[JobId]
+    resources: set[str]
+    resources_providers: set[str]
+    executors: set[str]
+
+    @classmethod
+    def from_response(cls, lock_response: LockResponse) -> "LockedNames":
+        items = {i.name for i in lock_response.items}
+        resources = {r.name for r in lock_response.resources}
+        resources_providers = {r.name for r in lock_response.resources_providers}
+        executors = {e.name for e in lock_response.executors}
+        return cls(
+            version=lock_version(
+                items=items,
+                resources=resources,
+                resources_providers=resources_providers,
+                executors=executors,
+            ),
+            items=items,
+            resources=resources,
+            resources_providers=resources_providers,
+            executors=executors,
+        )
+
+
+class LockVersions:
+    """Remember the work last locked by each worker, so a worker still holding
+    that work only receives what changed since.
+
+    Workers are only sent a full response when their version is unknown, for
+    example after a restart or when reaching another worker manager replica.
+    """
+
+    def __init__(self, *, max_workers: int = 10_000) -> None:
+        self.max_workers = max_workers
+        self.locked: OrderedDict[str, LockedNames] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def diff(self, lock_input: LockInput, lock_response: LockResponse) -> LockResponse:
+        locked = LockedNames.from_response(lock_response)
+        with self.lock:
+            previous = self.locked.pop(lock_input.worker_id, None)
+            self.locked[lock_input.worker_id] = locked
+            if len(self.locked) > self.max_workers:
+                self.locked.popitem(last=False)
+
+        if (
+            not previous
+            or not lock_input.version
+            or lock_input.version != previous.version
+        ):
+            return dataclasses.replace(lock_response, version=locked.version)
+
+        return LockResponse(
+            items=[i for i in lock_response.items if i.name not in previous.items],
+            resources=[
+                r for r in lock_response.resources if r.name not in previous.resources
+            ],
+            resources_providers=[
+                r
+                for r in lock_response.resources_providers
+                if r.name not in previous.resources_providers
+            ],
+            executors=[
+                e for e in lock_response.executors if e.name not in previous.executors
+            ],
+            version=locked.version,
+            dropped=LockDropped(
+                items=sorted(previous.items - locked.items),
+                resources=sorted(previous.resources - locked.resources),
+                resources_providers=sorted(
+                    previous.resources_providers - locked.resources_providers
+                ),
+                executors=sorted(previous.executors - locked.executors),
+            ),
+        )
+
+
+class WorkNotifier:
+    """Wake up lock requests waiting for their work to change."""
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.waiters = 0
+
+    def notify(self) -> None:
+        """Signal new work might be available."""
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(
+        self, generation: int, timeout: float, *, max_waiters: t.Optional[int] = None
+    ) -> bool:
+        """Wait for a notification after `generation`. Return False on timeout,
+        or at once if `max_waiters` are already waiting."""
+        if timeout <= 0:
+            return False
+        with self.condition:
+            if max_waiters is not None and self.waiters >= max_waiters:
+                return False
+            self.waiters += 1
+            try:
+                return self.condition.wait_for(
+                    lambda: self.generation != generation, timeout
+                )
+            finally:
+                self.waiters -= 1
@@ -0,0 +1,153 @@
+import typing as t
+
+import dataclasses
+import logging
+
+from datalineup_engine.config import WorkerManagerConfig
+from datalineup_engine.core import Cursor
+from datalineup_engine.core.api import JobItem
+from datalineup_engine.stores import jobs_store
+from datalineup_engine.utils import utcnow
+from datalineup_engine.utils.inspect import import_name
+from datalineup_engine.utils.sqlalchemy import AnySyncSession
+from datalineup_engine.worker_manager.config.static_definitions import StaticDefinitions
+
+
+@dataclasses.dataclass
+class RetentionBatch:
+    """Jobs and cursors states about to be deleted, given to the archiver."""
+
+    jobs: list[JobItem] = dataclasses.field(default_factory=list)
+    #: Cursors states by job definition or job name, then by cursor.
+    cursors_states: dict[str, dict[Cursor, dict]] = dataclasses.field(
+        default_factory=dict
+    )
+
+
+Archiver = t.Callable[[RetentionBatch], None]
+
+
+def apply_retention(
+    *,
+    static_definitions: StaticDefinitions,
+    config: WorkerManagerConfig,
+    session: AnySyncSession,
+    max_batches: t.Optional[int] = None,
+) -> int:
+    """Delete completed jobs past their retention along with their queues, then
+    the cursors states no longer used if `config.delete_orphaned_cursors_states`
+    is set. Deletions are committed by batches of
+    `config.jobs_retention_batch_size`, up to `max_batches` of each. Return
+    the number of rows deleted.
+    """
+    logger = logging.getLogger(__name__)
+    archiver: t.Optional[Archiver] = None
+    if config.jobs_retention_archiver:
+        archiver = import_name(config.jobs_retention_archiver)
+
+    deleted = _delete_expired_jobs(
+        static_definitions=static_definitions,
+        config=config,
+        session=session,
+        archiver=archiver,
+        max_batches=max_batches,
+    )
+    if config.delete_orphaned_cursors_states:
+        if config.static_definitions_jobs_selector:
+            # Namespaces of other shards would look orphaned.
+            logger.warning("Cannot delete orphaned cursors states with a jobs selector")
+        else:
+            deleted += _delete_orphaned_cursors_states(
+                static_definitions=static_definitions,
+                config=config,
+                session=session,
+                archiver=archiver,
+                max_batches=max_batches,
+            )
+
+    if deleted:
+        logger.info("Deleted %d jobs and cursors states past retention", deleted)
+    return deleted
+
+
+def _delete_expired_jobs(
+    *,
+    static_definitions: StaticDefinitions,
+    config: WorkerManagerConfig,
+    session: AnySyncSession,
+    archiver: t.Optional[Archiver],
+    max_batches: t.Optional[int],
+) -> int:
+    retentions = {
+        name: job_definition.retention
+        for name, job_definition in static_definitions.job_definitions.items()
+        if job_definition.retention
+    }
+    if not retentions and not config.jobs_retention:
+        return 0
+
+    # Without a selector, the default retention also applies to the job
+    # definitions removed from the static definitions. With one, these might
+    # belong to another shard and have their own retention.
+    default_job_definitions = None
+    if config.static_definitions_jobs_selector:
+        default_job_definitions = [
+            name
+            for name in static_definitions.job_definitions
+            if name not in retentions
+        ]
+
+    batch_size = config.jobs_retention_batch_size
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        jobs = jobs_store.get_expired_jobs(
+            session=session,
+            retentions=retentions,
+            default_retention=config.jobs_retention,
+            default_job_definitions=default_job_definitions,
+            now=utcnow(),
+            limit=batch_size,
+        )
+        if archiver and jobs:
+            archiver(RetentionBatch(jobs=[job.as_core_item() for job in jobs]))
+        jobs_store.delete_jobs(session=session, jobs=jobs)
+        session.commit()
+        deleted += len(jobs)
+        batches += 1
+        if len(jobs) < batch_size:
+            break
+    return deleted
+
+
+def _delete_orphaned_cursors_states(
+    *,
+    static_definitions: StaticDefinitions,
+    config: WorkerManagerConfig,
+    session: AnySyncSession,
+    archiver: t.Optional[Archiver],
+    max_batches: t.Optional[int],
+) -> int:
+    batch_size = config.jobs_retention_batch_size
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        cursors_states = jobs_store.get_orphaned_cursors_states(
+            session=session,
+            static_definitions=static_definitions,
+            limit=batch_size,
+        )
+        if archiver and cursors_states:
+            batch = RetentionBatch()
+            for cursor_state in cursors_states:
+                namespace = cursor_state.job_definition_name
+                states = batch.cursors_states.setdefault(namespace, {})
+                states[Cursor(cursor_state.cursor)] = cursor_state.state
+            archiver(batch)
+        jobs_store.delete_cursors_states(session=session, cursors_states=cursors_states)
+        session.commit()
+        deleted += len(cursors_states)
+        batches += 1
+        if len(cursors_states) < batch_size:
+            break
+    return deleted
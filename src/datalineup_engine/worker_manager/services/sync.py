@@ -5,8 +5,8 @@ from datetime import datetime
 
 from croniter import croniter
 
+from datalineup_engine.models import Job
 from datalineup_engine.stores import jobs_store
-from datalineup_engine.stores import queues_store
 from datalineup_engine.utils import utcnow
 from datalineup_engine.utils.sqlalchemy import AnySyncSession
 from datalineup_engine.worker_manager.config.declarative import StaticDefinitions
@@ -18,43 +18,41 @@ def sync_jobs(
     *,
     static_definitions: StaticDefinitions,
     session: AnySyncSession,
-) -> None:
+) -> int:
+    """Create jobs that are due. Return the number of jobs created."""
     if not _SYNC_LOCK.locked():
         with _SYNC_LOCK:
-            _sync_jobs(static_definitions=static_definitions, session=session)
+            return _sync_jobs(static_definitions=static_definitions, session=session)
+    return 0
 
 
 def _sync_jobs(
     *,
     static_definitions: StaticDefinitions,
     session: AnySyncSession,
-) -> None:
+) -> int:
     logger = logging.getLogger(__name__)
+    now = utcnow()
+    job_suffix = int(time.time())
+    new_jobs: list[Job] = []
 
     # Jobs with no interval
+    existing_jobs = jobs_store.get_static_job_names(session=session)
     for datalineup_job in static_definitions.jobs.values():
-        try:
-            # Check if job exists and create if not
-            existing_job = jobs_store.get_job(datalineup_job.name, session)
-            if not existing_job:
-                job_queue = queues_store.create_queue(
-                    session=session, name=datalineup_job.name
-                )
-                jobs_store.create_job(
+        if datalineup_job.name not in existing_jobs:
+            new_jobs.append(
+                Job(
                     name=datalineup_job.name,
-                    session=session,
-                    queue_name=job_queue.name,
+                    queue_name=datalineup_job.name,
+                    started_at=now,
                 )
-        except Exception:
-            logger.exception("Failed to create %s", datalineup_job.name)
+            )
 
     # Jobs ran at an interval
+    last_jobs = jobs_store.get_last_jobs(session=session)
     for job_definition in static_definitions.job_definitions.values():
         try:
-            last_job = jobs_store.get_last_job(
-                session=session,
-                job_definition_name=job_definition.name,
-            )
+            last_job = last_jobs.get(job_definition.name)
 
             if last_job:
                 # If a job already exists, check it has completed and
@@ -69,22 +67,40 @@ def _sync_jobs(
                         job_definition.minimal_interval,
                         last_job.started_at,
                     ).get_next(ret_type=datetime)
-                    if scheduled_at > utcnow():
+                    if scheduled_at > now:
                         continue
 
-            job_name: str = f"{job_definition.name}-{int(time.time())}"
-            queue = queues_store.create_queue(session=session, name=job_name)
-            job = jobs_store.create_job(
+            job_name: str = f"{job_definition.name}-{job_suffix}"
+            job = Job(
                 name=job_name,
-                session=session,
-                queue_name=queue.name,
+                queue_name=job_name,
                 job_definition_name=job_definition.name,
+                started_at=now,
             )
 
             # If the last job was an error, we resume from where we were.
             if last_job and last_job.error:
                 job.cursor = last_job.cursor
 
-            session.commit()
+            new_jobs.append(job)
         except Exception:
             logger.exception("Failed to create %s", job_definition.name)
+
+    try:
+        created = jobs_store.create_jobs(session=session, jobs=new_jobs)
+        session.commit()
+        return created
+    except Exception:
+        session.rollback()
+        logger.exception("Failed to create jobs, creating them one by one")
+
+    # Isolate the jobs failing to be created.
+    created = 0
+    for job in new_jobs:
+        try:
+            created += jobs_store.create_jobs(session=session, jobs=[job])
+            session.commit()
+        except Exception:
+            session.rollback()
+            logger.exception("Failed to create %s", job.name)
+    return created
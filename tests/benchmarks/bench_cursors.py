@@ -0,0 +1,63 @@
+"""Measure `CursorsState` with many items in flight.
+
+Run with `python -m tests.benchmarks.bench_cursors`.
+"""
+
+import typing as t
+
+import asyncio
+import random
+import time
+
+from datalineup_engine.core import Cursor
+from datalineup_engine.worker.inventory import CursorsState
+from datalineup_engine.worker.inventory import Item
+
+
+async def bench(name: str, *, items: int, order: t.Callable[[list], None]) -> None:
+    state = CursorsState(max_partials=100)
+    contexts = []
+    started_at = time.perf_counter()
+    for i in range(items):
+        context = state.process_item(Item(args={}, cursor=Cursor(str(i))))
+        await context.__aenter__()
+        contexts.append(context)
+        # Messages are built with the current cursor.
+        state.as_cursor()
+
+    order(contexts)
+    for context in contexts:
+        await context.__aexit__(None, None, None)
+        state.as_cursor()
+    duration = time.perf_counter() - started_at
+    assert not state.has_pendings()
+    print(f"{name:<24} {items / duration:10.0f} items/s")
+
+
+def in_order(contexts: list) -> None:
+    pass
+
+
+def shuffled(contexts: list) -> None:
+    random.Random(0).shuffle(contexts)
+
+
+def first_last(contexts: list) -> None:
+    contexts.append(contexts.pop(0))
+
+
+CASES: t.Final[list[tuple[str, t.Callable[[list], None]]]] = [
+    ("in order", in_order),
+    ("reversed", list.reverse),
+    ("shuffled", shuffled),
+    ("first item last", first_last),
+]
+
+
+async def main() -> None:
+    for name, order in CASES:
+        await bench(name, items=100_000, order=order)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
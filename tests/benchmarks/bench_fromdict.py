@@ -0,0 +1,82 @@
+"""Compare `fromdict` validation modes.
+
+Run with `python -m tests.benchmarks.bench_fromdict`.
+"""
+
+import typing as t
+
+import dataclasses
+import timeit
+from datetime import datetime
+
+from datalineup_engine.core.api import LockResponse
+from datalineup_engine.core.topic import TopicMessage
+from datalineup_engine.utils.inspect import dataclass_from_params
+from datalineup_engine.utils.options import ValidationMode
+from datalineup_engine.utils.options import fromdict
+
+
+def pipeline(
+    name: str, count: int, created_at: datetime, tags: t.Optional[list[t.Any]] = None
+) -> None:
+    pass
+
+
+@dataclasses.dataclass
+class Cases:
+    name: str
+    klass: t.Type
+    data: dict[str, t.Any]
+
+
+QUEUE_ITEM: t.Final[dict[str, t.Any]] = {
+    "name": "job-1",
+    "pipeline": {
+        "info": {"name": "example.pipelines.echo", "resources": {"api": "Api"}},
+        "args": {"message": "hello"},
+    },
+    "output": {"default": [{"name": "output", "type": "RabbitMQTopic"}]},
+    "input": {"name": "input", "type": "PeriodicTopic", "options": {"interval": 1}},
+    "labels": {"owner": "team"},
+    "state": {"cursor": "10", "started_at": "2020-01-01T00:00:00+00:00"},
+}
+
+CASES: t.Final[list[Cases]] = [
+    Cases(
+        name="pipeline args",
+        klass=dataclass_from_params(pipeline),
+        data={"name": "foo", "count": 1, "created_at": datetime(2020, 1, 1)},
+    ),
+    Cases(
+        name="topic message",
+        klass=TopicMessage,
+        data={"id": "1", "args": {"x": 1}, "tags": {"a": "b"}, "metadata": {}},
+    ),
+    Cases(
+        name="lock response",
+        klass=LockResponse,
+        data={
+            "items": [QUEUE_ITEM] * 20,
+            "resources": [{"name": "api", "type": "Api", "data": {}}],
+            "resources_providers": [],
+            "executors": [{"name": "default", "type": "ProcessExecutor"}],
+        },
+    ),
+]
+
+
+def main(number: int = 2000) -> None:
+    for case in CASES:
+        for mode in ValidationMode:
+            fromdict(case.data, case.klass, mode=mode)
+            duration = timeit.timeit(
+                lambda: fromdict(case.data, case.klass, mode=mode), number=number
+            )
+            print(
+                f"{case.name:<16} {mode.value:<10}"
+                f" {duration / number * 1e6:8.2f} us/call"
+            )
+
+
+if __name__ == "__main__":
+    main()
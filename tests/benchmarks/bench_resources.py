@@ -0,0 +1,81 @@
+"""Measure `ResourcesManager` acquisitions per second.
+
+Run with `python -m tests.benchmarks.bench_resources`.
+"""
+
+import typing as t
+
+import asyncio
+import time
+
+from datalineup_engine.worker.resources.manager import ResourceData
+from datalineup_engine.worker.resources.manager import ResourceRateLimit
+from datalineup_engine.worker.resources.manager import ResourcesManager
+
+
+async def build_manager(
+    *, resources: int, types: int, fifo: bool, rate_limit: bool
+) -> ResourcesManager:
+    manager = ResourcesManager.from_options({"fifo": fifo})
+    for i in range(resources):
+        await manager.add(
+            ResourceData(
+                name=f"key-{i}",
+                type=f"Api{i % types}",
+                data={},
+                rate_limit=(
+                    ResourceRateLimit(rate_limits=["1000000 per hour"])
+                    if rate_limit
+                    else None
+                ),
+            )
+        )
+    return manager
+
+
+async def acquirer(manager: ResourcesManager, types: list[str], count: int) -> None:
+    for _ in range(count):
+        async with await manager.acquire_many(types):
+            await asyncio.sleep(0)
+
+
+async def bench(
+    name: str,
+    *,
+    resources: int = 500,
+    types: int = 1,
+    acquire_types: int = 1,
+    tasks: int = 100,
+    count: int = 200,
+    fifo: bool = False,
+    rate_limit: bool = False,
+) -> None:
+    manager = await build_manager(
+        resources=resources, types=types, fifo=fifo, rate_limit=rate_limit
+    )
+    resource_types = [f"Api{i}" for i in range(acquire_types)]
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *[acquirer(manager, resource_types, count) for _ in range(tasks)]
+    )
+    duration = time.perf_counter() - started_at
+    print(f"{name:<32} {tasks * count / duration:10.0f} acquires/s")
+
+
+CASES: t.Final[list[tuple[str, dict[str, t.Any]]]] = [
+    ("uncontended", {}),
+    ("contended", {"resources": 10}),
+    ("contended fifo", {"resources": 10, "fifo": True}),
+    ("multi types", {"types": 4, "acquire_types": 4}),
+    ("contended multi types", {"resources": 40, "types": 4, "acquire_types": 4}),
+    ("rate limited", {"rate_limit": True}),
+]
+
+
+async def main() -> None:
+    for name, kwargs in CASES:
+        await bench(name, **kwargs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
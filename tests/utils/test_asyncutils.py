@@ -8,6 +8,7 @@ from unittest.mock import Mock
 import pytest
 
 from datalineup_engine.utils.asyncutils import DelayedThrottle
+from datalineup_engine.utils.asyncutils import gather_limited
 from datalineup_engine.utils.asyncutils import opened_acontext
 
 
@@ -182,3 +183,24 @@ async def test_opened_acontext() -> None:
         mock.assert_not_called()
 
     mock.assert_called_once_with("after")
+
+
+async def test_gather_limited() -> None:
+    running = 0
+    max_running = 0
+
+    async def call(i: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.1)
+        running -= 1
+        if i == 3:
+            raise ValueError(i)
+        return i * 2
+
+    results = await gather_limited(call, range(10), limit=4)
+    assert max_running == 4
+    assert results[:3] == [0, 2, 4]
+    assert isinstance(results[3], ValueError)
+    assert results[4:] == [8, 10, 12, 14, 16, 18]
@@ -46,6 +46,71 @@ async def test_buffered() -> None:
     assert items == [[0, 3], [3, 0, 0], [40]]
 
 
+async def test_lookahead() -> None:
+    calls: list[tuple[str, int]] = []
+
+    async def load(x: int) -> None:
+        calls.append(("load", x))
+        await asyncio.sleep(1)
+
+    async def consume(lookahead: int) -> list[int]:
+        items = []
+        iterator = alib.iter([1, 2, 3, 4])
+        async for x in iterators.async_lookahead(iterator, load, lookahead=lookahead):
+            calls.append(("consume", x))
+            items.append(x)
+            await asyncio.sleep(2)
+        return items
+
+    # Without lookahead, items are loaded one after the other.
+    assert await consume(0) == [1, 2, 3, 4]
+    assert calls == [
+        ("load", 1),
+        ("consume", 1),
+        ("load", 2),
+        ("consume", 2),
+        ("load", 3),
+        ("consume", 3),
+        ("load", 4),
+        ("consume", 4),
+    ]
+
+    # Next items get loaded while the current one is consumed.
+    calls.clear()
+    assert await consume(1) == [1, 2, 3, 4]
+    assert calls.index(("load", 2)) < calls.index(("consume", 1))
+    assert calls.index(("load", 4)) < calls.index(("consume", 3))
+
+    # Errors from the iterator are raised once the previous items are yielded.
+    async def failing() -> t.AsyncIterator[int]:
+        yield 1
+        raise ValueError()
+
+    items = []
+    with pytest.raises(ValueError):
+        async for x in iterators.async_lookahead(failing(), load, lookahead=2):
+            items.append(x)
+    assert items == [1]
+
+    # Leaving early closes the source iterator before returning.
+    closed = False
+
+    async def source() -> t.AsyncIterator[int]:
+        nonlocal closed
+        try:
+            for i in range(10):
+                yield i
+        finally:
+            closed = True
+
+    async with alib.scoped_iter(
+        iterators.async_lookahead(source(), load, lookahead=2)
+    ) as lookahead_iter:
+        async for x in lookahead_iter:
+            break
+    assert closed
+
+
 async def test_flatten() -> None:
     iterator = alib.iter([[1, 2], [3, 4], [5]])
     flatten_it = iterators.async_flatten(iterator)
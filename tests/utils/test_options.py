@@ -1,10 +1,19 @@
+import typing as t
+
 import dataclasses
 from datetime import datetime
 
+import pydantic.v1
+import pytest
+
+from datalineup_engine.core.api import LockResponse
+from datalineup_engine.utils.inspect import dataclass_from_params
 from datalineup_engine.utils.options import OptionsSchema
+from datalineup_engine.utils.options import ValidationMode
 from datalineup_engine.utils.options import asdict
 from datalineup_engine.utils.options import fromdict
 from datalineup_engine.utils.options import json_serializer
+from datalineup_engine.utils.options import validation_mode
 
 
 @dataclasses.dataclass
@@ -61,3 +70,87 @@ def test_inheritance() -> None:
     assert b == BetterObject(
         x="foo", y=datetime(2020, 1, 1, 1, 1, 1), z=NestedObjectA(fielda="foo")
     )
+
+
+@dataclasses.dataclass
+class CompiledObject:
+    x: str
+    y: t.Optional[int] = None
+    z: dict[str, t.Any] = dataclasses.field(default_factory=dict)
+    nested: t.Optional[NestedObjectA] = None
+
+
+def test_fromdict_trusted() -> None:
+    a = fromdict(
+        {"x": "foo", "y": "2020-01-01T01:01:01", "extra": 1},
+        Object,
+        mode=ValidationMode.TRUSTED,
+    )
+    # Values are used as is, without any coercion.
+    assert a == Object(x="foo", y="2020-01-01T01:01:01")  # type: ignore[arg-type]
+
+
+def test_fromdict_compiled() -> None:
+    mode = ValidationMode.COMPILED
+    assert fromdict({"x": "foo"}, CompiledObject, mode=mode) == CompiledObject(x="foo")
+    assert fromdict(
+        {"x": "foo", "y": 1, "z": {"a": 1}}, CompiledObject, mode=mode
+    ) == CompiledObject(x="foo", y=1, z={"a": 1})
+
+    # Values needing coercion fall back to the strict validation.
+    assert fromdict(
+        {"x": "foo", "y": "1", "nested": {"fielda": "a"}}, CompiledObject, mode=mode
+    ) == CompiledObject(x="foo", y=1, nested=NestedObjectA(fielda="a"))
+    assert fromdict(
+        {"x": "foo", "y": datetime(2020, 1, 1)}, Object, mode=mode
+    ) == Object(x="foo", y=datetime(2020, 1, 1))
+
+    with pytest.raises(pydantic.v1.ValidationError):
+        fromdict({"y": 1}, CompiledObject, mode=mode)
+    with pytest.raises(pydantic.v1.ValidationError):
+        fromdict({"x": "foo", "y": "bar"}, CompiledObject, mode=mode)
+
+
+def test_fromdict_compiled_nested() -> None:
+    data = {
+        "items": [
+            {
+                "name": "job",
+                "pipeline": {"info": {"name": "p", "resources": {}}, "args": {}},
+                "output": {"default": [{"set_handled": True}]},
+                "input": {"name": "input", "type": "Topic"},
+                "state": {"cursor": "1", "started_at": "2020-01-01T00:00:00Z"},
+            }
+        ],
+        "resources": [{"name": "r", "type": "R", "data": {}, "default_delay": 1}],
+        "resources_providers": [],
+        "executors": [{"name": "default", "type": "Executor"}],
+    }
+    assert fromdict(data, LockResponse, mode=ValidationMode.COMPILED) == fromdict(
+        data, LockResponse, mode=ValidationMode.STRICT
+    )
+
+
+@dataclasses.dataclass
+class CompiledMappings:
+    bare: t.Dict = dataclasses.field(default_factory=dict)
+    nested: dict[t.Any, NestedObjectA] = dataclasses.field(default_factory=dict)
+
+
+def test_fromdict_compiled_mappings() -> None:
+    data = {"bare": {"a": 1, 2: "b"}, "nested": {"a": {"fielda": "x"}}}
+    expected = CompiledMappings(
+        bare={"a": 1, 2: "b"}, nested={"a": NestedObjectA(fielda="x")}
+    )
+    assert fromdict(data, CompiledMappings, mode=ValidationMode.COMPILED) == expected
+    assert fromdict(data, CompiledMappings, mode=ValidationMode.STRICT) == expected
+
+
+def test_fromdict_validation_mode_decorator() -> None:
+    @validation_mode(ValidationMode.TRUSTED)
+    def pipeline(x: int) -> None:
+        pass
+
+    params = dataclass_from_params(pipeline)
+    assert fromdict({"x": "1"}, params).x == "1"  # type: ignore[attr-defined]
+    assert fromdict({"x": "1"}, params, mode=ValidationMode.STRICT).x == 1  # type: ignore[attr-defined]
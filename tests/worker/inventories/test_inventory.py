@@ -122,3 +122,25 @@ async def test_max_partials() -> None:
     assert [i.args for i in items] == [{"x": 2}, {"x": 3}, {"x": 4}, {"x": 5}]
     assert (c := inventory.cursor)
     assert json.loads(c) == {"v": 1, "a": "0", "p": ["2", "3"]}
+
+
+async def test_cursors_state_out_of_order() -> None:
+    state = CursorsState()
+    contexts = [
+        state.process_item(Item(args={}, cursor=Cursor(str(i)))) for i in range(5)
+    ]
+    for context in contexts:
+        await context.__aenter__()
+    assert state.as_cursor() is None
+
+    for i in [1, 3, 0]:
+        await contexts[i].__aexit__(None, None, None)
+    cursor = state.as_cursor()
+    assert cursor and json.loads(cursor) == {"v": 1, "a": "1", "p": ["3"]}
+    # The cursor is only serialized again once it changes.
+    assert state.as_cursor() is cursor
+
+    for i in [4, 2]:
+        await contexts[i].__aexit__(None, None, None)
+    assert json.loads(state.as_cursor() or "") == {"v": 1, "a": "4"}
+    assert not state.has_pendings()
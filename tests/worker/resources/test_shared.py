@@ -0,0 +1,84 @@
+import typing as t
+
+import fakeredis
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.aio.strategies import FixedWindowRateLimiter
+from limits.aio.strategies import MovingWindowRateLimiter
+
+from datalineup_engine.worker.resources.shared import RedisLeaseStorage
+from datalineup_engine.worker.resources.shared import RedisLimiterStorage
+
+
+@pytest.fixture
+async def redis() -> t.AsyncIterator[fakeredis.FakeAsyncRedis]:
+    redis = fakeredis.FakeAsyncRedis()
+    yield redis
+    await redis.aclose()
+
+
+async def test_redis_lease_storage(redis: fakeredis.FakeAsyncRedis) -> None:
+    leases = RedisLeaseStorage(redis)
+
+    assert await leases.acquire("lease", "worker-1", 10)
+    assert 0 < await redis.pttl("lease") <= 10_000
+    # Acquiring a lease we already own renews it.
+    assert await leases.acquire("lease", "worker-1", 20)
+    assert await redis.pttl("lease") > 10_000
+
+    # Others can't acquire, renew or release our lease.
+    assert not await leases.acquire("lease", "worker-2", 10)
+    assert not await leases.renew("lease", "worker-2", 10)
+    await leases.release("lease", "worker-2")
+    assert await redis.get("lease") == b"worker-1"
+
+    assert await leases.renew("lease", "worker-1", 10)
+    await leases.release("lease", "worker-1")
+    assert await redis.get("lease") is None
+    assert not await leases.renew("lease", "worker-1", 10)
+    assert await leases.acquire("lease", "worker-2", 10)
+
+
+async def test_redis_limiter_storage_fixed_window(
+    redis: fakeredis.FakeAsyncRedis,
+) -> None:
+    storage = RedisLimiterStorage(redis)
+    limiter = FixedWindowRateLimiter(storage)
+    limit = RateLimitItemPerMinute(2)
+
+    assert await storage.check()
+    assert await limiter.hit(limit, "test")
+    assert await limiter.hit(limit, "test")
+    assert not await limiter.hit(limit, "test")
+    assert not await limiter.test(limit, "test")
+    # Other identifiers have their own window.
+    assert await limiter.hit(limit, "other")
+
+    _, remaining = await limiter.get_window_stats(limit, "test")
+    assert remaining == 0
+    assert 0 < await redis.ttl(limit.key_for("test")) <= 60
+
+    await limiter.clear(limit, "test")
+    assert await limiter.hit(limit, "test")
+
+
+async def test_redis_limiter_storage_moving_window(
+    redis: fakeredis.FakeAsyncRedis,
+) -> None:
+    storage = RedisLimiterStorage(redis)
+    limiter = MovingWindowRateLimiter(storage)
+    limit = RateLimitItemPerMinute(3)
+
+    assert await limiter.hit(limit, "test", cost=2)
+    assert not await limiter.hit(limit, "test", cost=2)
+    assert await limiter.hit(limit, "test")
+    assert not await limiter.hit(limit, "test")
+    assert not await limiter.test(limit, "test")
+
+    _, remaining = await limiter.get_window_stats(limit, "test")
+    assert remaining == 0
+
+    await limiter.clear(limit, "test")
+    assert await limiter.hit(limit, "test")
+    _, remaining = await limiter.get_window_stats(limit, "test")
+    assert remaining == 2
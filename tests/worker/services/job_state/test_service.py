@@ -2,6 +2,7 @@ import typing as t
 
 import asyncio
 import dataclasses
+from datetime import timedelta
 from unittest.mock import call
 
 import pytest
@@ -21,6 +22,7 @@ from datalineup_engine.worker.inventory import Item
 from datalineup_engine.worker.job import Job
 from datalineup_engine.worker.services.hooks import PipelineEventsEmitted
 from datalineup_engine.worker.services.job_state.service import CursorFormat
+from datalineup_engine.worker.services.job_state.service import CursorsStatesCache
 from datalineup_engine.worker.services.job_state.service import CursorState
 from datalineup_engine.worker.services.job_state.service import JobStateService
 from datalineup_engine.worker.services.manager import ServicesManager
@@ -385,3 +387,91 @@ async def test_fetch_multiple_format(
             }
         }
     )
+
+
+@pytest.fixture
+async def cached_job_state_service(
+    services_manager_maker: t.Callable[[Config], t.Awaitable[ServicesManager]],
+    fake_http_client_service_maker: t.Callable,
+    config: Config,
+) -> JobStateService:
+    config = config.load_object({"job_state": {"cursors_states_cache_size": 10}})
+    services_manager = await services_manager_maker(config)
+    await fake_http_client_service_maker(services_manager=services_manager)
+    return await services_manager._reload_service(JobStateService)
+
+
+async def test_fetch_cursors_states_cache(
+    http_client_mock: HttpClientMock,
+    frozen_time: FreezeTime,
+    fake_queue_item: QueueItemWithState,
+    cached_job_state_service: JobStateService,
+) -> None:
+    job_state_service = cached_job_state_service
+    fetch_mock = http_client_mock.post("http://127.0.0.1:5000/api/jobs/_states/fetch")
+    fetch_mock.return_value = {"cursors": {"fake-queue": {H["a"]: {"x": 1}}}}
+    job_name = fake_queue_item.name
+
+    states = await job_state_service.fetch_cursors_states(
+        job_name, cursors=[Cursor("a"), Cursor("b")]
+    )
+    assert states == {"a": {"x": 1}}
+    fetch_mock.assert_called_once()
+
+    # Fetched states, including missing ones, and local writes are cached.
+    http_client_mock.put("http://127.0.0.1:5000/api/jobs/_states").return_value = {}
+    job_state_service.set_job_cursor_state(
+        job_name, cursor=Cursor("c"), cursor_state={"x": 3}
+    )
+    await job_state_service.flush()
+    fetch_mock.reset_mock()
+    states = await job_state_service.fetch_cursors_states(
+        job_name, cursors=[Cursor("a"), Cursor("b"), Cursor("c")]
+    )
+    assert states == {"a": {"x": 1}, "c": {"x": 3}}
+    fetch_mock.assert_not_called()
+
+    # Reassigning the job invalidates its cursors states.
+    await job_state_service.on_work_queue_built(fake_queue_item)
+    await job_state_service.fetch_cursors_states(job_name, cursors=[Cursor("a")])
+    fetch_mock.assert_called_once_with(json={"cursors": {"fake-queue": [H["a"]]}})
+
+    # Cached states expire.
+    fetch_mock.reset_mock()
+    frozen_time.tick(
+        timedelta(seconds=job_state_service.options.cursors_states_cache_ttl + 1)
+    )
+    await job_state_service.fetch_cursors_states(job_name, cursors=[Cursor("a")])
+    fetch_mock.assert_called_once()
+
+    # Jobs with an explicit namespace, which might be shared with other
+    # workers, always fetch their states.
+    fake_queue_item.config = {"job_state": {"cursors_states_namespace": "shared"}}
+    await job_state_service.on_work_queue_built(fake_queue_item)
+    fetch_mock.return_value = {"cursors": {"shared": {H["a"]: {"x": 1}}}}
+    for _ in range(2):
+        fetch_mock.reset_mock()
+        states = await job_state_service.fetch_cursors_states(
+            JobId("shared"), cursors=[Cursor("a")]
+        )
+        assert states == {"a": {"x": 1}}
+        fetch_mock.assert_called_once()
+
+
+def test_cursors_states_cache_eviction() -> None:
+    cache = CursorsStatesCache(size=2, ttl=60)
+    cache.set(JobId("j1"), Cursor("a"), {"x": 1})
+    cache.set(JobId("j1"), Cursor("b"), None)
+    assert cache.get(JobId("j1"), cursors=[Cursor("a")]) == ({"a": {"x": 1}}, [])
+
+    # The least recently used entry is evicted, along with its job index.
+    cache.set(JobId("j2"), Cursor("a"), {"x": 2})
+    assert cache.get(JobId("j1"), cursors=[Cursor("a"), Cursor("b")]) == (
+        {"a": {"x": 1}},
+        [Cursor("b")],
+    )
+    assert cache.cursors == {JobId("j1"): {Cursor("a")}, JobId("j2"): {Cursor("a")}}
+
+    cache.invalidate(JobId("j1"))
+    assert list(cache.entries) == [(JobId("j2"), Cursor("a"))]
+    assert cache.cursors == {JobId("j2"): {Cursor("a")}}
@@ -1,6 +1,9 @@
+from pathlib import Path
+
 from datalineup_engine.core import Cursor
 from datalineup_engine.core import JobId
 from datalineup_engine.utils import utcnow
+from datalineup_engine.worker.services.job_state.journal import JobsStatesJournal
 from datalineup_engine.worker.services.job_state.store import JobCompletion
 from datalineup_engine.worker.services.job_state.store import JobsStates
 from datalineup_engine.worker.services.job_state.store import JobsStatesSyncStore
@@ -60,3 +63,72 @@ def test_flush_state(frozen_time: object) -> None:
 
     with state.flush() as flush_state:
         assert flush_state.is_empty
+
+
+def test_journal_replay(frozen_time: object, tmp_path: Path) -> None:
+    job_1_id = JobId("j1")
+    job_2_id = JobId("j2")
+    journal = JobsStatesJournal(tmp_path)
+    state = JobsStatesSyncStore(journal=journal)
+    state.set_job_cursor(job_1_id, Cursor("1"))
+    state.set_job_cursor_state(job_1_id, cursor=Cursor("a"), cursor_state={"x": 1})
+    with state.flush():
+        pass
+
+    state.set_job_cursor(job_1_id, Cursor("2"))
+    state.set_job_cursor_state(job_1_id, cursor=Cursor("b"), cursor_state={"x": 2})
+    try:
+        with state.flush():
+            state.set_job_failed(job_2_id, "ValueError: boom")
+            raise ValueError()
+    except ValueError:
+        pass
+    state.set_job_cursor(job_1_id, Cursor("3"))
+    journal.close()
+
+    # Simulate a restart: only the updates not flushed are replayed.
+    journal = JobsStatesJournal(tmp_path)
+    state = JobsStatesSyncStore(journal=journal)
+    with state.flush() as flush_state:
+        assert flush_state == JobsStates(
+            jobs={
+                job_1_id: JobState(
+                    cursor=Cursor("3"),
+                    cursors_states={Cursor("b"): {"x": 2}},
+                ),
+                job_2_id: JobState(
+                    completion=JobCompletion(
+                        completed_at=utcnow(), error="ValueError: boom"
+                    )
+                ),
+            }
+        )
+    journal.close()
+
+    assert not list(tmp_path.iterdir())
+    assert JobsStatesSyncStore(journal=JobsStatesJournal(tmp_path)).is_empty
+
+
+def test_journal_skip_truncated_entry(tmp_path: Path) -> None:
+    journal = JobsStatesJournal(tmp_path)
+    state = JobsStatesSyncStore(journal=journal)
+    state.set_job_cursor(JobId("j1"), Cursor("1"))
+    journal.close()
+    with next(tmp_path.iterdir()).open("a") as f:
+        f.write('{"job": "j1", "sta')
+
+    state = JobsStatesSyncStore(journal=JobsStatesJournal(tmp_path))
+    assert state.job_state(JobId("j1")) == JobState(cursor=Cursor("1"))
+
+
+def test_journal_skip_unknown_files(tmp_path: Path) -> None:
+    (tmp_path / "backup.journal").write_text("{}")
+    journal = JobsStatesJournal(tmp_path)
+    state = JobsStatesSyncStore(journal=journal)
+    assert state.is_empty
+    state.set_job_cursor(JobId("j1"), Cursor("1"))
+    with state.flush():
+        pass
+    journal.close()
+
+    assert [p.name for p in tmp_path.iterdir()] == ["backup.journal"]
@@ -3,8 +3,17 @@ from typing import Optional
 import pickle  # noqa: S403
 import sys
 
+from pytest_mock import MockerFixture
+
+from datalineup_engine.core import PipelineInfo
+from datalineup_engine.core import PipelineResults
+from datalineup_engine.core import TopicMessage
+from datalineup_engine.utils.hooks import EventHook
+from datalineup_engine.worker.executors.bootstrap import PipelineBootstrap
 from datalineup_engine.worker.executors.bootstrap import RemoteException
 from datalineup_engine.worker.executors.bootstrap import wrap_remote_exception
+from datalineup_engine.worker.pipeline_message import CompiledPipeline
+from datalineup_engine.worker.pipeline_message import PipelineMessage
 
 
 class MyError(Exception):
@@ -110,3 +119,40 @@ def test_remote_exception() -> None:
         assert e.remote_traceback.stack[-1].line.strip() == "raise e from cause"
         assert e.remote_traceback.stack[-1].locals
         assert e.remote_traceback.stack[-1].locals["x"] == "{'foo': 'bar'}"
+
+
+def failing_pipeline(fail: bool) -> None:
+    if fail:
+        raise MyError()
+
+
+def test_bootstrap_pipelines() -> None:
+    bootstrap = PipelineBootstrap(initialized_hook=EventHook())
+    messages = [
+        PipelineMessage(
+            info=PipelineInfo.from_pipeline(failing_pipeline),
+            message=TopicMessage(args={"fail": fail}),
+        )
+        for fail in (False, True, False)
+    ]
+    results = bootstrap.bootstrap_pipelines(messages)
+    assert isinstance(results[0], PipelineResults)
+    assert isinstance(results[1], RemoteException)
+    assert results[1].remote_traceback.exc_type == "MyError"
+    assert isinstance(results[2], PipelineResults)
+
+
+def test_bootstrap_compiled_pipelines(mocker: MockerFixture) -> None:
+    bootstrap = PipelineBootstrap(initialized_hook=EventHook())
+    info = PipelineInfo.from_pipeline(failing_pipeline)
+    bootstrap.warmup([info, PipelineInfo(name="unknown.pipeline", resources={})])
+    assert list(bootstrap.pipelines) == [info.name]
+
+    spy = mocker.spy(CompiledPipeline, "from_info")
+    for _ in range(2):
+        message = PipelineMessage(info=info, message=TopicMessage(args={"fail": False}))
+        assert isinstance(bootstrap.bootstrap_pipeline(message), PipelineResults)
+    spy.assert_not_called()
+    assert bootstrap.pipelines[info.name].meta_args == {
+        "datalineup_engine.core.topic.TopicMessage": None
+    }
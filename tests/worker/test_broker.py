@@ -21,6 +21,7 @@ from datalineup_engine.worker.executors import ExecutableMessage
 from datalineup_engine.worker.executors import Executor
 from datalineup_engine.worker.resources.provider import ProvidedResource
 from datalineup_engine.worker.resources.provider import ResourcesProvider
+from tests.utils import TimeForwardLoop
 from tests.utils import register_hooks_handler
 from tests.utils.metrics import MetricsCapture
 from tests.utils.span_exporter import InMemorySpanExporter
@@ -193,3 +194,30 @@ async def test_broker_dummy(
 
     broker_task.cancel()
     await broker_task
+
+
+@pytest.mark.asyncio
+async def test_broker_run_concurrently(
+    broker: Broker,
+    running_event_loop: TimeForwardLoop,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    await broker.init()
+    opened = []
+
+    async def open_provider(name: str) -> None:
+        await asyncio.sleep(1)
+        if name == "p2":
+            raise ValueError("boom")
+        opened.append(name)
+
+    started_at = running_event_loop.time()
+    await broker.run_concurrently(
+        "open resources provider", open_provider, ["p1", "p2", "p3"]
+    )
+
+    # Providers open at once, the failing one is logged without stopping the
+    # others.
+    assert running_event_loop.time() - started_at == pytest.approx(1)
+    assert opened == ["p1", "p3"]
+    assert "Failed to open resources provider" in caplog.messages
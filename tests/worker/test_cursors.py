@@ -0,0 +1,105 @@
+import typing as t
+
+import json
+from collections.abc import Awaitable
+
+from datalineup_engine.config import Config
+from datalineup_engine.core import Cursor
+from datalineup_engine.core.api import ComponentDefinition
+from datalineup_engine.worker import cursors
+from datalineup_engine.worker.inventories.batching import BatchingInventory
+from datalineup_engine.worker.inventories.multi import MultiCursorsState
+from datalineup_engine.worker.inventory import CursorsState
+from datalineup_engine.worker.services.manager import ServicesManager
+from datalineup_engine.worker.work_factory import build_inventory
+
+
+def test_cursors_state_compact_disabled() -> None:
+    # Until enabled, large cursors are written in version 1 and older workers
+    # can still read them.
+    partials = {Cursor(str(i)) for i in range(10, 1000)}
+    state = CursorsState(after=Cursor("1"), partials=partials)
+    cursor = state.as_cursor()
+    assert cursor and json.loads(cursor)["v"] == 1
+    assert CursorsState.from_cursor(cursor) == state
+
+
+def test_cursors_state_compact() -> None:
+    partials = {Cursor(str(i)) for i in range(10, 1000)} | {
+        Cursor("item-a"),
+        Cursor("item-b"),
+    }
+    state = CursorsState(after=Cursor("1"), partials=partials, compact=True)
+    cursor = state.as_cursor()
+    assert cursor and len(cursor) < cursors.COMPACT_MIN_SIZE
+    assert json.loads(cursor) == {
+        "v": 2,
+        "a": "1",
+        "r": [[10, 999]],
+        "x": "item-",
+        "p": ["a", "b"],
+    }
+    assert CursorsState.from_cursor(cursor) == state
+
+
+def test_cursors_state_compressed() -> None:
+    partials = {Cursor(f"{i:x}-{i * 7919 % 10007}") for i in range(1000)}
+    state = CursorsState(after=Cursor("1"), partials=partials, compact=True)
+    cursor = state.as_cursor()
+    assert cursor and json.loads(cursor).keys() == {"v", "z"}
+    assert CursorsState.from_cursor(cursor) == state
+
+
+def test_cursors_state_small_and_legacy() -> None:
+    state = CursorsState(after=Cursor("1"), partials={Cursor("3"), Cursor("4")})
+    assert state.as_cursor() == '{"v": 1, "a": "1", "p": ["3", "4"]}'
+    assert CursorsState.from_cursor(state.as_cursor()) == state
+    assert CursorsState.from_cursor(Cursor("legacy")).after == "legacy"
+    assert CursorsState.from_cursor(Cursor('{"v": 2, "z": "!"}')).after == (
+        '{"v": 2, "z": "!"}'
+    )
+
+
+def test_multi_cursors_state_compact() -> None:
+    state = MultiCursorsState(
+        after=Cursor('{"v": 1, "a": "2"}'),
+        partials={
+            Cursor(str(i)): Cursor(json.dumps({"v": 1, "p": [str(i)]}))
+            for i in range(100)
+        },
+        compact=True,
+    )
+    cursor = state.as_cursor()
+    assert '\\"' not in cursor
+    assert json.loads(cursor)["a"] == {"v": 1, "a": "2"}
+    assert MultiCursorsState.from_cursor(cursor) == state
+
+
+async def test_build_inventory_compact_cursors(
+    config: Config,
+    services_manager_maker: t.Callable[[Config], Awaitable[ServicesManager]],
+) -> None:
+    definition = ComponentDefinition(
+        name="batching",
+        type="BatchingInventory",
+        options={
+            "inventory": {
+                "name": "d",
+                "type": "DummyInventory",
+                "options": {"count": 1},
+            }
+        },
+    )
+    services_manager = await services_manager_maker(config)
+    inventory = build_inventory(definition, services=services_manager.services)
+    assert isinstance(inventory, BatchingInventory)
+    assert not inventory.compact_cursors
+
+    # Nested inventories follow the option as well.
+    services_manager = await services_manager_maker(
+        config.load_object({"job_state": {"compact_cursors": True}})
+    )
+    inventory = build_inventory(definition, services=services_manager.services)
+    assert isinstance(inventory, BatchingInventory)
+    assert inventory.compact_cursors
+    assert inventory.inventory.compact_cursors
@@ -15,6 +15,8 @@ from datalineup_engine.core.api import QueueItem
 from datalineup_engine.core.api import QueueItemWithState
 from datalineup_engine.worker.executors.executable import ExecutableMessage
 from datalineup_engine.worker.executors.executable import ExecutableQueue
+from datalineup_engine.worker.services.hooks import ItemsBatch
+from datalineup_engine.worker.services.manager import ServicesManager
 from datalineup_engine.worker.topic import Topic
 from datalineup_engine.worker.topic import TopicOutput
 from datalineup_engine.worker.topics import MemoryTopic
@@ -181,3 +183,46 @@ async def test_execurablt_concurrency(
 
         await stack.enter_async_context(msg2._context)
         await stack.enter_async_context(next_task.result()._context)
+
+
+@pytest.mark.parametrize("lookahead", [0, 1])
+async def test_executable_batches_lookahead(
+    executable_queue_maker: t.Callable[..., ExecutableQueue],
+    fake_queue_item: QueueItemWithState,
+    services_manager: ServicesManager,
+    lookahead: int,
+) -> None:
+    topic = StaticTopic(
+        options=StaticTopic.Options(messages=[{"args": {"x": i}} for i in range(4)])
+    )
+    fake_queue_item.config["job"] = {
+        "batching_enabled": True,
+        "buffer_size": 2,
+        "batches_lookahead": lookahead,
+    }
+    xqueue = executable_queue_maker(topic=topic, definition=fake_queue_item)
+
+    calls: list[tuple[str, t.Any]] = []
+
+    async def on_items_batched(batch: ItemsBatch) -> None:
+        calls.append(("batched", batch.items[0].args["x"]))
+
+    services_manager.services.s.hooks.items_batched.register(on_items_batched)
+
+    async for xmsg in xqueue.run():
+        async with xmsg._context:
+            calls.append(("message", xmsg.message.message.args["x"]))
+            await asyncio.sleep(1)
+
+    if lookahead:
+        # The second batch is emitted while the first one is processed.
+        assert calls.index(("batched", 2)) < calls.index(("message", 1))
+    else:
+        assert calls == [
+            ("batched", 0),
+            ("message", 0),
+            ("message", 1),
+            ("batched", 2),
+            ("message", 2),
+            ("message", 3),
+        ]
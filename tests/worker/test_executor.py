@@ -7,6 +7,7 @@ from functools import partial
 from unittest.mock import AsyncMock
 
 import pytest
+from pytest_mock import MockerFixture
 
 from datalineup_engine.core import PipelineInfo
 from datalineup_engine.core import PipelineOutput
@@ -18,10 +19,12 @@ from datalineup_engine.core.api import RepublishOptions
 from datalineup_engine.core.error import ErrorMessageArgs
 from datalineup_engine.worker.error_handling import HandledError
 from datalineup_engine.worker.executors import Executor
+from datalineup_engine.worker.executors.arq.executor import ARQExecutor
 from datalineup_engine.worker.executors.executable import ExecutableMessage
 from datalineup_engine.worker.executors.parkers import Parkers
 from datalineup_engine.worker.executors.queue import ExecutorQueue
 from datalineup_engine.worker.resources.manager import ResourceData
+from datalineup_engine.worker.services.hooks import MessagePublished
 from datalineup_engine.worker.topics.memory import MemoryTopic
 from datalineup_engine.worker.topics.memory import get_queue
 from tests.utils import TimeForwardLoop
@@ -401,3 +404,230 @@ async def test_executor_error_handler_republish(
     assert retry_queue.qsize() == 0
     assert len(exc_infos) == 1
     assert repr(exc_infos[0][1]) == "Exception('TEST_EXCEPTION')"
+
+
+class FakeBatchExecutor(FakeExecutor):
+    batch_size = 3
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[list[ExecutableMessage]] = []
+
+    async def process_messages(
+        self, messages: list[ExecutableMessage]
+    ) -> list[t.Union[PipelineResults, BaseException]]:
+        self.batches.append(messages)
+        return [
+            (
+                ValueError("TEST_EXCEPTION")
+                if message.message.message.args.get("fail")
+                else PipelineResults(outputs=[], resources=[])
+            )
+            for message in messages
+        ]
+
+
+@pytest.mark.asyncio
+async def test_executor_batch(
+    executable_maker: Callable[..., ExecutableMessage],
+    running_event_loop: TimeForwardLoop,
+    executor_queue_maker: Callable[..., ExecutorQueue],
+) -> None:
+    executor = FakeBatchExecutor()
+    executor_manager = executor_queue_maker(executor=executor)
+
+    exc_infos = []
+
+    async def collect_exit(*args: t.Any) -> None:
+        exc_infos.append(args)
+
+    xmsgs = [
+        executable_maker(message=TopicMessage(args={"fail": i == 1})) for i in range(5)
+    ]
+    for xmsg in xmsgs:
+        xmsg._executing_context.push_async_exit(collect_exit)
+
+    async with running_event_loop.until_idle():
+        for xmsg in xmsgs:
+            asyncio.create_task(executor_manager.submit(xmsg))
+
+    # Messages are dispatched in batches of at most `batch_size`, the last batch
+    # is flushed after `batch_flush_after`.
+    assert [len(batch) for batch in executor.batches] == [3, 2]
+    assert [m for batch in executor.batches for m in batch] == xmsgs
+
+    # Only the failing message context see its error.
+    assert len(exc_infos) == 5
+    errors = [e for e, *_ in exc_infos if e]
+    assert errors == [ValueError]
+
+
+class FakeFanoutExecutor(FakeExecutor):
+    async def process_message(self, message: ExecutableMessage) -> PipelineResults:
+        return PipelineResults(
+            outputs=[
+                PipelineOutput(channel="default", message=TopicMessage(args={"n": i}))
+                for i in range(3)
+            ],
+            resources=[],
+        )
+
+
+@pytest.mark.asyncio
+async def test_executor_publish_many(
+    executable_maker: Callable[..., ExecutableMessage],
+    running_event_loop: TimeForwardLoop,
+    executor_queue_maker: Callable[..., ExecutorQueue],
+    mocker: MockerFixture,
+) -> None:
+    executor_manager = executor_queue_maker(executor=FakeFanoutExecutor())
+    output_queue = get_queue("q-fanout", maxsize=2)
+    output_topic = MemoryTopic(MemoryTopic.Options(name="q-fanout"))
+    publish_many = mocker.spy(output_topic, "publish_many")
+    parker = Parkers()
+
+    async with running_event_loop.until_idle():
+        await executor_manager.submit(
+            executable_maker(parker=parker, output={"default": [output_topic]})
+        )
+
+    # All outputs are published at once, the last one is blocked on the full
+    # queue.
+    publish_many.assert_awaited_once()
+    assert len(publish_many.call_args.args[0]) == 3
+    assert output_queue.qsize() == 2
+    assert parker.locked()
+
+    async with running_event_loop.until_idle():
+        assert output_queue.get_nowait().args == {"n": 0}
+
+    assert [output_queue.get_nowait().args for _ in range(2)] == [{"n": 1}, {"n": 2}]
+    assert not parker.locked()
+
+
+@pytest.mark.asyncio
+async def test_executor_publish_blocked_in_order(
+    executable_maker: Callable[..., ExecutableMessage],
+    running_event_loop: TimeForwardLoop,
+    executor_queue_maker: Callable[..., ExecutorQueue],
+) -> None:
+    executor_manager = executor_queue_maker(executor=FakeFanoutExecutor())
+    output_queue = get_queue("q-fanout", maxsize=1)
+    output_topic = MemoryTopic(MemoryTopic.Options(name="q-fanout"))
+    calls: list[tuple[str, t.Any]] = []
+
+    async def on_output_blocked(
+        message_published: MessagePublished,
+    ) -> t.AsyncGenerator[None, None]:
+        n = message_published.output.message.args["n"]
+        calls.append(("blocked", n))
+        yield
+        calls.append(("published", n))
+
+    executor_manager.services.s.hooks.output_blocked.register(on_output_blocked)
+
+    async with running_event_loop.until_idle():
+        await executor_manager.submit(
+            executable_maker(output={"default": [output_topic]})
+        )
+
+    published = []
+    for _ in range(3):
+        async with running_event_loop.until_idle():
+            published.append(output_queue.get_nowait().args["n"])
+
+    # Blocked outputs are published one after the other, in order.
+    assert published == [0, 1, 2]
+    assert calls == [
+        ("blocked", 1),
+        ("published", 1),
+        ("blocked", 2),
+        ("published", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_executor_publish_blocked_in_order_across_topics(
+    executable_maker: Callable[..., ExecutableMessage],
+    running_event_loop: TimeForwardLoop,
+    executor_queue_maker: Callable[..., ExecutorQueue],
+) -> None:
+    executor_manager = executor_queue_maker(executor=FakeFanoutExecutor())
+    queue_a = get_queue("q-fanout-a", maxsize=1)
+    queue_b = get_queue("q-fanout-b", maxsize=1)
+    topic_a = MemoryTopic(MemoryTopic.Options(name="q-fanout-a"))
+    topic_b = MemoryTopic(MemoryTopic.Options(name="q-fanout-b"))
+    calls: list[tuple[str, str, t.Any]] = []
+
+    async def on_output_blocked(
+        message_published: MessagePublished,
+    ) -> t.AsyncGenerator[None, None]:
+        name = "a" if message_published.topic is topic_a else "b"
+        n = message_published.output.message.args["n"]
+        calls.append(("blocked", name, n))
+        yield
+        calls.append(("published", name, n))
+
+    executor_manager.services.s.hooks.output_blocked.register(on_output_blocked)
+
+    async with running_event_loop.until_idle():
+        await executor_manager.submit(
+            executable_maker(output={"default": [topic_a, topic_b]})
+        )
+
+    for _ in range(3):
+        async with running_event_loop.until_idle():
+            queue_a.get_nowait()
+            queue_b.get_nowait()
+
+    # Blocked outputs wait for the outputs before them, whatever their topic.
+    assert calls == [
+        ("blocked", "a", 1),
+        ("published", "a", 1),
+        ("blocked", "b", 1),
+        ("published", "b", 1),
+        ("blocked", "a", 2),
+        ("published", "a", 2),
+        ("blocked", "b", 2),
+        ("published", "b", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_arq_executor_batch_options(
+    executable_maker: Callable[..., ExecutableMessage],
+    mocker: MockerFixture,
+) -> None:
+    executor = ARQExecutor(
+        ARQExecutor.Options(redis_url="redis://localhost", concurrency=1),
+        services=mocker.Mock(),
+    )
+
+    async def run_job(
+        function: str, payload: list, *, options: ARQExecutor.Options, name: str
+    ) -> list[PipelineResults]:
+        output = PipelineOutput(
+            channel=options.queue_name, message=TopicMessage(args={})
+        )
+        return [PipelineResults(outputs=[output], resources=[]) for _ in payload]
+
+    run_job_mock = mocker.patch.object(executor, "run_job", side_effect=run_job)
+    xmsgs = [
+        executable_maker(
+            message=TopicMessage(
+                args={}, config={"arq_executor": {"queue_name": queue_name}}
+            )
+        )
+        for queue_name in ["q1", "q2", "q1"]
+    ]
+
+    # Messages are sent in a job for each distinct queue, results keep the
+    # messages order.
+    results = await executor.process_messages(xmsgs)
+    assert [
+        r.outputs[0].channel for r in results if isinstance(r, PipelineResults)
+    ] == ["q1", "q2", "q1"]
+    assert sorted(
+        (c.kwargs["options"].queue_name, len(c.args[1]))
+        for c in run_job_mock.call_args_list
+    ) == [("q1", 2), ("q2", 1)]
@@ -280,3 +280,166 @@ async def test_resources_manager_with_hourly_rate_limit_and_wait(
         pass
 
     assert (int(time.time()) - time_start) == 3600
+
+
+@pytest.mark.asyncio
+async def test_resources_manager_acquire_many_is_atomic(
+    running_event_loop: TimeForwardLoop,
+) -> None:
+    r1 = ResourceData(name="r1", type="R1", data={})
+    r2 = ResourceData(name="r2", type="R2", data={})
+    resources_manager = ResourcesManager()
+    await resources_manager.add(r1)
+    await resources_manager.add(r2)
+
+    locked_r2 = await resources_manager.acquire("R2")
+    async with running_event_loop.until_idle():
+        waiter = asyncio.create_task(resources_manager.acquire_many(["R1", "R2"]))
+
+    # R1 isn't held while waiting on R2.
+    async with await resources_manager.acquire("R1", wait=False):
+        pass
+
+    async with running_event_loop.until_idle():
+        await locked_r2.release()
+    async with waiter.result() as resources:
+        assert resources["R1"].resource is r1
+        assert resources["R2"].resource is r2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fifo", [True, False])
+async def test_resources_manager_fifo(
+    running_event_loop: TimeForwardLoop, fifo: bool
+) -> None:
+    r1 = ResourceData(name="r1", type="R", data={})
+    resources_manager = ResourcesManager.from_options({"fifo": fifo})
+    await resources_manager.add(r1)
+
+    locked = await resources_manager.acquire("R")
+    order: list[str] = []
+
+    async def acquire(name: str) -> None:
+        async with await resources_manager.acquire("R"):
+            order.append(name)
+
+    async with running_event_loop.until_idle():
+        first = asyncio.create_task(acquire("first"))
+    await locked.release()
+    # Try to barge in before the waiter had a chance to run.
+    if fifo:
+        with pytest.raises(ResourceUnavailable):
+            await resources_manager.acquire("R", wait=False)
+    else:
+        async with await resources_manager.acquire("R", wait=False):
+            order.append("barging")
+
+    await first
+    assert order == (["first"] if fifo else ["barging", "first"])
+
+
+@pytest.mark.asyncio
+async def test_resources_manager_with_fixed_window_rate_limiter(
+    running_event_loop: TimeForwardLoop,
+) -> None:
+    r1 = ResourceData(
+        name="r1",
+        type="R",
+        data={},
+        rate_limit=ResourceRateLimit(rate_limits=["2 per hour"]),
+    )
+    resources_manager = ResourcesManager()
+    await resources_manager.add(r1)
+
+    async with await resources_manager.acquire("R", wait=False):
+        pass
+    async with await resources_manager.acquire("R", wait=False):
+        pass
+
+    with pytest.raises(ResourceUnavailable):
+        await resources_manager.acquire("R", wait=False)
+
+    await asyncio.sleep(3601)
+    async with await resources_manager.acquire("R", wait=False):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_resources_manager_shared_leases(
+    running_event_loop: TimeForwardLoop,
+) -> None:
+    options = {
+        "shared_storage_url": "memory://test-leases",
+        "shared_resource_types": ["R"],
+        "lease_retry_after": 1,
+    }
+    worker1 = ResourcesManager.from_options(options)
+    worker2 = ResourcesManager.from_options(options)
+    for worker in (worker1, worker2):
+        await worker.add(ResourceData(name="r1", type="R", data={}))
+        await worker.add(ResourceData(name="o1", type="O", data={}))
+
+    locked = await worker1.acquire("R", wait=False)
+    with pytest.raises(ResourceUnavailable):
+        await worker2.acquire("R", wait=False)
+
+    # Other resource types aren't shared.
+    async with await worker1.acquire("O", wait=False):
+        async with await worker2.acquire("O", wait=False):
+            pass
+
+    # The lease is renewed while the resource is held.
+    await asyncio.sleep(60)
+    with pytest.raises(ResourceUnavailable):
+        await worker2.acquire("R", wait=False)
+
+    waiter = asyncio.create_task(worker2.acquire("R"))
+    await asyncio.sleep(0.1)
+    await locked.release()
+    await asyncio.sleep(1)
+    assert waiter.done()
+    async with waiter.result():
+        with pytest.raises(ResourceUnavailable):
+            await worker1.acquire("R", wait=False)
+    await asyncio.sleep(1)
+
+    async with await worker1.acquire_many(["R", "O"], wait=False):
+        pass
+
+    await worker1.close()
+    await worker2.close()
+
+
+@pytest.mark.asyncio
+async def test_resources_manager_shared_rate_limit(
+    running_event_loop: TimeForwardLoop,
+) -> None:
+    options = {"shared_storage_url": "memory://test-rate-limit"}
+    workers = [ResourcesManager.from_options(options) for _ in range(2)]
+    for worker in workers:
+        await worker.add(
+            ResourceData(
+                name="r1",
+                type="R",
+                data={},
+                rate_limit=ResourceRateLimit(
+                    rate_limits=["2 per hour"], strategy="moving-window"
+                ),
+            )
+        )
+
+    async with await workers[0].acquire("R", wait=False):
+        pass
+    await asyncio.sleep(1)
+    async with await workers[1].acquire("R", wait=False):
+        pass
+    await asyncio.sleep(1)
+
+    # The window is shared, so both workers must wait for it to reset.
+    for worker in workers:
+        with pytest.raises(ResourceUnavailable):
+            await worker.acquire("R", wait=False)
+
+    await asyncio.sleep(3600)
+    async with await workers[1].acquire("R", wait=False):
+        pass
@@ -13,6 +13,7 @@ import pytest
 from datalineup_engine.utils.asyncutils import aiter2agen
 from datalineup_engine.worker.executors.scheduler import Schedulable
 from datalineup_engine.worker.executors.scheduler import Scheduler
+from datalineup_engine.worker.executors.scheduler import build_scheduling_policy
 
 
 @pytest.fixture
@@ -140,3 +141,132 @@ async def test_scheduler_close_error(scheduler: Scheduler) -> None:
             raise AssertionError()
 
     close_mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_idle_item(scheduler: Scheduler) -> None:
+    started = asyncio.Event()
+
+    async def idle() -> AsyncGenerator:
+        await started.wait()
+        while True:
+            yield sentinel.idle
+
+    scheduler.add(make_schedulable(aiter2agen(alib.cycle([sentinel.busy]))))
+    scheduler.add(make_schedulable(idle()))
+
+    async with alib.scoped_iter(scheduler.run()) as generator:
+        items = [item async for item in alib.islice(generator, 10)]
+        assert items == [sentinel.busy] * 10
+
+        # An item that was idle doesn't catch up on the others.
+        started.set()
+        messages: Counter[object] = Counter()
+        async for item in alib.islice(generator, 10):
+            messages[item] += 1
+        assert messages == {sentinel.busy: 5, sentinel.idle: 5}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_close_ready(scheduler: Scheduler) -> None:
+    closed: list[object] = []
+
+    async def cycle(value: object) -> AsyncGenerator[object, None]:
+        try:
+            while True:
+                yield value
+        finally:
+            closed.append(value)
+
+    futures = [
+        scheduler.add(make_schedulable(cycle(sentinel.schedulable1))),
+        scheduler.add(make_schedulable(cycle(sentinel.schedulable2))),
+    ]
+
+    async with alib.scoped_iter(scheduler.run()) as generator:
+        await alib.anext(generator)
+        assert scheduler.ready
+        await scheduler.close()
+        # Items ready before closing aren't yielded anymore, and their
+        # generators are closed.
+        async for item in generator:
+            raise AssertionError()
+    assert set(closed) == {sentinel.schedulable1, sentinel.schedulable2}
+    assert all(future.done() for future in futures)
+
+
+def make_labeled_schedulable(
+    iterable: AsyncGenerator[T, None], name: str, **labels: str
+) -> Schedulable[T]:
+    return Schedulable(iterable=iterable, name=name, labels=labels)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_weighted_fair_queuing() -> None:
+    scheduler: Scheduler[object] = Scheduler(
+        policy=build_scheduling_policy(
+            "WeightedFairQueuing", {"weight_label": "weight"}
+        )
+    )
+    scheduler.add(
+        make_labeled_schedulable(
+            aiter2agen(alib.cycle([sentinel.schedulable1])), "s1", weight="3"
+        )
+    )
+    scheduler.add(
+        make_labeled_schedulable(aiter2agen(alib.cycle([sentinel.schedulable2])), "s2")
+    )
+
+    messages: Counter[object] = Counter()
+    async with alib.scoped_iter(scheduler.run()) as generator:
+        async for item in alib.islice(generator, 40):
+            messages[item] += 1
+    await scheduler.close()
+
+    assert messages == {sentinel.schedulable1: 30, sentinel.schedulable2: 10}
+    assert scheduler.stats()["s1"].scheduled == 30
+
+
+@pytest.mark.asyncio
+async def test_scheduler_strict_priority() -> None:
+    scheduler: Scheduler[object] = Scheduler(
+        policy=build_scheduling_policy("StrictPriority", {"priority_label": "prio"})
+    )
+    low = make_labeled_schedulable(
+        aiter2agen(alib.cycle([sentinel.low])), "low", prio="1"
+    )
+    scheduler.add(low)
+    scheduler.add(
+        make_labeled_schedulable(
+            aiter2agen(alib.cycle([sentinel.high])), "high", prio="2"
+        )
+    )
+
+    async with alib.scoped_iter(scheduler.run()) as generator:
+        items = [item async for item in alib.islice(generator, 10)]
+    await scheduler.close()
+
+    assert items == [sentinel.high] * 10
+
+
+@pytest.mark.asyncio
+async def test_scheduler_deficit_round_robin() -> None:
+    scheduler: Scheduler[object] = Scheduler(
+        policy=build_scheduling_policy("DeficitRoundRobin", {"quantum": 1})
+    )
+    slow = make_labeled_schedulable(aiter2agen(alib.cycle([sentinel.slow])), "slow")
+    fast = make_labeled_schedulable(aiter2agen(alib.cycle([sentinel.fast])), "fast")
+    scheduler.add(slow)
+    scheduler.add(fast)
+    scheduler.record_cost(slow, 1)
+    scheduler.record_cost(fast, 0.25)
+
+    messages: Counter[object] = Counter()
+    async with alib.scoped_iter(scheduler.run()) as generator:
+        async for item in alib.islice(generator, 50):
+            messages[item] += 1
+    await scheduler.close()
+
+    assert messages == {sentinel.slow: 10, sentinel.fast: 40}
+    assert scheduler.stats()["slow"].cost == 1
+    assert scheduler.stats()["fast"].average_cost == 0.25
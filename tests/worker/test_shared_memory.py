@@ -0,0 +1,134 @@
+import typing as t
+
+import asyncio
+import threading
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from datalineup_engine.worker.executors import shared_memory
+from datalineup_engine.worker.executors.process import ProcessExecutor
+from datalineup_engine.worker.executors.shared_memory import SharedMemoryPool
+
+
+def test_shared_memory_roundtrip() -> None:
+    pool = SharedMemoryPool()
+    obj = {
+        "small": b"x" * 10,
+        "bytes": b"y" * 100_000,
+        "bytearray": bytearray(b"z" * 100_000),
+    }
+    payload, segments = shared_memory.dumps(obj, allocate=pool.allocate)
+    assert len(segments) == 2
+    assert len(payload.data) < 1000
+
+    loaded = shared_memory.loads(payload)
+    assert loaded == obj
+    assert type(loaded["bytes"]) is bytes
+    assert type(loaded["bytearray"]) is bytearray
+
+    # Released segments are reused by the next payload.
+    for segment in segments:
+        pool.release(segment)
+    _, new_segments = shared_memory.dumps(obj, allocate=pool.allocate)
+    assert {s.name for s in new_segments} == {s.name for s in segments}
+    for segment in new_segments:
+        pool.release(segment)
+    pool.close()
+    assert not pool.free
+
+
+def test_shared_memory_pool_max_cached_bytes() -> None:
+    pool = SharedMemoryPool(max_cached_bytes=8192)
+    segments = [pool.allocate(5000), pool.allocate(5000)]
+    for segment in segments:
+        pool.release(segment)
+    assert pool.cached_bytes == 8192
+    assert len(pool.free[8192]) == 1
+    pool.close()
+
+
+def test_shared_memory_dumps_error_release() -> None:
+    pool = SharedMemoryPool()
+    obj = {"bytes": b"x" * 100_000, "error": lambda: None}
+    with pytest.raises(Exception):
+        shared_memory.dumps(obj, allocate=pool.allocate, release=pool.release)
+
+    # The segment is back in the pool and still usable.
+    (segment,) = pool.free[131072]
+    SharedMemory(name=segment.name).close()
+    pool.close()
+
+
+def test_shared_memory_loads_error_unlink() -> None:
+    obj = {"a": b"x" * 100_000, "b": b"y" * 100_000}
+    payload, segments = shared_memory.dumps(obj, allocate=shared_memory.create_segment)
+    for segment in segments:
+        segment.close()
+    # The first segment is gone before loading.
+    missing = SharedMemory(name=segments[0].name)
+    missing.close()
+    missing.unlink()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.loads(payload, unlink=True)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=segments[1].name)
+
+
+def echo(data: t.Any) -> t.Any:
+    return data
+
+
+def test_process_executor_remote_execute_shared() -> None:
+    pool = SharedMemoryPool()
+    data = {"payload": b"x" * 1_000_000}
+    payload, segments = shared_memory.dumps(data, allocate=pool.allocate)
+
+    # This would run in the worker process.
+    result = ProcessExecutor.remote_execute_shared(
+        echo, payload, min_size=shared_memory.DEFAULT_MIN_SIZE
+    )
+    assert len(result.buffers) == 1
+
+    for segment in segments:
+        pool.release(segment)
+    assert shared_memory.loads(result, unlink=True) == data
+    pool.close()
+
+
+async def test_process_executor_remote_call_cancel(
+    executor: ProcessExecutor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    executor.shared_memory = SharedMemoryPool()
+    created: list[str] = []
+
+    def create_segment(size: int) -> SharedMemory:
+        segment = SharedMemory(create=True, size=size)
+        created.append(segment.name)
+        return segment
+
+    monkeypatch.setattr(shared_memory, "create_segment", create_segment)
+    started = threading.Event()
+    resume = threading.Event()
+
+    def wait_echo(data: t.Any) -> t.Any:
+        started.set()
+        resume.wait()
+        return data
+
+    task = asyncio.create_task(
+        executor.remote_call(wait_echo, {"payload": b"x" * 1_000_000})
+    )
+    await asyncio.get_running_loop().run_in_executor(None, started.wait)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The results segments are destroyed once the call completes.
+    resume.set()
+    executor.pool_executor.shutdown(wait=True)
+    assert created
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
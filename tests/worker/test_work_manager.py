@@ -1,3 +1,5 @@
+import asyncio
+from unittest import mock
 from unittest.mock import Mock
 
 import pytest
@@ -5,6 +7,7 @@ import pytest
 from datalineup_engine.core import Cursor
 from datalineup_engine.core import JobId
 from datalineup_engine.core.api import ComponentDefinition
+from datalineup_engine.core.api import LockDropped
 from datalineup_engine.core.api import LockResponse
 from datalineup_engine.core.api import PipelineInfo
 from datalineup_engine.core.api import QueueItemState
@@ -12,8 +15,10 @@ from datalineup_engine.core.api import QueueItemWithState
 from datalineup_engine.core.api import QueuePipeline
 from datalineup_engine.core.api import ResourceItem
 from datalineup_engine.core.api import ResourcesProviderItem
+from datalineup_engine.core.api import lock_version
 from datalineup_engine.worker.work_manager import WorkManager
 from datalineup_engine.worker.work_manager import WorkSync
+from tests.utils import TimeForwardLoop
 
 
 @pytest.mark.asyncio
@@ -176,3 +181,126 @@ async def test_sync(
     assert set(work_sync.resources.drop) == {r2_resource}
     assert set(work_sync.resources_providers.drop) == {rp2_resource_provider}
     assert set(e.name for e in work_sync.executors.drop) == {e2_executor.name}
+
+
+@pytest.mark.asyncio
+async def test_sync_dropped(
+    fake_pipeline_info: PipelineInfo,
+    work_manager: WorkManager,
+    worker_manager_client: Mock,
+) -> None:
+    def queue_item(name: str) -> QueueItemWithState:
+        return QueueItemWithState(
+            name=JobId(name),
+            input=ComponentDefinition(name=name, type="DummyTopic"),
+            pipeline=QueuePipeline(info=fake_pipeline_info, args={}),
+            output={},
+        )
+
+    worker_manager_client.lock.return_value = LockResponse(
+        items=[queue_item("q1"), queue_item("q2")],
+        resources=[],
+        resources_providers=[],
+        executors=[],
+    )
+    await work_manager.sync()
+    worker_manager_client.lock.assert_called_with(
+        version=lock_version(
+            items=[], resources=[], resources_providers=[], executors=[]
+        ),
+        wait=None,
+    )
+
+    # Only the changes since the version held by the worker are sent.
+    worker_manager_client.lock.return_value = LockResponse(
+        items=[queue_item("q3")],
+        resources=[],
+        resources_providers=[],
+        executors=[],
+        dropped=LockDropped(items=[JobId("q1")]),
+    )
+    work_sync = await work_manager.sync()
+    worker_manager_client.lock.assert_called_with(
+        version=lock_version(
+            items=["q1", "q2"], resources=[], resources_providers=[], executors=[]
+        ),
+        wait=mock.ANY,
+    )
+    assert [q.name for q in work_sync.queues.add] == ["q3"]
+    assert [q.name for q in work_sync.queues.drop] == ["q1"]
+    assert set(work_manager.worker_items) == {"q2", "q3"}
+
+    # Nothing changed.
+    worker_manager_client.lock.return_value = LockResponse(
+        items=[],
+        resources=[],
+        resources_providers=[],
+        executors=[],
+        dropped=LockDropped(),
+    )
+    work_sync = await work_manager.sync()
+    assert work_sync == WorkSync.empty()
+    assert set(work_manager.worker_items) == {"q2", "q3"}
+
+
+@pytest.mark.asyncio
+async def test_sync_long_poll(
+    work_manager: WorkManager,
+    worker_manager_client: Mock,
+    running_event_loop: TimeForwardLoop,
+) -> None:
+    await work_manager.sync()
+    worker_manager_client.lock.assert_called_with(version=mock.ANY, wait=None)
+
+    # The lock waits for changes until the end of the sync period.
+    worker_manager_client.lock.return_value = LockResponse(
+        items=[],
+        resources=[],
+        resources_providers=[],
+        executors=[],
+        dropped=LockDropped(),
+    )
+    started_at = running_event_loop.time()
+    await work_manager.sync()
+    worker_manager_client.lock.assert_called_with(version=mock.ANY, wait=60)
+
+    # Without long polling support, the lock returns at once and the worker
+    # waits for the end of the period before the next lock.
+    assert running_event_loop.time() - started_at == pytest.approx(60)
+
+
+@pytest.mark.asyncio
+async def test_build_queues_concurrently(
+    fake_pipeline_info: PipelineInfo,
+    work_manager: WorkManager,
+    running_event_loop: TimeForwardLoop,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    async def on_work_queue_built(item: QueueItemWithState) -> None:
+        await asyncio.sleep(1)
+
+    work_manager.services.s.hooks.work_queue_built.register(on_work_queue_built)
+
+    def queue_item(name: str, topic_type: str) -> QueueItemWithState:
+        return QueueItemWithState(
+            name=JobId(name),
+            input=ComponentDefinition(name=name, type=topic_type),
+            pipeline=QueuePipeline(info=fake_pipeline_info, args={}),
+            output={},
+        )
+
+    started_at = running_event_loop.time()
+    queues = await work_manager.build_queues_for_worker_items(
+        iter(
+            [
+                queue_item("q1", "DummyTopic"),
+                queue_item("q2", "UnknownTopic"),
+                queue_item("q3", "DummyTopic"),
+            ]
+        )
+    )
+
+    # Queues are built at once, the one failing to build is logged and skipped.
+    assert running_event_loop.time() - started_at == pytest.approx(1)
+    assert set(queues) == {"q1", "q3"}
+    assert "Failed to build queue" in caplog.messages
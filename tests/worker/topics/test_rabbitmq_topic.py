@@ -4,6 +4,8 @@ import asyncio
 from collections.abc import Awaitable
 from datetime import datetime
 from datetime import timedelta
+from unittest.mock import AsyncMock
+from unittest.mock import Mock
 
 import asyncstdlib as alib
 import pytest
@@ -13,11 +15,14 @@ from datalineup_engine.config import Config
 from datalineup_engine.core import MessageId
 from datalineup_engine.core import TopicMessage
 from datalineup_engine.utils import utcnow
+from datalineup_engine.worker.services import Services
 from datalineup_engine.worker.services.manager import ServicesManager
 from datalineup_engine.worker.services.rabbitmq import RabbitMQService
 from datalineup_engine.worker.topic import TopicClosedError
 from datalineup_engine.worker.topics import RabbitMQTopic
+from datalineup_engine.worker.topics.rabbitmq import BatchAcker
 from datalineup_engine.worker.topics.rabbitmq import Exchange
+from datalineup_engine.worker.topics.rabbitmq import RabbitMQCompression
 from datalineup_engine.worker.topics.rabbitmq import RabbitMQSerializer
 from tests.utils.tcp_proxy import TcpProxy
 from tests.worker.topics.conftest import RabbitMQTopicMaker
@@ -52,6 +57,167 @@ async def test_rabbitmq_topic_simple(
     await topic.close()
 
 
+@pytest.mark.asyncio
+async def test_rabbitmq_topic_batch_ack(
+    rabbitmq_topic_maker: RabbitMQTopicMaker,
+) -> None:
+    topic = await rabbitmq_topic_maker(
+        RabbitMQTopic, prefetch_count=10, ack_batch_size=5, max_retry=1
+    )
+
+    messages = [TopicMessage(id=MessageId(str(i)), args={"n": i}) for i in range(4)]
+    for message in messages:
+        await topic.publish(message, wait=True)
+
+    async with alib.scoped_iter(topic.run()) as topic_iter:
+        contexts = [await alib.anext(topic_iter) for _ in messages]
+        # Complete out of order, fail the second message.
+        for i in (3, 0, 2):
+            assert await unwrap(contexts[i]) == messages[i]
+        with pytest.raises(ValueError):
+            async with contexts[1]:
+                raise ValueError("Exception")
+
+        # Only the failed message is redelivered.
+        assert await unwrap(await alib.anext(topic_iter)) == messages[1]
+
+    await topic.close()
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_topic_publish_many(
+    rabbitmq_topic_maker: RabbitMQTopicMaker,
+) -> None:
+    topic = await rabbitmq_topic_maker(RabbitMQTopic, publish_window=10)
+
+    messages = [TopicMessage(id=MessageId(str(i)), args={"n": i}) for i in range(20)]
+    assert await topic.publish_many(messages, wait=True) == [True] * 20
+
+    async with alib.scoped_iter(topic.run()) as topic_iter:
+        items = [await unwrap(context) async for context in alib.islice(topic_iter, 20)]
+        assert items == messages
+
+    await topic.close()
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_topic_publish_many_max_concurrency(
+    rabbitmq_topic_maker: RabbitMQTopicMaker,
+) -> None:
+    topic = await rabbitmq_topic_maker(
+        RabbitMQTopic, publish_window=10, max_publish_concurrency=2
+    )
+
+    # The window waits for a reservation instead of rejecting the messages.
+    messages = [TopicMessage(id=MessageId(str(i)), args={"n": i}) for i in range(20)]
+    assert await topic.publish_many(messages, wait=False) == [True] * 20
+
+    await topic.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "serializer,compression",
+    [
+        (RabbitMQSerializer.JSON, None),
+        (RabbitMQSerializer.PICKLE, RabbitMQCompression.ZLIB),
+        (RabbitMQSerializer.ORJSON, None),
+        (RabbitMQSerializer.MSGPACK, RabbitMQCompression.ZLIB),
+        (RabbitMQSerializer.JSON, RabbitMQCompression.ZSTD),
+        (RabbitMQSerializer.JSON, RabbitMQCompression.LZ4),
+    ],
+)
+async def test_rabbitmq_topic_serializers(
+    serializer: RabbitMQSerializer,
+    compression: t.Optional[RabbitMQCompression],
+) -> None:
+    for module, value in [
+        ("orjson", RabbitMQSerializer.ORJSON),
+        ("msgpack", RabbitMQSerializer.MSGPACK),
+        ("zstandard", RabbitMQCompression.ZSTD),
+        ("lz4", RabbitMQCompression.LZ4),
+    ]:
+        if value in (serializer, compression):
+            pytest.importorskip(module)
+
+    topic = RabbitMQTopic(
+        RabbitMQTopic.Options(
+            queue_name="test",
+            serializer=serializer,
+            compression=compression,
+            compress_above_size=500,
+        ),
+        services=Services(rabbitmq=Mock()),
+    )
+    for args, compressed in (({"n": 1}, False), ({"n": "x" * 1000}, True)):
+        message = TopicMessage(id=MessageId("0"), args=args)
+        body, content_encoding = topic._compress(topic._serialize(message))
+        if compression and compressed:
+            assert content_encoding == compression.value
+            assert len(body) < 1000
+        else:
+            assert content_encoding is None
+
+        incoming = Mock(
+            body=body,
+            content_type=serializer.content_type,
+            content_encoding=content_encoding,
+        )
+        assert topic._deserialize(incoming) == message
+
+    # Unknown content encodings are not decompressed.
+    message = TopicMessage(id=MessageId("0"), args={"n": 1})
+    incoming = Mock(
+        body=topic._serialize(message),
+        content_type=serializer.content_type,
+        content_encoding="utf-8",
+    )
+    assert topic._deserialize(incoming) == message
+
+
+class FakeMessage:
+    def __init__(self, tag: int, calls: list[tuple[str, int, bool]]) -> None:
+        self.tag = tag
+        self.calls = calls
+
+    async def ack(self, multiple: bool = False) -> None:
+        self.calls.append(("ack", self.tag, multiple))
+
+    async def reject(self, requeue: bool = False) -> None:
+        self.calls.append(("reject", self.tag, requeue))
+
+
+@pytest.mark.asyncio
+async def test_batch_acker() -> None:
+    calls: list[tuple[str, int, bool]] = []
+    acker = BatchAcker(batch_size=3, flush_after=1)
+    deliveries = [
+        acker.track(FakeMessage(i, calls))  # type: ignore[arg-type]
+        for i in range(1, 6)
+    ]
+
+    # Settled out of order, nothing is acked until the first one is.
+    await acker.settle(deliveries[1], ack=True)
+    await acker.settle(deliveries[2], ack=False, requeue=True)
+    assert calls == [("reject", 3, True)]
+
+    # Ready deliveries are acked in a single call once the batch is full.
+    await acker.settle(deliveries[0], ack=True)
+    assert calls == [("reject", 3, True), ("ack", 2, True)]
+
+    # Otherwise they are acked after a delay.
+    await acker.settle(deliveries[3], ack=True)
+    assert len(calls) == 2
+    await asyncio.sleep(1.5)
+    assert calls[2:] == [("ack", 4, True)]
+
+    # Deliveries from a closed channel are ignored.
+    acker.reset()
+    await acker.settle(deliveries[4], ack=True)
+    await acker.close()
+    assert len(calls) == 3
+
+
 @pytest.mark.asyncio
 async def test_rabbitmq_topic_pickle(
     rabbitmq_topic_maker: t.Callable[..., Awaitable[RabbitMQTopic]]
@@ -310,3 +476,24 @@ async def test_create_topic_with_exchange(
     )
 
     await topic.ensure_queue()
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_topic_publish_many_stop(
+    rabbitmq_topic_maker: RabbitMQTopicMaker,
+) -> None:
+    topic = await rabbitmq_topic_maker(RabbitMQTopic, publish_window=10)
+    publish = AsyncMock(side_effect=[True, False, True, True])
+    topic._publish = publish  # type: ignore[method-assign]
+
+    messages = [TopicMessage(id=MessageId(str(i)), args={"n": i}) for i in range(4)]
+    # Messages following one that wasn't published aren't sent.
+    assert await topic.publish_many(messages, wait=False) == [
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert publish.await_count == 2
+
+    await topic.close()
@@ -66,6 +66,7 @@ spec:
         "items": [
             {
                 "minimal_interval": "@weekly",
+                "retention": None,
                 "name": "test-job-definition",
                 "template": {
                     "input": {
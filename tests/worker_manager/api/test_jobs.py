@@ -1,26 +1,35 @@
 import typing as t
 
+import dataclasses
 import time
 from datetime import timedelta
 
 import pytest
+import sqlalchemy as sa
 import werkzeug.test
 from flask.testing import FlaskClient
 from pytest_mock import MockerFixture
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from datalineup_engine.core import JobId
 from datalineup_engine.core import api
+from datalineup_engine.core.types import CursorStateKey
 from datalineup_engine.models import Job
 from datalineup_engine.models import JobCursorState
+from datalineup_engine.models import Queue
 from datalineup_engine.stores import jobs_store
 from datalineup_engine.stores import queues_store
 from datalineup_engine.utils import utcnow
 from datalineup_engine.utils.inspect import get_import_name
 from datalineup_engine.worker_manager.app import DatalineupApp
 from datalineup_engine.worker_manager.config.declarative import StaticDefinitions
-from datalineup_engine.worker_manager.config.declarative import load_definitions_from_str
+from datalineup_engine.worker_manager.config.declarative import (
+    load_definitions_from_str,
+)
 from datalineup_engine.worker_manager.context import _load_static_definition
+from datalineup_engine.worker_manager.services.retention import RetentionBatch
+from datalineup_engine.worker_manager.services.sync import sync_jobs
 from tests.conftest import FreezeTime
 
 
@@ -129,6 +138,95 @@ def test_api_jobs(
     }
 
 
+def test_api_jobs_pagination_and_filters(
+    app: DatalineupApp,
+    client: FlaskClient,
+    session: Session,
+    static_definitions: StaticDefinitions,
+    queue_item_maker: t.Callable[..., api.QueueItem],
+    mock_definitions: t.Callable[[StaticDefinitions], None],
+    frozen_time: FreezeTime,
+) -> None:
+    for name, labels in [("daily", {"team": "a"}), ("hourly", {"team": "b"})]:
+        static_definitions.job_definitions[name] = api.JobDefinition(
+            name=name,
+            template=dataclasses.replace(queue_item_maker(), labels=labels),
+            minimal_interval="@daily",
+        )
+    mock_definitions(static_definitions)
+    app.datalineup.load_static_definition(session=session)
+
+    for i in range(5):
+        job_definition_name = "daily" if i % 2 else "hourly"
+        queue = queues_store.create_queue(session=session, name=f"job-{i}")
+        queue.assigned_to = f"worker-{i % 2}"
+        jobs_store.create_job(
+            name=queue.name,
+            session=session,
+            queue_name=queue.name,
+            job_definition_name=job_definition_name,
+            completed_at=utcnow() if i >= 3 else None,
+            error="boom" if i == 4 else None,
+        )
+    session.commit()
+
+    # Walk through all the pages.
+    names = []
+    after: t.Optional[str] = None
+    for _ in range(3):
+        query = {"limit": 2} | ({"after": after} if after else {})
+        resp = client.get("/api/jobs", query_string=query)
+        assert resp.status_code == 200
+        assert resp.json
+        names.append([i["name"] for i in resp.json["items"]])
+        after = resp.json.get("next_after")
+    assert names == [["job-0", "job-1"], ["job-2", "job-3"], ["job-4"]]
+    assert after is None
+
+    def filtered(**query: str) -> list[str]:
+        resp = client.get("/api/jobs", query_string=query)
+        assert resp.status_code == 200
+        assert resp.json
+        return [i["name"] for i in resp.json["items"]]
+
+    assert filtered(job_definition="daily") == ["job-1", "job-3"]
+    assert filtered(status="running") == ["job-0", "job-1", "job-2"]
+    assert filtered(status="completed") == ["job-3", "job-4"]
+    assert filtered(status="succeeded") == ["job-3"]
+    assert filtered(status="failed") == ["job-4"]
+    assert filtered(assigned_to="worker-0") == ["job-0", "job-2", "job-4"]
+    assert filtered(label="team=b") == ["job-0", "job-2", "job-4"]
+    assert filtered(label="team=c") == []
+    assert filtered(label="team=b", status="running", assigned_to="worker-0") == [
+        "job-0",
+        "job-2",
+    ]
+
+    assert client.get("/api/jobs?status=unknown").status_code == 400
+    assert client.get("/api/jobs?label=team").status_code == 400
+    assert client.get("/api/jobs?limit=0").status_code == 400
+
+    # Listings without a limit are paginated as well.
+    app.datalineup.config.jobs_page_size = 3
+    resp = client.get("/api/jobs")
+    assert resp.json
+    assert [i["name"] for i in resp.json["items"]] == ["job-0", "job-1", "job-2"]
+    assert resp.json["next_after"] == "job-2"
+
+
+def test_api_jobs_query_error(
+    app: DatalineupApp,
+    client: FlaskClient,
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(jobs_store, "iter_jobs", side_effect=ValueError("boom"))
+    app.testing = False
+
+    # The error is reported before the response starts streaming.
+    resp = client.get("/api/jobs", buffered=False)
+    assert resp.status_code == 500
+
+
 def test_api_job(
     client: FlaskClient,
     session: Session,
@@ -352,31 +450,31 @@ spec:
     assert resp.json == {
         "items": [
             {
-                "completed_at": None,
+                "completed_at": "2018-01-01T00:00:00+00:00",
                 "started_at": "2017-12-25T00:00:00+00:00",
                 "cursor": None,
                 "error": None,
-                "name": "running",
+                "name": "due",
                 "enabled": True,
                 "assigned_to": None,
                 "assigned_at": None,
             },
             {
                 "completed_at": "2018-01-01T00:00:00+00:00",
-                "started_at": "2017-12-25T00:00:00+00:00",
+                "started_at": "2017-12-31T00:00:00+00:00",
                 "cursor": None,
                 "error": None,
-                "name": "due",
+                "name": "not-due",
                 "enabled": True,
                 "assigned_to": None,
                 "assigned_at": None,
             },
             {
-                "completed_at": "2018-01-01T00:00:00+00:00",
-                "started_at": "2017-12-31T00:00:00+00:00",
+                "completed_at": None,
+                "started_at": "2017-12-25T00:00:00+00:00",
                 "cursor": None,
                 "error": None,
-                "name": "not-due",
+                "name": "running",
                 "enabled": True,
                 "assigned_to": None,
                 "assigned_at": None,
@@ -394,23 +492,23 @@ spec:
     expected_response = {
         "items": [
             {
-                # Running job was untouched
-                "completed_at": None,
+                # The old due job, untouched
+                "completed_at": "2018-01-01T00:00:00+00:00",
                 "cursor": None,
                 "error": None,
-                "name": "running",
+                "name": "due",
                 "started_at": "2017-12-25T00:00:00+00:00",
                 "enabled": True,
                 "assigned_to": None,
                 "assigned_at": None,
             },
             {
-                # The old due job, untouched
-                "completed_at": "2018-01-01T00:00:00+00:00",
+                # The due job was scheduled
+                "completed_at": None,
                 "cursor": None,
                 "error": None,
-                "name": "due",
-                "started_at": "2017-12-25T00:00:00+00:00",
+                "name": "due-1514851200",
+                "started_at": "2018-01-02T00:00:00+00:00",
                 "enabled": True,
                 "assigned_to": None,
                 "assigned_at": None,
@@ -427,22 +525,22 @@ spec:
                 "assigned_at": None,
             },
             {
-                # Unscheduled job was scheduled
+                # Running job was untouched
                 "completed_at": None,
                 "cursor": None,
                 "error": None,
-                "name": "unscheduled-1514851200",
-                "started_at": "2018-01-02T00:00:00+00:00",
+                "name": "running",
+                "started_at": "2017-12-25T00:00:00+00:00",
                 "enabled": True,
                 "assigned_to": None,
                 "assigned_at": None,
             },
             {
-                # The due job was scheduled
+                # Unscheduled job was scheduled
                 "completed_at": None,
                 "cursor": None,
                 "error": None,
-                "name": "due-1514851200",
+                "name": "unscheduled-1514851200",
                 "started_at": "2018-01-02T00:00:00+00:00",
                 "enabled": True,
                 "assigned_to": None,
@@ -634,6 +732,78 @@ spec:
     }
 
 
+def test_jobs_sync_batched(
+    client: FlaskClient,
+    session: Session,
+    static_definitions: StaticDefinitions,
+    fake_job_definition: api.JobDefinition,
+    queue_item_maker: t.Callable[..., api.QueueItem],
+    frozen_time: FreezeTime,
+) -> None:
+    for i in range(20):
+        job_definition = dataclasses.replace(fake_job_definition, name=f"test-{i}")
+        static_definitions.job_definitions[job_definition.name] = job_definition
+        queue_item = dataclasses.replace(queue_item_maker(), name=JobId(f"static-{i}"))
+        static_definitions.jobs[queue_item.name] = queue_item
+
+    statements: list[str] = []
+
+    def count_statement(*args: t.Any) -> None:
+        statements.append(args[2])
+
+    engine = session.get_bind()
+    sa.event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        assert sync_jobs(static_definitions=static_definitions, session=session) == 41
+        assert len(statements) <= 6
+        assert len(jobs_store.get_jobs(session=session)) == 41
+
+        # Nothing is due anymore.
+        statements.clear()
+        sync_jobs(static_definitions=static_definitions, session=session)
+        assert len(statements) <= 2
+        assert len(jobs_store.get_jobs(session=session)) == 41
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", count_statement)
+
+
+def test_jobs_sync_isolate_failures(
+    client: FlaskClient,
+    session: Session,
+    static_definitions: StaticDefinitions,
+    queue_item_maker: t.Callable[..., api.QueueItem],
+    mocker: MockerFixture,
+) -> None:
+    for i in range(3):
+        queue_item = dataclasses.replace(queue_item_maker(), name=JobId(f"static-{i}"))
+        static_definitions.jobs[queue_item.name] = queue_item
+
+    get_insert_values = Job.get_insert_values
+
+    def failing_insert_values(job: Job) -> Job.InsertValues:
+        if job.name == "static-1":
+            raise ValueError("bad job")
+        return get_insert_values(job)
+
+    mocker.patch.object(Job, "get_insert_values", failing_insert_values)
+    # The failing job doesn't prevent the others from being created.
+    assert sync_jobs(static_definitions=static_definitions, session=session) == 2
+    assert {j.name for j in jobs_store.get_jobs(session=session)} == {
+        "static-0",
+        "static-2",
+    }
+
+
+def test_create_jobs_count_created(session: Session) -> None:
+    def job(name: str) -> Job:
+        return Job(name=name, queue_name=name, started_at=utcnow())
+
+    assert jobs_store.create_jobs(session=session, jobs=[job("a"), job("b")]) == 2
+    # Jobs already existing aren't counted.
+    assert jobs_store.create_jobs(session=session, jobs=[job("a"), job("c")]) == 1
+    assert jobs_store.create_jobs(session=session, jobs=[]) == 0
+
+
 def test_sync_states(
     client: FlaskClient,
     session: Session,
@@ -757,6 +927,54 @@ def test_fetch_cursors_states(
     }
 
 
+def test_fetch_cursors_states_chunked(
+    client: FlaskClient,
+    session: Session,
+    fake_job: Job,
+    new_job: Job,
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(jobs_store, "FETCH_CURSORS_STATES_CHUNK_SIZE", 2)
+    session.add_all(
+        [
+            JobCursorState(
+                job_definition_name=t.cast(str, fake_job.job_definition_name),
+                cursor=cursor,
+                state={"x": i},
+            )
+            for i, cursor in enumerate(["a", "b", "c"])
+        ]
+    )
+    session.commit()
+
+    query = {
+        JobId(new_job.name): [
+            CursorStateKey("a"),
+            CursorStateKey("c"),
+            CursorStateKey("d"),
+        ],
+        JobId("other"): [CursorStateKey("a")],
+    }
+    statements: list[str] = []
+
+    def count_statement(*args: t.Any) -> None:
+        statements.append(args[2])
+
+    engine = session.get_bind()
+    sa.event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        states = jobs_store.fetch_cursors_states(query, session=session)
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", count_statement)
+
+    # 4 pairs are fetched by chunks of 2.
+    assert len(statements) == 2
+    assert states == {
+        new_job.name: {"a": {"x": 0}, "c": {"x": 2}, "d": None},
+        "other": {"a": None},
+    }
+
+
 def test_start_job_without_restart(
     client: FlaskClient,
     session: Session,
@@ -870,3 +1088,132 @@ def test_start_job_with_restart(
     assert third_job
     assert second_job.completed_at is not None
     assert second_job.error == "Cancelled"
+
+
+archived_batches: list[RetentionBatch] = []
+
+
+def archive(batch: RetentionBatch) -> None:
+    archived_batches.append(batch)
+
+
+def test_jobs_retention(
+    app: DatalineupApp,
+    client: FlaskClient,
+    session: Session,
+    static_definitions: StaticDefinitions,
+    queue_item_maker: t.Callable[..., api.QueueItem],
+    mock_definitions: t.Callable[[StaticDefinitions], None],
+    frozen_time: FreezeTime,
+) -> None:
+    static_definitions.job_definitions["daily"] = api.JobDefinition(
+        name="daily",
+        template=queue_item_maker(),
+        minimal_interval="@daily",
+        retention=api.JobRetention(max_runs=2),
+    )
+    shared_template = queue_item_maker()
+    shared_template.config = {
+        "job_state": {"cursors_states_namespace": "shared-states"}
+    }
+    static_definitions.job_definitions["shared"] = api.JobDefinition(
+        name="shared",
+        template=shared_template,
+        minimal_interval="@daily",
+    )
+    mock_definitions(static_definitions)
+    config = app.datalineup.config
+    config.jobs_retention = api.JobRetention(max_age=timedelta(days=2))
+    config.jobs_retention_batch_size = 2
+    config.jobs_retention_archiver = get_import_name(archive)
+    config.delete_orphaned_cursors_states = True
+    archived_batches.clear()
+
+    for name, job_definition_name, days_ago in [
+        ("daily-1", "daily", 4),
+        ("daily-2", "daily", 3),
+        ("daily-3", "daily", 2),
+        ("daily-4", "daily", 1),
+        ("removed-1", "removed", 10),
+        ("removed-2", "removed", 5),
+    ]:
+        queue = queues_store.create_queue(session=session, name=name)
+        jobs_store.create_job(
+            name=name,
+            session=session,
+            queue_name=queue.name,
+            job_definition_name=job_definition_name,
+            started_at=utcnow() - timedelta(days=days_ago),
+            completed_at=utcnow() - timedelta(days=days_ago - 1),
+        )
+    for namespace in ["daily", "removed", "shared-states", "gone"]:
+        session.add(JobCursorState(job_definition_name=namespace, cursor="a", state={}))
+    session.commit()
+
+    # Syncing jobs doesn't apply the retention.
+    client.post("/api/jobs/sync")
+    assert archived_batches == []
+
+    # Deletions are limited to `max_batches` of each.
+    resp = client.post("/api/jobs/_retention?max_batches=1")
+    assert resp.status_code == 200
+    assert resp.json == {"deleted": 3}
+    resp = client.post("/api/jobs/_retention")
+    assert resp.json == {"deleted": 1}
+
+    # The last completed run of a job definition is always kept.
+    assert ids(client.get("/api/jobs")) == {
+        "daily-1514851200",
+        "daily-3",
+        "daily-4",
+        "removed-2",
+        "shared-1514851200",
+    }
+    assert set(session.execute(select(Queue.name)).scalars()) == {
+        "daily-1514851200",
+        "daily-3",
+        "daily-4",
+        "removed-2",
+        "shared-1514851200",
+    }
+    assert set(
+        session.execute(select(JobCursorState.job_definition_name)).scalars()
+    ) == {"daily", "removed", "shared-states"}
+    assert {job.name for batch in archived_batches for job in batch.jobs} == {
+        "daily-1",
+        "daily-2",
+        "removed-1",
+    }
+    assert [b.cursors_states for b in archived_batches if b.cursors_states] == [
+        {"gone": {"a": {}}}
+    ]
+
+
+def test_jobs_retention_with_jobs_selector(
+    app: DatalineupApp,
+    client: FlaskClient,
+    session: Session,
+    frozen_time: FreezeTime,
+) -> None:
+    config = app.datalineup.config
+    config.jobs_retention = api.JobRetention(max_age=timedelta(days=2))
+    config.static_definitions_jobs_selector = "^daily"
+    config.delete_orphaned_cursors_states = True
+
+    # Job definitions missing from the static definitions might belong to
+    # another shard and are left alone.
+    for name, days_ago in [("other-1", 10), ("other-2", 5)]:
+        queue = queues_store.create_queue(session=session, name=name)
+        jobs_store.create_job(
+            name=name,
+            session=session,
+            queue_name=queue.name,
+            job_definition_name="other",
+            started_at=utcnow() - timedelta(days=days_ago),
+            completed_at=utcnow() - timedelta(days=days_ago - 1),
+        )
+    session.add(JobCursorState(job_definition_name="other", cursor="a", state={}))
+    session.commit()
+
+    assert client.post("/api/jobs/_retention").json == {"deleted": 0}
+    assert ids(client.get("/api/jobs")) == {"other-1", "other-2"}
@@ -1,5 +1,7 @@
 from typing import Callable
 
+import threading
+import time
 from datetime import datetime
 from datetime import timedelta
 
@@ -13,6 +15,7 @@ from datalineup_engine.models import Queue
 from datalineup_engine.stores import jobs_store
 from datalineup_engine.stores import queues_store
 from datalineup_engine.utils import utcnow
+from datalineup_engine.worker_manager.app import DatalineupApp
 from datalineup_engine.worker_manager.config.declarative import StaticDefinitions
 from tests.conftest import FreezeTime
 
@@ -327,3 +330,197 @@ def test_api_lock_with_executors(
     assert resp.json
     assert resp.json["items"][0]["name"] == "test"
     assert resp.json["executors"][0]["name"] == "default"
+
+
+def test_assign_queues_skip_concurrent_assignations(
+    session: Session,
+    frozen_time: FreezeTime,
+) -> None:
+    for name in ("q1", "q2"):
+        queues_store.create_queue(session=session, name=name)
+    session.commit()
+
+    now = datetime.now()
+    cutoff = now - timedelta(minutes=15)
+    # Both workers read q1 as unassigned, worker-1 claims it first.
+    assert queues_store.assign_queues(
+        session=session,
+        names=["q1"],
+        worker_id="worker-1",
+        assigned_at=now,
+        assigned_before=cutoff,
+    ) == {"q1"}
+    assert queues_store.assign_queues(
+        session=session,
+        names=["q1", "q2"],
+        worker_id="worker-2",
+        assigned_at=now,
+        assigned_before=cutoff,
+    ) == {"q2"}
+
+    # Refreshing its own assignation works.
+    assert queues_store.assign_queues(
+        session=session,
+        names=["q1"],
+        worker_id="worker-1",
+        assigned_at=now,
+        assigned_before=cutoff,
+    ) == {"q1"}
+
+
+def test_api_lock_with_version(
+    client: FlaskClient,
+    session: Session,
+    frozen_time: FreezeTime,
+    fake_job_definition: api.JobDefinition,
+) -> None:
+    def create_job(name: str) -> None:
+        queues_store.create_queue(session=session, name=name)
+        jobs_store.create_job(
+            session=session,
+            name=name,
+            queue_name=name,
+            job_definition_name=fake_job_definition.name,
+        )
+        session.commit()
+
+    create_job("job-1")
+    create_job("job-2")
+
+    resp = client.post("/api/lock", json={"worker_id": "worker-1"})
+    assert resp.status_code == 200
+    assert resp.json
+    assert ids(resp) == {"job-1", "job-2"}
+    assert resp.json["dropped"] is None
+    version = resp.json["version"]
+    assert version == api.lock_version(
+        items=["job-1", "job-2"],
+        resources=[],
+        resources_providers=[],
+        executors=["default"],
+    )
+
+    # Nothing changed.
+    resp = client.post("/api/lock", json={"worker_id": "worker-1", "version": version})
+    assert resp.status_code == 200
+    assert resp.json
+    assert resp.json["version"] == version
+    assert not resp.json["items"]
+    assert not resp.json["executors"]
+    assert resp.json["dropped"] == {
+        "items": [],
+        "resources": [],
+        "resources_providers": [],
+        "executors": [],
+    }
+
+    # Only changes are returned.
+    jobs_store.update_job(
+        session=session, name="job-1", completed_at=utcnow(), error=None
+    )
+    create_job("job-3")
+    resp = client.post("/api/lock", json={"worker_id": "worker-1", "version": version})
+    assert resp.status_code == 200
+    assert resp.json
+    assert ids(resp) == {"job-3"}
+    assert resp.json["dropped"]["items"] == ["job-1"]
+    assert resp.json["version"] != version
+
+    # A worker with an unknown version get everything.
+    resp = client.post(
+        "/api/lock", json={"worker_id": "worker-1", "version": "unknown"}
+    )
+    assert resp.status_code == 200
+    assert resp.json
+    assert ids(resp) == {"job-2", "job-3"}
+    assert resp.json["dropped"] is None
+
+
+def test_api_lock_long_poll(
+    app: DatalineupApp,
+    client: FlaskClient,
+    session: Session,
+    fake_job_definition: api.JobDefinition,
+) -> None:
+    app.datalineup.config.lock_max_wait = 60
+    resp = client.post("/api/lock", json={"worker_id": "worker-1"})
+    assert resp.status_code == 200
+    assert resp.json
+    version = resp.json["version"]
+
+    # Past the waiters limit, the lock answers at once.
+    app.datalineup.config.lock_max_waiters = 0
+    started_at = time.monotonic()
+    resp = client.post(
+        "/api/lock", json={"worker_id": "worker-1", "version": version, "wait": 30}
+    )
+    assert time.monotonic() - started_at < 10
+    assert resp.json
+    assert not resp.json["items"]
+    app.datalineup.config.lock_max_waiters = 8
+
+    # Nothing changes, the lock waits until the timeout.
+    started_at = time.monotonic()
+    resp = client.post(
+        "/api/lock", json={"worker_id": "worker-1", "version": version, "wait": 0.1}
+    )
+    assert time.monotonic() - started_at >= 0.1
+    assert resp.json
+    assert not resp.json["items"]
+
+    # Starting a job wakes up the lock.
+    def start_job() -> None:
+        time.sleep(0.1)
+        with app.app_context(), app.test_client() as start_client:
+            resp = start_client.post(
+                "/api/jobs/_start",
+                json={"job_definition_name": fake_job_definition.name},
+            )
+            assert resp.status_code == 200
+
+    thread = threading.Thread(target=start_job)
+    thread.start()
+    started_at = time.monotonic()
+    resp = client.post(
+        "/api/lock", json={"worker_id": "worker-1", "version": version, "wait": 30}
+    )
+    thread.join()
+    assert time.monotonic() - started_at < 10
+    assert resp.json
+    assert len(resp.json["items"]) == 1
+
+
+def test_api_lock_concurrent(
+    app: DatalineupApp,
+    client: FlaskClient,
+    session: Session,
+    fake_job_definition: api.JobDefinition,
+) -> None:
+    for i in range(10):
+        queues_store.create_queue(session=session, name=f"job-{i}")
+        jobs_store.create_job(
+            session=session,
+            name=f"job-{i}",
+            queue_name=f"job-{i}",
+            job_definition_name=fake_job_definition.name,
+        )
+    session.commit()
+    app.datalineup.config.work_items_per_worker = 2
+
+    locked: dict[str, set[str]] = {}
+
+    def lock(worker_id: str) -> None:
+        with app.app_context(), app.test_client() as lock_client:
+            resp = lock_client.post("/api/lock", json={"worker_id": worker_id})
+            assert resp.status_code == 200
+            locked[worker_id] = ids(resp)
+
+    threads = [threading.Thread(target=lock, args=(f"worker-{i}",)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every worker got its share of work, and no item was locked twice.
+    assert len(locked) == 5
+    assert set.union(*locked.values()) == {f"job-{i}" for i in range(10)}
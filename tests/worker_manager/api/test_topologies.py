@@ -131,6 +131,8 @@ spec:
         ],
         "resources": [],
         "resources_providers": [],
+        "version": mock.ANY,
+        "dropped": None,
     }
 
     # Let's change the pipeline name
@@ -193,4 +195,6 @@ spec:
         ],
         "resources": [],
         "resources_providers": [],
+        "version": mock.ANY,
+        "dropped": None,
     }
@@ -1,4 +1,6 @@
 import os
+from datetime import timedelta
+from pathlib import Path
 
 import pytest
 from flask.testing import FlaskClient
@@ -6,15 +8,26 @@ from sqlalchemy.orm import Session
 
 from datalineup_engine.core.api import ComponentDefinition
 from datalineup_engine.core.api import JobDefinition
+from datalineup_engine.core.api import JobRetention
 from datalineup_engine.core.api import ResourceItem
+from datalineup_engine.models.topology_patches import TopologyPatch
 from datalineup_engine.stores import topologies_store
 from datalineup_engine.utils.declarative_config import BaseObject
 from datalineup_engine.utils.declarative_config import ObjectMetadata
 from datalineup_engine.utils.declarative_config import load_uncompiled_objects_from_str
-from datalineup_engine.worker_manager.config.declarative import compile_static_definitions
-from datalineup_engine.worker_manager.config.declarative import filter_with_jobs_selector
-from datalineup_engine.worker_manager.config.declarative import load_definitions_from_paths
-from datalineup_engine.worker_manager.config.declarative import load_definitions_from_str
+from datalineup_engine.worker_manager.config.declarative import StaticDefinitionsLoader
+from datalineup_engine.worker_manager.config.declarative import (
+    compile_static_definitions,
+)
+from datalineup_engine.worker_manager.config.declarative import (
+    filter_with_jobs_selector,
+)
+from datalineup_engine.worker_manager.config.declarative import (
+    load_definitions_from_paths,
+)
+from datalineup_engine.worker_manager.config.declarative import (
+    load_definitions_from_str,
+)
 from datalineup_engine.worker_manager.config.static_definitions import StaticDefinitions
 
 
@@ -70,6 +83,9 @@ metadata:
     owner: team-datalineup
 spec:
   minimalInterval: "@weekly"
+  retention:
+    maxAge: P7D
+    maxRuns: 10
   template:
     input:
       inventory: test-inventory
@@ -94,6 +110,9 @@ spec:
         static_definitions.job_definitions["test-job-definition"].minimal_interval
         == "@weekly"
     )
+    assert static_definitions.job_definitions[
+        "test-job-definition"
+    ].retention == JobRetention(max_age=timedelta(days=7), max_runs=10)
 
     assert isinstance(
         static_definitions.inventories["test-inventory"], ComponentDefinition
@@ -547,6 +566,75 @@ spec:
     }
 
 
+def test_job_templates() -> None:
+    definitions_str: str = """
+apiVersion: datalineup.khulnasoft.io/v1alpha1
+kind: DatalineupInventory
+metadata:
+  name: test-inventory
+spec:
+  type: testtype
+---
+apiVersion: datalineup.khulnasoft.io/v1alpha1
+kind: DatalineupExecutor
+metadata:
+  name: default
+spec:
+  type: ProcessExecutor
+---
+apiVersion: datalineup.khulnasoft.io/v1alpha1
+kind: DatalineupResource
+metadata:
+  name: test-resource
+spec:
+  type: TestApiKey
+  data: {}
+---
+apiVersion: datalineup.khulnasoft.io/v1alpha1
+kind: DatalineupJob
+metadata:
+  name: test-job
+spec:
+  input:
+    inventory: test-inventory
+  pipeline:
+    name: something.datalineup.pipelines.aa.bb
+    resources: {"api_key": "TestApiKey"}
+---
+apiVersion: datalineup.khulnasoft.io/v1alpha1
+kind: DatalineupJobDefinition
+metadata:
+  name: test-job-definition
+spec:
+  minimalInterval: "@weekly"
+  template:
+    input:
+      inventory: test-inventory
+    pipeline:
+      name: something.datalineup.pipelines.aa.bb
+      resources: {"api_key": "MissingApiKey"}
+"""
+    static_definitions = load_definitions_from_str(definitions_str)
+
+    job_template = static_definitions.job_templates["test-job"]
+    assert job_template.queue_item is static_definitions.jobs["test-job"]
+    assert set(job_template.resources) == {"test-resource"}
+    assert job_template.executor == static_definitions.executors["default"]
+    assert job_template.missing_resource is None
+
+    job_definition_template = static_definitions.job_definition_templates[
+        "test-job-definition"
+    ]
+    assert job_definition_template.missing_resource == "MissingApiKey"
+
+    # The index only keep the templates of selected jobs.
+    filtered_definitions = filter_with_jobs_selector(
+        definitions=static_definitions, selector="test-job$"
+    )
+    assert set(filtered_definitions.job_templates) == {"test-job"}
+    assert not filtered_definitions.job_definition_templates
+
+
 def test_load_executor() -> None:
     executor_definition_str = """
     apiVersion: datalineup.khulnasoft.io/v1alpha1
@@ -680,3 +768,59 @@ def test_compile_static_definitions_with_patches(
             rate_limit=None,
         )
     }
+
+
+def test_static_definitions_loader(tmp_path: Path) -> None:
+    inventory_str = """
+    apiVersion: datalineup.khulnasoft.io/v1alpha1
+    kind: DatalineupInventory
+    metadata:
+      name: test-inventory
+    spec:
+      type: testtype
+    """
+    executor_str = """
+    apiVersion: datalineup.khulnasoft.io/v1alpha1
+    kind: DatalineupExecutor
+    metadata:
+      name: test-executor
+    spec:
+      type: ARQExecutor
+      options: {}
+    """
+    inventory_path = tmp_path / "inventory.yaml"
+    inventory_path.write_text(inventory_str)
+    executor_path = tmp_path / "executor.yaml"
+    executor_path.write_text(executor_str)
+
+    loader = StaticDefinitionsLoader()
+    static_definitions = loader.load([str(tmp_path)])
+    assert set(static_definitions.inventories) == {"test-inventory"}
+    assert set(static_definitions.executors) == {"test-executor"}
+    compiled_objects = dict(loader.compiled_objects)
+
+    # Nothing changed, the definitions are reused.
+    assert loader.load([str(tmp_path)]) is static_definitions
+
+    # Only the changed file is compiled again.
+    executor_path.write_text(executor_str.replace("{}", "{concurrency: 2}"))
+    static_definitions = loader.load([str(tmp_path)])
+    assert static_definitions.executors["test-executor"].options == {"concurrency": 2}
+    inventory_digest = next(
+        d for d, o in compiled_objects.items() if o.kind == "DatalineupInventory"
+    )
+    assert (
+        loader.compiled_objects[inventory_digest] is compiled_objects[inventory_digest]
+    )
+    assert len(loader.compiled_objects) == 2
+
+    # Patches are applied without altering the cached objects.
+    patch = TopologyPatch(
+        kind="DatalineupInventory",
+        name="test-inventory",
+        data={"spec": {"options": {"patched": True}}},
+    )
+    static_definitions = loader.load([str(tmp_path)], patches=[patch])
+    assert static_definitions.inventories["test-inventory"].options == {"patched": True}
+    static_definitions = loader.load([str(tmp_path)])
+    assert static_definitions.inventories["test-inventory"].options == {}